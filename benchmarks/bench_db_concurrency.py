@@ -0,0 +1,144 @@
+"""
+Write throughput of oaix.db while the Streamlit viewer reads it.
+
+The run seeds a database with --events webhook_events and --logs app_logs
+rows. One thread then commits --batch-row transactions into webhook_events
+as fast as it can, the way db_writer does. At the same time --readers
+threads loop over the viewer's queries through plain sqlite3 connections,
+as streamlit_detection_viewer.py does:
+- every event ORDER BY created_at DESC (load_detection_data)
+- the newest 100 logs
+- one camera's newest 100 events
+- a lot lookup
+
+"old" is the previous setup: the default rollback journal, synchronous=FULL
+and no indexes. "new" is db_manager: tune_sqlite pragmas (WAL,
+synchronous=NORMAL, page cache) and the migrated indexes. Each run uses its
+own file under /tmp.
+
+    python -m benchmarks.bench_db_concurrency --events 200000 --seconds 5
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TMP = tempfile.mkdtemp(prefix="oaix-db-")
+os.environ["OAIX_DB_URL"] = f"sqlite:///{os.path.join(TMP, 'app.db')}"
+sys.path.append(os.path.join(ROOT, 'ray_actors'))
+
+from db.db_manager import Base, WebhookEvent, tune_sqlite  # noqa: E402
+from db.db_migrations import migrate  # noqa: E402
+
+CAMERAS = [f"cam{i}" for i in range(8)]
+QUERIES = {
+    "all events": "SELECT id, camera_name, lot, expiry, all_text, created_at, mime, image_path "
+                  "FROM webhook_events ORDER BY created_at DESC",
+    "latest logs": "SELECT id, log_code, level, message, created_at FROM app_logs ORDER BY created_at DESC LIMIT 100",
+    "camera latest": "SELECT * FROM webhook_events WHERE camera_name = 'cam3' ORDER BY created_at DESC LIMIT 100",
+    "lot lookup": "SELECT * FROM webhook_events WHERE lot = 'L04217'",
+}
+
+
+def seed(path, events, logs, tuned):
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        tune_sqlite(engine)
+    Base.metadata.create_all(engine)
+    conn = sqlite3.connect(path)
+    if tuned:
+        migrate(engine)
+    else:
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'").fetchall():
+            conn.execute(f"DROP INDEX {name}")
+    rng = random.Random(0)
+    t0 = time.time() - events
+    conn.executemany(
+        "INSERT INTO webhook_events (camera_name, lot, expiry, all_text, created_at, mime) VALUES (?, ?, ?, ?, "
+        "datetime(?, 'unixepoch'), 'OCR_EVENT')",
+        ((rng.choice(CAMERAS), f"L{rng.randrange(20000):05d}", "2027-01", f"LOT L{i % 20000:05d} EXP 2027-01",
+          t0 + i) for i in range(events)))
+    conn.executemany(
+        "INSERT INTO app_logs (log_code, level, message, created_at) VALUES (?, '2', ?, datetime(?, 'unixepoch'))",
+        ((2002, f"channel_{i % 8} | frame read timed out", t0 + i) for i in range(logs)))
+    conn.commit()
+    conn.close()
+    return engine
+
+
+def run(path, engine, seconds, batch, readers):
+    stop = threading.Event()
+    commits = []
+    reads = {name: [] for name in QUERIES}
+    errors = []
+
+    def writer():
+        table = WebhookEvent.__table__
+        n = 0
+        while not stop.is_set():
+            rows = [{"camera_name": CAMERAS[(n + i) % 8], "lot": "L99999", "expiry": "2027-01",
+                     "all_text": "LOT L99999", "mime": "OCR_EVENT"} for i in range(batch)]
+            t = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(table.insert(), rows)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            commits.append(time.perf_counter() - t)
+            n += batch
+
+    def reader():
+        conn = sqlite3.connect(path, timeout=5.0)
+        while not stop.is_set():
+            for name, sql in QUERIES.items():
+                t = time.perf_counter()
+                try:
+                    conn.execute(sql).fetchall()
+                except sqlite3.OperationalError as e:
+                    errors.append(str(e))
+                    continue
+                reads[name].append(time.perf_counter() - t)
+        conn.close()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return commits, reads, errors
+
+
+def pct(values, p):
+    return sorted(values)[int(p * (len(values) - 1))] * 1000 if values else float("nan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--logs", type=int, default=50_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--batch", type=int, default=64, help="rows per write transaction")
+    parser.add_argument("--readers", type=int, default=1)
+    args = parser.parse_args()
+
+    for label, tuned in (("old", False), ("new", True)):
+        path = os.path.join(TMP, f"{label}.db")
+        engine = seed(path, args.events, args.logs, tuned)
+        commits, reads, errors = run(path, engine, args.seconds, args.batch, args.readers)
+        rows_s = len(commits) * args.batch / args.seconds
+        print(f"{label}: {rows_s:8.0f} rows/s written  commit p50 {pct(commits, 0.5):6.1f} ms  "
+              f"p99 {pct(commits, 0.99):7.1f} ms  max {pct(commits, 1.0):7.1f} ms  errors {len(errors)}")
+        for name, times in reads.items():
+            print(f"     {name:<14} {len(times) / args.seconds:7.1f} q/s  p50 {pct(times, 0.5):7.1f} ms")
+        engine.dispose()
@@ -0,0 +1,78 @@
+"""
+Rows/s of OAIX_db_Logger.app_logger from many threads, old path vs batched writer.
+
+"old" replays the previous app_logger: take the logger lock, open a session,
+add one AppLogger row, commit, close. "new" is the current app_logger, which
+queues the row for the background writer. The clock stops once every row is
+committed (writer flush). Both runs use a fresh SQLite file under /tmp (via
+OAIX_DB_URL), with engine echo off. Pass --echo to add statement logging to the
+old path as it was configured before (output discarded).
+
+    python -m benchmarks.bench_db_writer --threads 8 --rows 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix="oaix-db-"), "bench.db")
+os.environ["OAIX_DB_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(ROOT, 'ray_actors'))
+
+from db.db_manager import AppLogger, SessionLocal, engine  # noqa: E402
+from db.db_logger import LoggerLevel, OAIX_db_Logger  # noqa: E402
+from db.db_writer import flush_writer, get_writer  # noqa: E402
+from db.error_codes import ErrorCode  # noqa: E402
+
+old_lock = threading.Lock()
+
+
+def old_app_logger(log_code, msg, level=LoggerLevel.INFO):
+    with old_lock:
+        session = SessionLocal()
+        try:
+            session.add(AppLogger(level=level, log_code=log_code, message=msg))
+            session.commit()
+        finally:
+            session.close()
+
+
+def run(log, threads, rows):
+    def worker(t):
+        for i in range(rows):
+            log(ErrorCode.STREAM_TIMEOUT, f"channel_{t} | frame read timed out ({i})", LoggerLevel.WARNING)
+
+    ts = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    caller_s = time.perf_counter() - t0
+    flush_writer(60)
+    return threads * rows / (time.perf_counter() - t0), caller_s * 1e6 / rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=500, help="rows per thread")
+    parser.add_argument("--echo", action="store_true", help="old path with SQLAlchemy statement logging")
+    args = parser.parse_args()
+
+    if args.echo:
+        engine.echo = True
+        logging.getLogger("sqlalchemy.engine.Engine").handlers = [logging.FileHandler(os.devnull)]
+        logging.getLogger("sqlalchemy.engine.Engine").propagate = False
+    rate, us = run(old_app_logger, args.threads, args.rows)
+    engine.echo = False
+    print(f"{'old: session + commit per row':<34} {rate:9.0f} rows/s  {us:7.1f} us/call per thread")
+    logger = OAIX_db_Logger()
+    rate, us = run(logger.app_logger, args.threads, args.rows)
+    print(f"{'new: batched background writer':<34} {rate:9.0f} rows/s  {us:7.1f} us/call per thread")
+    print(get_writer().stats())
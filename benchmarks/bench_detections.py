@@ -0,0 +1,116 @@
+"""
+Detection decoding micro-benchmark: per-box loop vs vectorized decode_results.
+
+Runs YOLO on frames of rtsp_streamer/videos/crowd.mp4 (100+ people per frame)
+and times only the Results -> detections step for both paths on the same
+Results objects. Without ultralytics installed it falls back to synthetic
+Boxes with --boxes rows, which still shows the Python per-box overhead
+(but not the per-box device sync, which only exists on GPU).
+
+    python -m benchmarks.bench_detections --frames 30 --model yolo11m.pt
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from multi_processing.detections import as_tuples, decode_results
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CROWD = os.path.join(ROOT, 'rtsp_streamer', 'videos', 'crowd.mp4')
+
+
+def per_box(results):
+    dets = []
+    for r in results:
+        if r is None:
+            continue
+        for b in r.boxes:
+            xyxy = b.xyxy[0].tolist()
+            cls = int(b.cls.item())
+            conf = float(b.conf.item())
+            dets.append((xyxy, cls, conf))
+    return dets
+
+
+def vectorized(results):
+    return as_tuples(decode_results(results))
+
+
+class SyntheticBoxes:
+    """Numpy stand-in for ultralytics Boxes (data columns: x1 y1 x2 y2 conf cls)."""
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
+    def __iter__(self):
+        return (SyntheticBoxes(self.data[i:i + 1]) for i in range(len(self.data)))
+
+
+class SyntheticResult:
+    def __init__(self, n):
+        data = np.random.rand(n, 6).astype(np.float32) * 1000
+        data[:, 5] = np.random.randint(0, 80, n)
+        self.boxes = SyntheticBoxes(data)
+
+
+def yolo_results(model_path, frames, imgsz):
+    import cv2
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    cap = cv2.VideoCapture(CROWD)
+    out = []
+    while len(out) < frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        out.append(model(frame, imgsz=imgsz, conf=0.1, verbose=False))
+    cap.release()
+    return out
+
+
+def bench(fn, batches, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for results in batches:
+            fn(results)
+    return (time.perf_counter() - t0) * 1000.0 / (repeat * len(batches))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--model", default="yolo11m.pt")
+    parser.add_argument("--imgsz", type=int, default=1280)
+    parser.add_argument("--boxes", type=int, default=150, help="boxes per frame for the synthetic fallback")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        batches = yolo_results(args.model, args.frames, args.imgsz)
+        source = f"yolo on {os.path.basename(CROWD)}"
+    except ImportError:
+        batches = [[SyntheticResult(args.boxes)] for _ in range(args.frames)]
+        source = "synthetic boxes (ultralytics not installed)"
+
+    n_boxes = sum(len(r.boxes.data) for results in batches for r in results) / len(batches)
+    assert len(per_box(batches[0])) == len(vectorized(batches[0]))
+    loop_ms = bench(per_box, batches, args.repeat)
+    vec_ms = bench(vectorized, batches, args.repeat)
+    print(f"{source}: {len(batches)} frames, {n_boxes:.0f} boxes/frame")
+    print(f"per_box     {loop_ms:8.3f} ms/frame")
+    print(f"vectorized  {vec_ms:8.3f} ms/frame  ({loop_ms / max(vec_ms, 1e-9):.1f}x)")
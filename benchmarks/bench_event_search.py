@@ -0,0 +1,127 @@
+"""
+Event search on a synthetic oaix.db: viewer-style load + substring filter vs event_search.
+
+The run seeds --events webhook_events (default one million) spread over 90
+days and 8 cameras. Each event's OCR text carries a lot number
+(A + 5 digits) and an expiry month. The database is created through
+db_manager, so it has the current schema: indexes, the trigram FTS5 table
+and its triggers. The insert rate includes the triggers.
+
+"old" does what the viewer did: load every event newest first, then keep
+the rows whose all_text / lot / expiry contain the filter, ignoring case.
+pandas isn't needed for this; the Python `in` test is the same
+comparison. "new" is event_search: the first page and page --pages deep
+through the keyset cursor, plus count_events for the same query.
+
+    python -m benchmarks.bench_event_search --events 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix="oaix-db-"), "search.db")
+os.environ["OAIX_DB_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(ROOT, 'ray_actors'))
+
+import db.db_manager  # noqa: E402,F401  creates the schema in DB_FILE
+from db.event_search import EventQuery, count_events, search_events  # noqa: E402
+
+DAYS = 90
+NOW = datetime(2026, 10, 1)
+WORDS = ["PARACETAMOL", "500MG", "TABLETS", "IBUPROFEN", "200MG", "CAPSULES", "AMOXICILLIN", "250MG",
+         "STORE BELOW 25C", "KEEP DRY", "BATCH", "MFG"]
+
+
+def seed(events):
+    rng = random.Random(0)
+    step = DAYS * 86400 / events
+    start = (NOW - timedelta(days=DAYS)).timestamp()
+
+    def rows():
+        for i in range(events):
+            lot = f"A{rng.randrange(100000):05d}"
+            expiry = f"{rng.randrange(2026, 2030)}-{rng.randrange(1, 13):02d}"
+            text = f"{rng.choice(WORDS)} {rng.choice(WORDS)} LOT {lot} EXP {expiry}"
+            has_lot = rng.random() < 0.8
+            yield (f"cam{i % 8}", lot if has_lot else None, expiry, text, start + i * step)
+
+    conn = sqlite3.connect(DB_FILE)
+    t0 = time.perf_counter()
+    conn.executemany("INSERT INTO webhook_events (camera_name, lot, expiry, all_text, created_at, mime) "
+                     "VALUES (?, ?, ?, ?, datetime(?, 'unixepoch'), 'OCR_EVENT')", rows())
+    conn.commit()
+    rate = events / (time.perf_counter() - t0)
+    conn.execute("ANALYZE")
+    conn.close()
+    return rate
+
+
+def old_search(conn, query):
+    rows = conn.execute("SELECT id, camera_name, lot, expiry, all_text, created_at, mime, image_path "
+                        "FROM webhook_events ORDER BY created_at DESC").fetchall()
+    start, end = query.start.strftime("%Y-%m-%d %H:%M:%S"), query.end.strftime("%Y-%m-%d %H:%M:%S")
+    out = []
+    for r in rows:
+        if not (start <= r[5] < end) or (query.camera and r[1] != query.camera):
+            continue
+        if query.text and query.text.lower() not in (r[4] or "").lower():
+            continue
+        if query.lot and query.lot.lower() not in (r[2] or "").lower():
+            continue
+        if query.expiry and query.expiry.lower() not in (r[3] or "").lower():
+            continue
+        out.append(r)
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=20, help="depth of the deep-page measurement")
+    parser.add_argument("--skip-old", action="store_true", help="skip the full-table load (slow at 1M)")
+    args = parser.parse_args()
+
+    rate = seed(args.events)
+    size_mb = os.path.getsize(DB_FILE) / 2**20
+    print(f"seeded {args.events} events at {rate:.0f} rows/s (FTS triggers included), db {size_mb:.0f} MB")
+
+    week = dict(start=NOW - timedelta(days=7), end=NOW)
+    cases = {
+        "lot contains A1234 (7 days)": EventQuery(lot="A1234", **week),
+        "text contains IBUPROFEN (7 days)": EventQuery(text="IBUPROFEN", **week),
+        "text IBUPROFEN + expiry 2027-0 (90 days)": EventQuery(text="IBUPROFEN", expiry="2027-0",
+                                                              start=NOW - timedelta(days=DAYS), end=NOW),
+        "lot contains A1 (2 chars, LIKE) (7 days)": EventQuery(lot="A1", **week),
+        "cam3, last day, no text": EventQuery(camera="cam3", start=NOW - timedelta(days=1), end=NOW),
+    }
+    conn = sqlite3.connect(DB_FILE)
+    for label, query in cases.items():
+        print(label)
+        if not args.skip_old:
+            rows, ms = timed(lambda: old_search(conn, query))
+            print(f"  old: load all + filter   {ms:8.1f} ms  ({len(rows)} matches)")
+        page, ms = timed(lambda: search_events(conn, query))
+        print(f"  new: first page          {ms:8.1f} ms  ({len(page.rows)} rows)")
+        after, n = page.cursor, 1
+        t0 = time.perf_counter()
+        while after is not None and n < args.pages:
+            page = search_events(conn, query, after=after)
+            after, n = page.cursor, n + 1
+        if n > 1:
+            print(f"  new: page {n:<3} via cursor  {(time.perf_counter() - t0) * 1000 / (n - 1):8.1f} ms/page")
+        total, ms = timed(lambda: count_events(conn, query))
+        print(f"  new: count               {ms:8.1f} ms  ({total} matches)")
+    conn.close()
@@ -0,0 +1,118 @@
+"""
+Frame transport benchmark: Manager().Queue (pickled frames) vs FrameRing (shared memory).
+
+A producer process pushes synthetic 1080p BGR frames, a consumer process reads them
+and records end-to-end latency (consumer receive time - producer write time).
+
+    python -m benchmarks.bench_frame_ring --seconds 5 --height 1080 --width 1920
+"""
+
+import argparse
+import time
+from multiprocessing import Event, Manager, Process, Queue
+
+import numpy as np
+
+from multi_processing.frame_ring import FrameRing
+
+
+def _frame(h, w):
+    return np.random.randint(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+def _summary(name, latencies_ms, produced, seconds):
+    lat = np.array(latencies_ms) if latencies_ms else np.zeros(1)
+    print(f"{name:<14} produced={produced / seconds:8.1f} fps  delivered={len(latencies_ms) / seconds:8.1f} fps  "
+          f"lat_mean={lat.mean():7.2f} ms  lat_p99={np.percentile(lat, 99):7.2f} ms")
+
+
+# ---------- Manager().Queue path ----------
+def _queue_producer(q, stop, h, w, counter):
+    frame = _frame(h, w)
+    n = 0
+    while not stop.is_set():
+        q.put((time.time(), frame))
+        n += 1
+    counter.put(n)
+
+
+def _queue_consumer(q, stop, out):
+    lat = []
+    while not stop.is_set():
+        try:
+            ts, _ = q.get(timeout=0.1)
+        except Exception:
+            continue
+        lat.append((time.time() - ts) * 1000.0)
+    out.put(lat)
+
+
+def bench_queue(seconds, h, w):
+    manager = Manager()
+    q = manager.Queue(maxsize=8)
+    stop, counter, out = Event(), Queue(), Queue()
+    procs = [Process(target=_queue_producer, args=(q, stop, h, w, counter)),
+             Process(target=_queue_consumer, args=(q, stop, out))]
+    for p in procs:
+        p.start()
+    time.sleep(seconds)
+    stop.set()
+    produced, lat = counter.get(), out.get()
+    for p in procs:
+        p.join(timeout=5)
+    manager.shutdown()
+    _summary("manager_queue", lat, produced, seconds)
+
+
+# ---------- FrameRing path ----------
+def _ring_producer(name, stop, h, w, counter):
+    ring = FrameRing.attach(name)
+    frame = _frame(h, w)
+    n = 0
+    while not stop.is_set():
+        ring.write(frame)
+        n += 1
+    ring.close()
+    counter.put(n)
+
+
+def _ring_consumer(name, stop, out):
+    ring = FrameRing.attach(name)
+    lat = []
+    last = 0
+    while not stop.is_set():
+        latest = ring.latest(after_seq=last, copy=False)
+        if latest is None:
+            time.sleep(0.0005)
+            continue
+        last, ts, _ = latest
+        lat.append((time.time() - ts) * 1000.0)
+    ring.close()
+    out.put(lat)
+
+
+def bench_ring(seconds, h, w):
+    ring = FrameRing.create("oaix_bench_ring", max_height=h, max_width=w)
+    stop, counter, out = Event(), Queue(), Queue()
+    procs = [Process(target=_ring_producer, args=(ring.name, stop, h, w, counter)),
+             Process(target=_ring_consumer, args=(ring.name, stop, out))]
+    for p in procs:
+        p.start()
+    time.sleep(seconds)
+    stop.set()
+    produced, lat = counter.get(), out.get()
+    for p in procs:
+        p.join(timeout=5)
+    ring.close()
+    _summary("shm_ring", lat, produced, seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+    print(f"frame={args.height}x{args.width}x3 ({args.height * args.width * 3 / 1e6:.1f} MB)")
+    bench_queue(args.seconds, args.height, args.width)
+    bench_ring(args.seconds, args.height, args.width)
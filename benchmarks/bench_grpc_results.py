@@ -0,0 +1,145 @@
+"""
+SubscribeDetections fan-out benchmark: one in-process gRPC server, local clients.
+
+A producer thread plays the detector workers, putting detection events for 30
+streams on result_q at --fps per stream. ResultsHub drains result_q and fans out
+to --clients subscribers of every stream, plus one client per stream and one
+deliberately slow client (--slow-ms per event). Reports per-client events/sec,
+end-to-end latency (producer put -> client receive) and drops, and how long the
+producer's put() ever blocked: the slow client must cost drops on its own
+stream only, never producer stalls. --default-window runs the clients with
+gRPC's default channel options instead of SUBSCRIBER_CHANNEL_OPTIONS, to show
+the slow client's backlog piling up in the transport instead.
+
+    python -m benchmarks.bench_grpc_results --streams 30 --fps 30 --clients 4 --seconds 5
+"""
+
+import argparse
+import queue
+import threading
+import time
+
+import grpc
+import numpy as np
+
+from multi_processing.detections import DETECTION_DTYPE
+from multi_processing.generated import server_commands_pb2 as pb2
+from multi_processing.generated import server_commands_pb2_grpc as pb2_grpc
+from multi_processing.grpc_results_serv import SUBSCRIBER_CHANNEL_OPTIONS, serve_results, to_proto
+from multi_processing.result_codec import pack_detections
+from multi_processing.results_hub import ResultsHub
+
+
+def _producer(result_q, sids, fps, boxes, fmt, stop, put_ms):
+    period = 1.0 / fps if fps > 0 else 0.0
+    dets = np.zeros(boxes, dtype=DETECTION_DTYPE)
+    dets['xyxy'] = [[100.0 + i, 200.0, 300.0, 400.0 + i] for i in range(boxes)]
+    dets['cls'] = np.arange(boxes) % 80
+    dets['conf'] = 0.5
+    tuples = [([100.0 + i, 200.0, 300.0, 400.0 + i], i % 80, 0.5) for i in range(boxes)]
+    frame = 0
+    next_t = time.time()
+    while not stop.is_set():
+        for sid in sids:
+            ts = time.time()
+            if fmt == "packed":
+                msg = {"stream_id": sid, "event": "detections", "packed": pack_detections(dets, frame, ts)}
+            else:
+                msg = {"stream_id": sid, "event": "detections", "data": tuples, "frame_idx": frame, "ts": ts}
+            t0 = time.perf_counter()
+            result_q.put(msg)
+            put_ms.append((time.perf_counter() - t0) * 1000.0)
+        frame += 1
+        if period:
+            next_t += period
+            delay = next_t - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def _client(port, request, slow_ms, options, stats, ready):
+    lat, dropped = [], 0
+    with grpc.insecure_channel(f"localhost:{port}", options=options) as channel:
+        stream = pb2_grpc.ServerCommandsStub(channel).SubscribeDetections(request)
+        ready.release()
+        stats["stream"] = stream
+        try:
+            for ev in stream:
+                lat.append((time.time() - ev.ts) * 1000.0)
+                dropped = max(dropped, ev.dropped)
+                if slow_ms:
+                    time.sleep(slow_ms / 1000.0)
+        except grpc.RpcError:
+            pass  # cancelled at the end of the run
+    stats["lat"] = lat
+    stats["dropped"] = dropped
+
+
+def _row(name, st, seconds):
+    lat = np.asarray(st.get("lat") or [0.0])
+    print(f"{name:<22} {len(st.get('lat', [])) / seconds:9.0f} ev/s  p50 {np.percentile(lat, 50):7.2f} ms  "
+          f"p99 {np.percentile(lat, 99):7.2f} ms  dropped {st.get('dropped', 0)}")
+
+
+def run(streams, fps, boxes, fmt, clients, slow_ms, buffer_size, seconds, default_window=False):
+    result_q = queue.Queue(maxsize=1000)
+    hub = ResultsHub(result_q, buffer_size=buffer_size, encode=to_proto).start()
+    server, port = serve_results(hub, port=0, max_workers=clients + streams + 8)
+    sids = [f"cam{i}" for i in range(streams)]
+
+    requests = {f"all[{i}]": pb2.SubscribeDetectionsRequest() for i in range(clients)}
+    requests.update({f"stream[{sid}]": pb2.SubscribeDetectionsRequest(stream_ids=[sid]) for sid in sids})
+    requests[f"slow[{slow_ms:.0f}ms]"] = pb2.SubscribeDetectionsRequest()
+    stats = {name: {} for name in requests}
+    ready = threading.Semaphore(0)
+    options = None if default_window else SUBSCRIBER_CHANNEL_OPTIONS
+    threads = [threading.Thread(target=_client, daemon=True,
+                                args=(port, req, slow_ms if name.startswith("slow") else 0.0, options, stats[name], ready))
+               for name, req in requests.items()]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        ready.acquire()
+    while len(hub.subscribers) < len(requests):
+        time.sleep(0.01)
+
+    stop, put_ms = threading.Event(), []
+    producer = threading.Thread(target=_producer, args=(result_q, sids, fps, boxes, fmt, stop, put_ms), daemon=True)
+    producer.start()
+    time.sleep(seconds)
+    stop.set()
+    producer.join()
+    time.sleep(0.2)  # let in-flight events reach the clients
+    for st in stats.values():
+        st["stream"].cancel()
+    for t in threads:
+        t.join(timeout=5)
+    server.stop(grace=None)
+    hub.stop()
+
+    produced = len(put_ms)
+    print(f"\n{streams} streams @ {fps:g} fps, {boxes} boxes, {fmt}: produced {produced / seconds:.0f} ev/s, "
+          f"put max {max(put_ms):.2f} ms, hub published {hub.published}")
+    for name in list(stats)[:clients]:
+        _row(name, stats[name], seconds)
+    per_stream = [stats[f"stream[{sid}]"] for sid in sids]
+    merged = {"lat": [x for st in per_stream for x in st.get("lat", [])],
+              "dropped": sum(st.get("dropped", 0) for st in per_stream)}
+    _row(f"{streams} per-stream (sum)", merged, seconds)
+    _row(list(stats)[-1], stats[list(stats)[-1]], seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=30)
+    parser.add_argument("--fps", type=float, default=30.0, help="per stream, 0 = as fast as possible")
+    parser.add_argument("--boxes", type=int, default=20)
+    parser.add_argument("--format", choices=("dict", "packed"), default="packed")
+    parser.add_argument("--clients", type=int, default=4, help="subscribers of every stream")
+    parser.add_argument("--slow-ms", type=float, default=20.0, help="per-event delay of the slow client")
+    parser.add_argument("--buffer", type=int, default=256)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--default-window", action="store_true", help="clients use gRPC default channel options")
+    args = parser.parse_args()
+    run(args.streams, args.fps, args.boxes, args.format, args.clients, args.slow_ms, args.buffer, args.seconds,
+        args.default_window)
@@ -0,0 +1,130 @@
+"""
+Per-channel models vs one shared InferenceService: resident memory and fps.
+
+Mirrors ray_actors DetectionManager: --channels threads each run detection
+on frames of rtsp_streamer/videos/park.mp4 in a loop. In "per-channel" mode
+every thread loads its own model (the old Detection.start_worker); in
+"shared" mode all threads submit to one InferenceService, which loads the
+weights once and micro-batches the concurrent calls. Reports the RSS growth
+of each mode, aggregate frames/sec and the average batch size.
+
+Without ultralytics installed it falls back to a synthetic model that holds
+--weights-mb of weights and costs --fixed-ms per forward pass plus
+--frame-ms per frame (kernel launch overhead is what batching amortizes).
+
+    python -m benchmarks.bench_inference_service --channels 10 --seconds 10 --model yolo11m.pt
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from multi_processing.inference_service import InferenceService
+from multi_processing.model_registry import LoadedModel
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PARK = os.path.join(ROOT, 'rtsp_streamer', 'videos', 'park.mp4')
+
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+class SyntheticModel:
+    # all instances share one "GPU": concurrent forward passes queue up behind each other
+    device = threading.Lock()
+
+    def __init__(self, weights_mb, fixed_ms, frame_ms):
+        self.weights = np.ones(int(weights_mb * 2 ** 20 / 4), dtype=np.float32)  # touched, so resident
+        self.fixed_ms = fixed_ms
+        self.frame_ms = frame_ms
+
+    def __call__(self, frames, **kwargs):
+        n = len(frames) if isinstance(frames, list) else 1
+        with self.device:
+            time.sleep((self.fixed_ms + self.frame_ms * n) / 1000.0)
+        return [None] * n
+
+
+def make_loader(args):
+    try:
+        from ultralytics import YOLO
+        return lambda: YOLO(args.model), f"yolo {args.model}"
+    except ImportError:
+        return (lambda: SyntheticModel(args.weights_mb, args.fixed_ms, args.frame_ms),
+                f"synthetic {args.weights_mb:.0f} MB model (ultralytics not installed)")
+
+
+def load_frames(n):
+    cap = cv2.VideoCapture(PARK)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames or [np.zeros((720, 1280, 3), dtype=np.uint8)]
+
+
+def run(mode, load, channels, frames, seconds, imgsz):
+    base = rss_mb()
+    stop = threading.Event()
+    counts = [0] * channels
+    service = None
+    if mode == "shared":
+        service = InferenceService(LoadedModel(load(), "bench", None, 0.0, 0.0))
+        service.clients = channels
+        infer = lambda i, frame: service.predict(frame, imgsz=imgsz, verbose=False)
+        models = []
+    else:
+        models = [load() for _ in range(channels)]
+        infer = lambda i, frame: models[i](frame, imgsz=imgsz, verbose=False)
+
+    def channel(i):
+        k = i
+        while not stop.is_set():
+            infer(i, frames[k % len(frames)])
+            counts[i] += 1
+            k += 1
+
+    threads = [threading.Thread(target=channel, args=(i,), daemon=True) for i in range(channels)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    grown = rss_mb() - base
+    avg_batch = service.avg_batch if service else 1.0
+    if service:
+        service.close()
+    del models
+    return grown, sum(counts) / seconds, avg_batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--model", default="yolo11m.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--weights-mb", type=float, default=80.0, help="synthetic fallback only")
+    parser.add_argument("--fixed-ms", type=float, default=15.0, help="synthetic fallback only")
+    parser.add_argument("--frame-ms", type=float, default=3.0, help="synthetic fallback only")
+    args = parser.parse_args()
+
+    load, source = make_loader(args)
+    frames = load_frames(30)
+    print(f"{source}, {args.channels} channels, {args.seconds:.0f} s per mode")
+    for mode in ("per-channel", "shared"):
+        grown, fps, avg_batch = run(mode, load, args.channels, frames, args.seconds, args.imgsz)
+        print(f"{mode:<12} RSS +{grown:7.1f} MB  {fps:7.1f} frames/s  avg batch {avg_batch:.1f}")
@@ -0,0 +1,113 @@
+"""
+Serial vs batched OCR: ROIs/sec for OCRProcessor.process_frame one ROI at a
+time against process_batch over --batch-sizes ROIs per call.
+
+ROIs are --roi-size crops of rtsp_streamer/videos/park.mp4 frames at
+different positions (as if each came from a different channel). Reports
+throughput and how many ROIs got the same text from both paths.
+
+Runs the real ray_actors OCRProcessor when EasyOCR is installed; otherwise it
+falls back to a synthetic engine that costs --fixed-ms per reader call (text
+detector pass + launch overhead, which batching amortizes) plus --roi-ms per
+ROI.
+
+    python -m benchmarks.bench_ocr_batch --rois 32 --batch-sizes 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PARK = os.path.join(ROOT, 'rtsp_streamer', 'videos', 'park.mp4')
+
+
+class SyntheticOCR:
+    def __init__(self, fixed_ms, roi_ms):
+        self.fixed_ms = fixed_ms
+        self.roi_ms = roi_ms
+
+    def _result(self, roi, ms):
+        return {'text': str(int(roi.mean())), 'lot': '', 'expiry': '', 'lines': [],
+                'processing_time_ms': ms, 'text_count': 1, 'device': 'cpu', 'ocr_image_path': '_EMPTY'}
+
+    def process_frame(self, frame, rotate_90_clock=True, save_frame=True):
+        time.sleep((self.fixed_ms + self.roi_ms) / 1000.0)
+        return self._result(frame, self.fixed_ms + self.roi_ms)
+
+    def process_batch(self, frames, rotate_90_clock=True, save_frame=True, channel_names=None):
+        time.sleep((self.fixed_ms + self.roi_ms * len(frames)) / 1000.0)
+        return [self._result(f, self.fixed_ms / len(frames) + self.roi_ms) for f in frames]
+
+
+def make_processor(args):
+    sys.path.insert(0, os.path.join(ROOT, 'ray_actors'))
+    try:
+        from ocr_processor import OCRProcessor
+    except ImportError:
+        return (SyntheticOCR(args.fixed_ms, args.roi_ms),
+                f"synthetic OCR, {args.fixed_ms:.0f} ms/call + {args.roi_ms:.0f} ms/ROI (easyocr not installed)")
+    proc = OCRProcessor(channel_name='bench', languages=['en'], gpu=not args.cpu, shared=False)
+    return proc, f"EasyOCR on {proc.device}"
+
+
+def load_rois(n, size):
+    w, h = size
+    cap = cv2.VideoCapture(PARK)
+    rois = []
+    while len(rois) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        fh, fw = frame.shape[:2]
+        k = len(rois)
+        x = (k * 97) % max(1, fw - w)
+        y = (k * 53) % max(1, fh - h)
+        rois.append(frame[y:y + h, x:x + w].copy())
+    cap.release()
+    while len(rois) < n:
+        rois.append(np.full((h, w, 3), 40 * len(rois) % 255, dtype=np.uint8))
+    return rois
+
+
+def run_serial(proc, rois):
+    t0 = time.perf_counter()
+    out = [proc.process_frame(r, rotate_90_clock=False, save_frame=False) for r in rois]
+    return out, time.perf_counter() - t0
+
+
+def run_batched(proc, rois, batch):
+    t0 = time.perf_counter()
+    out = []
+    for i in range(0, len(rois), batch):
+        chunk = rois[i:i + batch]
+        out += proc.process_batch(chunk, rotate_90_clock=False, save_frame=False,
+                                  channel_names=[f"cam{j}" for j in range(i, i + len(chunk))])
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rois", type=int, default=32)
+    parser.add_argument("--roi-size", type=int, nargs=2, default=[320, 240], metavar=("W", "H"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--cpu", action="store_true", help="run EasyOCR on CPU")
+    parser.add_argument("--fixed-ms", type=float, default=120.0, help="synthetic fallback only")
+    parser.add_argument("--roi-ms", type=float, default=40.0, help="synthetic fallback only")
+    args = parser.parse_args()
+
+    proc, source = make_processor(args)
+    rois = load_rois(args.rois, tuple(args.roi_size))
+    print(f"{source}, {len(rois)} ROIs of {args.roi_size[0]}x{args.roi_size[1]}")
+    proc.process_frame(rois[0], rotate_90_clock=False, save_frame=False)  # warm-up
+
+    serial, secs = run_serial(proc, rois)
+    print(f"serial     {len(rois) / secs:6.1f} ROIs/s")
+    for batch in args.batch_sizes:
+        out, secs = run_batched(proc, rois, batch)
+        same = sum(a['text'] == b['text'] for a, b in zip(serial, out))
+        print(f"batch {batch:<4} {len(rois) / secs:6.1f} ROIs/s  same text as serial {same}/{len(rois)}")
@@ -0,0 +1,109 @@
+"""
+Inline OCR vs the shared OCRPool: per-channel detection fps and OCR memory.
+
+Mirrors ray_actors Detection.start_worker: --channels threads each run a
+detection loop (--detect-ms per frame) and trigger OCR on a stable ROI every
+--ocr-every frames. In "inline" mode the loop calls the (process-wide,
+locked) reader itself and stalls until it returns, which is what
+Detection.start_worker used to do; in "pool N" mode it submits the ROI to an
+OCRPool of N workers and keeps detecting, collecting the result on a later
+frame with at most one job in flight per channel.
+
+EasyOCR is not required: the synthetic reader holds --reader-mb of weights
+and costs --ocr-ms per call (GIL released, like EasyOCR's torch kernels).
+
+    python -m benchmarks.bench_ocr_pool --channels 8 --seconds 10 --pool-sizes 1 2 4
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from multi_processing.ocr_pool import OCRPool
+
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+class SyntheticOCR:
+    def __init__(self, reader_mb, ocr_ms, lock=None):
+        self.weights = np.ones(int(reader_mb * 2 ** 20 / 4), dtype=np.float32)  # touched, so resident
+        self.ocr_ms = ocr_ms
+        self.lock = lock or threading.Lock()
+        self.channel_name = None
+
+    def process_frame(self, roi, rotate_90_clock=True, save_frame=True):
+        with self.lock:
+            time.sleep(self.ocr_ms / 1000.0)
+        return {'text': 'LOT 1234 EXP 2027-01', 'text_count': 1}
+
+
+def run(pool_size, args):
+    base = rss_mb()
+    stop = threading.Event()
+    frames = [0] * args.channels
+    ocr_done = [0] * args.channels
+    roi = np.zeros((240, 320, 3), dtype=np.uint8)
+    pool = None
+    if pool_size:
+        pool = OCRPool(lambda i: SyntheticOCR(args.reader_mb, args.ocr_ms), size=pool_size, max_queue=4 * args.channels)
+    else:
+        shared = SyntheticOCR(args.reader_mb, args.ocr_ms)  # one shared reader, one lock
+
+    def channel(i):
+        job = None
+        n = 0
+        while not stop.is_set():
+            time.sleep(args.detect_ms / 1000.0)
+            n += 1
+            if job is not None and job.done():
+                job = None
+                ocr_done[i] += 1
+            if n % args.ocr_every == 0:
+                if pool is None:
+                    shared.process_frame(roi)
+                    ocr_done[i] += 1
+                elif job is None:
+                    job = pool.submit(f"cam{i}", roi)
+            frames[i] += 1
+
+    threads = [threading.Thread(target=channel, args=(i,), daemon=True) for i in range(args.channels)]
+    time.sleep(0.2)  # pool workers build their readers
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    grown = rss_mb() - base
+    if pool is not None:
+        pool.close()
+    fps = [f / args.seconds for f in frames]
+    return grown, min(fps), sum(fps) / len(fps), sum(ocr_done) / args.seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--detect-ms", type=float, default=30.0, help="YOLO time per frame")
+    parser.add_argument("--ocr-every", type=int, default=15, help="frames between OCR triggers per channel")
+    parser.add_argument("--ocr-ms", type=float, default=500.0)
+    parser.add_argument("--reader-mb", type=float, default=60.0)
+    args = parser.parse_args()
+
+    print(f"{args.channels} channels, detect {args.detect_ms:.0f} ms/frame, OCR {args.ocr_ms:.0f} ms "
+          f"every {args.ocr_every} frames, {args.seconds:.0f} s per mode")
+    for size in [0] + args.pool_sizes:
+        grown, worst, mean, ocr_rate = run(size, args)
+        mode = "inline" if size == 0 else f"pool {size}"
+        print(f"{mode:<8} detection fps/channel min {worst:5.1f} mean {mean:5.1f}  "
+              f"OCR {ocr_rate:4.1f} jobs/s  RSS +{grown:6.1f} MB")
@@ -0,0 +1,102 @@
+"""
+Viewer analytics from the rollup tables vs a GROUP BY over webhook_events.
+
+The table grows to each of --sizes, with one event every 8 s of synthetic
+time across 8 cameras. At each size, summarize_events runs for three
+queries: all time, the last 7 days, and one camera over the last 7 days.
+"raw" passes use_rollups=False, which is the single grouped scan the viewer
+ran before. "rollups" reads event_rollup_daily. Both give the same counts;
+the run checks that.
+
+The insert rate is measured while growing the table, with the FTS and
+rollup triggers active. For comparison, --sizes[0] events are also inserted
+into a fresh database with the rollup triggers dropped.
+
+    python -m benchmarks.bench_rollups --sizes 100000 300000 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TMP = tempfile.mkdtemp(prefix="oaix-db-")
+DB_FILE = os.path.join(TMP, "rollups.db")
+os.environ["OAIX_DB_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(ROOT, 'ray_actors'))
+
+from db.db_manager import Base, tune_sqlite  # noqa: E402  creates the schema in DB_FILE
+from db.db_migrations import migrate  # noqa: E402
+from db.event_search import EventQuery, summarize_events  # noqa: E402
+
+T0 = datetime(2026, 1, 1).timestamp()
+STEP_S = 8.0
+ROLLUP_TRIGGERS = ("event_rollups_ai", "event_rollups_ad", "event_rollups_au")
+
+
+def grow(conn, start, stop):
+    rng = random.Random(start)
+    rows = ((f"cam{i % 8}", f"A{rng.randrange(100000):05d}" if rng.random() < 0.8 else None,
+             f"{rng.randrange(2026, 2030)}-{rng.randrange(1, 13):02d}" if rng.random() < 0.9 else None,
+             f"IBUPROFEN 200MG LOT {i}", T0 + i * STEP_S) for i in range(start, stop))
+    t0 = time.perf_counter()
+    conn.executemany("INSERT INTO webhook_events (camera_name, lot, expiry, all_text, created_at, mime) "
+                     "VALUES (?, ?, ?, ?, datetime(?, 'unixepoch'), 'OCR_EVENT')", rows)
+    conn.commit()
+    return (stop - start) / (time.perf_counter() - t0)
+
+
+def timed(fn, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best * 1000
+
+
+def insert_rate_without_rollups(events):
+    path = os.path.join(TMP, "no-rollups.db")
+    engine = create_engine(f"sqlite:///{path}")
+    tune_sqlite(engine)
+    Base.metadata.create_all(engine)
+    migrate(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    for name in ROLLUP_TRIGGERS:
+        conn.execute(f"DROP TRIGGER {name}")
+    rate = grow(conn, 0, events)
+    conn.close()
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_FILE)
+    size = 0
+    for target in args.sizes:
+        rate = grow(conn, size, target)
+        size = target
+        newest = datetime.fromtimestamp(T0 + (size - 1) * STEP_S).replace(hour=0, minute=0, second=0)
+        week = dict(start=newest - timedelta(days=6), end=newest + timedelta(days=1))
+        cases = {"all time": EventQuery(), "7 days": EventQuery(**week),
+                 "cam3, 7 days": EventQuery(camera="cam3", **week)}
+        print(f"{size:>9} events, inserted at {rate:6.0f} rows/s with FTS + rollup triggers")
+        for label, query in cases.items():
+            raw, raw_ms = timed(lambda: summarize_events(conn, query, use_rollups=False))
+            rolled, rolled_ms = timed(lambda: summarize_events(conn, query))
+            assert raw == rolled, label
+            print(f"  {label:<13} raw {raw_ms:8.1f} ms   rollups {rolled_ms:6.2f} ms   ({raw.total} events)")
+    conn.close()
+    print(f"{args.sizes[0]} events inserted at {insert_rate_without_rollups(args.sizes[0]):6.0f} rows/s "
+          f"with the rollup triggers dropped")
@@ -0,0 +1,110 @@
+"""
+Showing a page of detection images: full JPEGs vs the thumbnail cache.
+
+The run writes --images synthetic 1920x1080 OCR frames as JPEG q95, as
+save_ocr_frame does, then shows them as one viewer page would:
+- "old" is display_image before the cache: read the whole file, decode it
+  at full size, and encode it again for the browser. st.image re-encodes a
+  PIL image; cv2 stands in for PIL here.
+- "lazy" is ThumbnailCache.get on an empty cache, which makes every
+  thumbnail. "warm" is the same page again.
+- "at save" is the per-frame cost of ThumbnailCache.put in the OCR
+  processor when OAIX_THUMBS_AT_SAVE=1.
+
+Per image, the run prints the time, the bytes read from the image
+directory (/mnt/c on WSL, slow to read) and the bytes sent to the browser.
+
+    python -m benchmarks.bench_thumbnails --images 100
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from multi_processing.thumbnails import ThumbnailCache
+
+
+def frames(n, w=1920, h=1080):
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+    for i in range(n):
+        frame = np.roll(base, i * 7, axis=1)
+        cv2.putText(frame, f"LOT A{i:05d} EXP 2027-01", (100, 500), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+        yield frame
+
+
+def write_frames(directory, n):
+    saved = []
+    for i, frame in enumerate(frames(n)):
+        jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes()
+        path = os.path.join(directory, f"ocr_frame_{i:06d}.jpg")
+        with open(path, "wb") as f:
+            f.write(jpeg)
+        saved.append((path, jpeg, frame))
+    return saved
+
+
+def old_page(paths):
+    read = sent = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        sent += len(cv2.imencode(".jpg", image)[1])
+        read += len(data)
+    return read, sent
+
+
+def cached_page(cache, paths):
+    sent = read = 0
+    for path in paths:
+        misses = cache.misses
+        sent += len(cache.get(path))
+        if cache.misses > misses:   # a miss reads the source once
+            read += os.path.getsize(path)
+    return read, sent
+
+
+def report(label, n, seconds, read, sent):
+    print(f"{label:<8} {seconds * 1000 / n:7.2f} ms/image   read {read / n / 1024:7.1f} KB/image   "
+          f"sent {sent / n / 1024:7.1f} KB/image")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="oaix-thumbs-")
+    try:
+        saved = write_frames(tmp, args.images)
+        paths = [p for p, _, _ in saved]
+        t0 = time.perf_counter()
+        read, sent = old_page(paths)
+        report("old", args.images, time.perf_counter() - t0, read, sent)
+
+        cache = ThumbnailCache(os.path.join(tmp, "lazy"))
+        for label in ("lazy", "warm"):
+            t0 = time.perf_counter()
+            read, sent = cached_page(cache, paths)
+            report(label, args.images, time.perf_counter() - t0, read, sent)
+        cache.close()
+
+        cache = ThumbnailCache(os.path.join(tmp, "at-save"))
+        t0 = time.perf_counter()
+        for path, jpeg, frame in saved:
+            cache.put(path, jpeg, frame)
+        put_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        read, sent = cached_page(cache, paths)
+        print(f"at save  {put_s * 1000 / args.images:7.2f} ms/frame in the OCR processor; "
+              f"first page then {(time.perf_counter() - t0) * 1000 / args.images:.2f} ms/image, "
+              f"{cache.misses} source reads")
+        cache.close()
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,92 @@
+"""
+Result transport benchmark: worker -> consumer events/sec and latency.
+
+Simulated detector workers publish detection events (same dict shape as
+detector_worker) for 5, 15 and 30 streams, round robin across workers, at a
+per-stream FPS (0 = as fast as possible). The consumer records the delay between
+the worker's put and its own get.
+
+    python -m benchmarks.bench_transport --seconds 3 --fps 30 --workers 2
+"""
+
+import argparse
+import time
+from multiprocessing import Event, Manager, Process, Queue
+
+import numpy as np
+
+from multi_processing.transport import TRANSPORTS, make_queue
+
+
+def _event(sid, boxes):
+    dets = [([100.0 + i, 200.0, 300.0, 400.0 + i], i % 80, 0.5) for i in range(boxes)]
+    return {"stream_id": sid, "event": "detections", "data": dets}
+
+
+def _worker(result_q, sids, fps, boxes, stop):
+    period = 1.0 / fps if fps > 0 else 0.0
+    msgs = {sid: _event(sid, boxes) for sid in sids}
+    next_t = time.time()
+    while not stop.is_set():
+        for sid in sids:
+            msg = msgs[sid]
+            msg["ts"] = time.time()
+            try:
+                result_q.put(msg, timeout=0.5)
+            except Exception:
+                pass
+        if period:
+            next_t += period
+            delay = next_t - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def _consumer(result_q, stop, out):
+    lat = []
+    while not stop.is_set():
+        try:
+            msg = result_q.get(timeout=0.1)
+        except Exception:
+            continue
+        lat.append((time.time() - msg["ts"]) * 1000.0)
+    out.put(lat)
+
+
+def run(transport, streams, workers, fps, boxes, seconds):
+    manager = Manager() if transport == "manager" else None
+    result_q = make_queue(transport, maxsize=1000, manager=manager, results=True)
+    stop, out = Event(), Queue()
+    sids = [f"cam{i}" for i in range(streams)]
+    procs = [Process(target=_worker, args=(result_q, sids[w::workers], fps, boxes, stop), daemon=True)
+             for w in range(workers)]
+    consumer = Process(target=_consumer, args=(result_q, stop, out), daemon=True)
+    consumer.start()
+    for p in procs:
+        p.start()
+    time.sleep(seconds)
+    stop.set()
+    lat = np.array(out.get() or [0.0])
+    for p in procs + [consumer]:
+        p.join(timeout=2)
+        if p.is_alive():
+            p.terminate()
+    if hasattr(result_q, "close") and transport == "shm":
+        result_q.close()
+    if manager is not None:
+        manager.shutdown()
+    print(f"{transport:<8} streams={streams:<3} events/s={len(lat) / seconds:9.1f}  "
+          f"lat_p50={np.percentile(lat, 50):7.2f} ms  lat_p99={np.percentile(lat, 99):7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="per-stream event rate, 0 = unpaced")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--boxes", type=int, default=20, help="detections per event")
+    parser.add_argument("--transports", nargs="+", default=list(TRANSPORTS))
+    args = parser.parse_args()
+    for streams in (5, 15, 30):
+        for transport in args.transports:
+            run(transport, streams, args.workers, args.fps, args.boxes, args.seconds)
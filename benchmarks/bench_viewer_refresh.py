@@ -0,0 +1,109 @@
+"""
+Viewer load and refresh cost as webhook_events grows.
+
+The table grows to each of --sizes, with one event every 8 s of synthetic
+time, so the newest 7 days always hold about the same number of events. At
+each size:
+- "old" is what load_detection_data did on every 30 s cache expiry: fetch
+  every event newest first. Building the DataFrame on top of that costs
+  more; this measures only the fetch.
+- "new load" is the viewer after its filters change: summarize_events over
+  the 7-day default range plus the first page.
+- "new refresh" adds --new events and then does what a rerun does: fetch
+  and summarize only id > last seen, and merge into the page.
+The peak Python memory of each step is measured with tracemalloc.
+
+    python -m benchmarks.bench_viewer_refresh --sizes 100000 300000 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix="oaix-db-"), "viewer.db")
+os.environ["OAIX_DB_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(ROOT, 'ray_actors'))
+
+import db.db_manager  # noqa: E402,F401  creates the schema in DB_FILE
+from db.event_search import (EventQuery, last_event_id, read_snapshot, search_events,  # noqa: E402
+                             summarize_events)
+
+T0 = datetime(2026, 1, 1).timestamp()
+STEP_S = 8.0
+
+
+def grow(conn, start, stop):
+    rng = random.Random(start)
+    rows = ((f"cam{i % 8}", f"A{rng.randrange(100000):05d}" if rng.random() < 0.8 else None,
+             f"{rng.randrange(2026, 2030)}-{rng.randrange(1, 13):02d}", f"IBUPROFEN 200MG LOT {i}",
+             T0 + i * STEP_S) for i in range(start, stop))
+    conn.executemany("INSERT INTO webhook_events (camera_name, lot, expiry, all_text, created_at, mime) "
+                     "VALUES (?, ?, ?, ?, datetime(?, 'unixepoch'), 'OCR_EVENT')", rows)
+    conn.commit()
+
+
+def measured(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    ms = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, ms, peak
+
+
+def old_load(conn):
+    return conn.execute("SELECT id, camera_name, lot, expiry, all_text, created_at, mime, image_path "
+                        "FROM webhook_events ORDER BY created_at DESC").fetchall()
+
+
+def new_load(conn, query):
+    with read_snapshot(conn):
+        summary = summarize_events(conn, query)
+        head = search_events(conn, query)
+        seen = last_event_id(conn)
+    return summary, head, seen
+
+
+def new_refresh(conn, query, summary, head, seen):
+    with read_snapshot(conn):
+        new = replace(query, since_id=seen)
+        summary.add(summarize_events(conn, new))
+        rows = search_events(conn, new).rows + head.rows
+        rows.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        seen = last_event_id(conn)
+    return rows[:query.limit], seen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--new", type=int, default=100, help="events arriving between refreshes")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_FILE)
+    size = 0
+    for target in args.sizes:
+        grow(conn, size, target)
+        size = target
+        newest = datetime.fromtimestamp(T0 + (size - 1) * STEP_S)
+        query = EventQuery(start=newest.replace(hour=0, minute=0, second=0) - timedelta(days=7),
+                           end=newest + timedelta(days=1), limit=100)
+        rows, old_ms, old_mb = measured(lambda: old_load(conn))
+        del rows
+        (summary, head, seen), load_ms, load_mb = measured(lambda: new_load(conn, query))
+        grow(conn, size, size + args.new)
+        size += args.new
+        _, refresh_ms, refresh_mb = measured(lambda: new_refresh(conn, query, summary, head, seen))
+        print(f"{size:>9} events | old full load {old_ms:7.0f} ms {old_mb:6.0f} MB | "
+              f"new load {load_ms:6.1f} ms {load_mb:5.1f} MB ({summary.total} in range) | "
+              f"refresh +{args.new} {refresh_ms:5.1f} ms {refresh_mb:4.1f} MB")
+    conn.close()
@@ -0,0 +1,134 @@
+"""
+Inline webhook POSTs vs WebhookDelivery against a slow local endpoint.
+
+--channels threads each run a detection loop (--frame-ms per frame) that
+fires an OCR event every --event-every frames, like ray_actors
+Detection.start_worker. "inline" posts with requests.post and a fresh
+connection per event (the old Webhook.send_webhook); "async" calls
+WebhookDelivery.submit. With --batch-events N a third mode, "batched",
+groups up to N events per POST (--batch-format json/ndjson, --multipart for
+binary JPEG parts). The local stub endpoint answers after --delay-ms.
+Reports per-channel loop fps, the worst loop iteration, events delivered per
+second, HTTP requests, bytes received and TCP connections opened.
+
+    python -m benchmarks.bench_webhook --channels 8 --seconds 10 --delay-ms 500 --senders 8
+    python -m benchmarks.bench_webhook --channels 32 --event-every 5 --batch-events 20 --multipart
+"""
+
+import argparse
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from multi_processing.webhook_delivery import WebhookDelivery
+
+
+def stub_endpoint(delay_s):
+    stats = {"events": 0, "requests": 0, "bytes": 0, "ports": set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(delay_s)
+            stats["requests"] += 1
+            stats["bytes"] += len(raw)
+            ctype = self.headers.get("Content-Type", "")
+            if ctype.startswith("application/json"):
+                body = json.loads(raw)
+                stats["events"] += len(body) if isinstance(body, list) else 1
+            elif ctype.startswith("application/x-ndjson"):
+                stats["events"] += raw.count(b"\n")
+            else:  # multipart: one imagePart reference per event
+                stats["events"] += raw.count(b'"imagePart"')
+            stats["ports"].add(self.client_address[1])
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/webhooks/camera", stats
+
+
+def run(mode, args):
+    server, url, stats = stub_endpoint(args.delay_ms / 1000.0)
+    body = {"cameraId": "", "lot": "A1234", "expiry": "2027-01", "mime": "detecton_data",
+            "all_text": "LOT A1234 EXP 2027-01",
+            "imageBase64": "data:image/jpeg;base64," + base64.b64encode(os.urandom(args.payload_kb * 768)).decode()}
+    delivery = None
+    if mode != "inline":
+        batch = dict(batch_events=args.batch_events, batch_window_s=args.batch_window_s,
+                     batch_format=args.batch_format, multipart=args.multipart) if mode == "batched" else {}
+        delivery = WebhookDelivery(spool_dir=tempfile.mkdtemp(prefix="webhook-spool-"), senders=args.senders, **batch)
+    stop = threading.Event()
+    frames = [0] * args.channels
+    worst = [0.0] * args.channels
+
+    def channel(i):
+        n = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            time.sleep(args.frame_ms / 1000.0)
+            n += 1
+            if n % args.event_every == 0:
+                event = dict(body, cameraId=f"cam{i}")
+                if delivery is None:
+                    try:
+                        requests.post(url, json=event, timeout=10)
+                    except requests.exceptions.RequestException:
+                        pass
+                else:
+                    delivery.submit(f"cam{i}", url, event)
+            frames[i] += 1
+            worst[i] = max(worst[i], (time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=channel, args=(i,), daemon=True) for i in range(args.channels)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    delivered = stats["events"]
+    if delivery is not None:
+        delivery.close(timeout=0)
+    server.shutdown()
+    server.server_close()
+    fps = sum(frames) / args.channels / args.seconds
+    return fps, max(worst), delivered / args.seconds, stats["requests"], stats["bytes"], len(stats["ports"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--frame-ms", type=float, default=30.0)
+    parser.add_argument("--event-every", type=int, default=30, help="frames between OCR events per channel")
+    parser.add_argument("--delay-ms", type=float, default=500.0, help="endpoint response time")
+    parser.add_argument("--senders", type=int, default=8, help="WebhookDelivery sender threads")
+    parser.add_argument("--payload-kb", type=int, default=60, help="base64 image size per event")
+    parser.add_argument("--batch-events", type=int, default=0, help="also run batch mode with this batch size")
+    parser.add_argument("--batch-window-s", type=float, default=1.0)
+    parser.add_argument("--batch-format", choices=("json", "ndjson"), default="json")
+    parser.add_argument("--multipart", action="store_true", help="batch mode: JPEGs as binary parts")
+    args = parser.parse_args()
+
+    print(f"{args.channels} channels, event every {args.event_every} frames, endpoint {args.delay_ms:.0f} ms, "
+          f"{args.seconds:.0f} s per mode")
+    modes = ("inline", "async", "batched") if args.batch_events > 1 else ("inline", "async")
+    for mode in modes:
+        fps, worst_ms, rate, reqs, nbytes, conns = run(mode, args)
+        print(f"{mode:<7} loop {fps:5.1f} fps/channel  worst iteration {worst_ms:7.1f} ms  "
+              f"delivered {rate:5.1f} events/s  {reqs} requests  {nbytes / 2 ** 20:6.1f} MB  connections {conns}")
@@ -0,0 +1,96 @@
+"""
+Encode time and payload size of the webhook image per OCR event.
+
+"old" replays what Detection.start_worker used to do: base64 the resized full
+frame, write the OCR image to disk with cv2.imwrite, cv2.imread it back,
+resize and base64 it again. "new" is the current path: the OCR image is
+encoded once for the disk file and webhook_image() either reuses those bytes
+(scale 1.0 at the saved quality) or encodes the in-memory image once at the
+configured size and quality. The OCR image is a centre crop of
+rtsp_streamer/videos/crowd.mp4 frames, as produced by _crop_expand.
+
+    python -m benchmarks.bench_webhook_image --events 100
+"""
+
+import argparse
+import base64
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from multi_processing.image_encoding import JpegSettings, encode_jpeg, webhook_image
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CROWD = os.path.join(ROOT, 'rtsp_streamer', 'videos', 'crowd.mp4')
+SAVED_QUALITY = 95
+
+
+def load_frames(n):
+    cap = cv2.VideoCapture(CROWD)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames or [np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8)]
+
+
+def roi_of(frame):
+    h, w = frame.shape[:2]
+    return frame[h // 4: 3 * h // 4, w // 4: 3 * w // 4]
+
+
+def half(img):
+    h, w = img.shape[:2]
+    return cv2.resize(img, (w // 2, h // 2), cv2.INTER_LINEAR)
+
+
+def b64(img, quality=95):
+    _, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return "data:image/jpeg;base64," + base64.b64encode(buf).decode()
+
+
+def old_event(frame, roi, path):
+    payload = b64(half(frame))
+    cv2.imwrite(path, roi)
+    saved = cv2.imread(path)
+    return b64(half(saved))
+
+
+def new_event(roi, path, settings):
+    jpeg = encode_jpeg(roi, SAVED_QUALITY)
+    with open(path, 'wb') as f:
+        f.write(jpeg)
+    return webhook_image(roi, settings, jpeg=jpeg, jpeg_quality=SAVED_QUALITY)
+
+
+def measure(fn, events):
+    t0 = time.perf_counter()
+    sizes = [len(fn(i)) for i in range(events)]
+    return (time.perf_counter() - t0) * 1000 / events, sum(sizes) / len(sizes) / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100)
+    args = parser.parse_args()
+
+    frames = load_frames(20)
+    rois = [roi_of(f).copy() for f in frames]
+    path = os.path.join(tempfile.mkdtemp(prefix="ocr-frames-"), "ocr_frame.jpg")
+    print(f"{args.events} events, frame {frames[0].shape[1]}x{frames[0].shape[0]}, "
+          f"OCR image {rois[0].shape[1]}x{rois[0].shape[0]} (incl. writing it to disk)")
+
+    ms, kb = measure(lambda i: old_event(frames[i % len(frames)], rois[i % len(rois)], path), args.events)
+    print(f"{'old: save + 2 encodes + imread':<36} {ms:6.2f} ms/event  payload {kb:6.1f} KB")
+    for label, settings in (("new: scale 0.5 q95 (default)", JpegSettings()),
+                            ("new: scale 1.0 q95 (reuse saved)", JpegSettings(scale=1.0, quality=95)),
+                            ("new: scale 0.5 q80", JpegSettings(quality=80)),
+                            ("new: max side 480 q70", JpegSettings(scale=1.0, max_side=480, quality=70))):
+        ms, kb = measure(lambda i: new_event(rois[i % len(rois)], path, settings), args.events)
+        print(f"{label:<36} {ms:6.2f} ms/event  payload {kb:6.1f} KB")
@@ -1,6 +1,8 @@
 python3 -m grpc_tools.protoc \
   -I proto \
-  --python_out=multprocessing/generated \
-  --grpc_python_out=multprocessing/generated \
-  --pyi_out=multprocessing/generated \
-  ./proto/server_commands.proto
\ No newline at end of file
+  --python_out=multi_processing/generated \
+  --grpc_python_out=multi_processing/generated \
+  --pyi_out=multi_processing/generated \
+  ./proto/server_commands.proto
+# generated stubs are imported as a package from the repo root
+sed -i 's/^import server_commands_pb2 as/from multi_processing.generated import server_commands_pb2 as/' multi_processing/generated/server_commands_pb2_grpc.py
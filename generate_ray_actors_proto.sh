@@ -3,4 +3,6 @@ python3 -m grpc_tools.protoc \
   --python_out=ray_actors/generated \
   --grpc_python_out=ray_actors/generated \
   --pyi_out=ray_actors/generated \
-  ./proto/server_commands.proto
\ No newline at end of file
+  ./proto/server_commands.proto
+# ray_actors scripts run from their own directory and import "generated.*"
+sed -i 's/^import server_commands_pb2 as/import generated.server_commands_pb2 as/' ray_actors/generated/server_commands_pb2_grpc.py
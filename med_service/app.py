@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import threading
 import hashlib
@@ -17,6 +18,12 @@ import utils
 from OAIX_GOCR_Detection import OAIX_GOCR_Detection as OCR
 # ----------------------
 
+# shared helpers live in the repo root packages (multi_processing/)
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from multi_processing.detections import as_lists, decode_results
+
 load_dotenv()
 
 # ---------- CONFIG ----------
@@ -46,14 +53,8 @@ class YoloDetect:
         self.model = YOLO(model_path)
 
     def predict(self, frame):
-        boxes, confs, clids = [], [], []
         results = self.model.predict(frame, iou=IOU, conf=MIN_CONF, verbose=False)
-        for r in results:
-            for b in r.boxes:
-                boxes.append(list(map(int, b.xyxy[0].tolist())))
-                confs.append(float(b.conf))
-                clids.append(int(b.cls))
-        return boxes, confs, clids
+        return as_lists(decode_results(results))
 
     @staticmethod
     def crop(frame, x1, y1, x2, y2):
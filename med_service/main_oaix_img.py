@@ -1,11 +1,19 @@
 import json
 import utils
 import os
+import sys
 from ultralytics import YOLO
 import cv2
 from OAIX_GOCR_Detection import OAIX_GOCR_Detection as OCR
 from PIL import Image
 from dotenv import load_dotenv
+
+# shared helpers live in the repo root packages (multi_processing/)
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from multi_processing.detections import as_lists, decode_results
+
 load_dotenv()
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__)))
@@ -25,17 +33,8 @@ class YoloDetect():
         return self.model.names[clsid]
 
     def predict(self, frame):
-        boxes = []
-        confs = []
-        clids = [] 
         results = self.model.predict(frame, iou=0.4, conf=0.3, verbose=False)
-        for r in results:
-            for b in r.boxes:
-                boxes.append(list(map(int, b.xyxy[0].tolist())))
-                confs.append(round(float(b.conf), 2))
-                clids.append(int(b.cls))
-        
-        return boxes, confs, clids
+        return as_lists(decode_results(results), conf_decimals=2)
 
     def crop_frame_roi(self, frame, x1, x2, y1, y2):
         crop_frame = []
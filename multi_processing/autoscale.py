@@ -0,0 +1,45 @@
+"""
+Worker pool autoscaling policy for run_supervisor.
+
+scale_decision looks at the ACTIVE workers of a PlacementScheduler: streams
+per worker and the measured inference ms/frame. It asks for one more worker
+when either limit is exceeded. It retires one when the pool minus that
+worker would still sit under scale_down_ratio of both limits; the gap
+between the two thresholds keeps the pool from flapping. The supervisor
+carries out the decision: it warms up new workers before streams migrate
+onto them and drains workers before shutting them down.
+"""
+
+from typing import Optional, Tuple
+
+from multi_processing.placement import WORKER_ACTIVE, WORKER_RETIRED, PlacementScheduler
+
+SCALE_UP = "up"
+SCALE_DOWN = "down"
+
+
+def scale_decision(scheduler: PlacementScheduler, config) -> Optional[Tuple[str, Optional[int]]]:
+    """(SCALE_UP, None), (SCALE_DOWN, worker idx to drain) or None."""
+    if any(w.state not in (WORKER_ACTIVE, WORKER_RETIRED) for w in scheduler.workers):
+        return None  # one transition (warm-up or drain) at a time
+    active = scheduler.active()
+    n = len(active)
+    if n < max(config.min_workers, 1):
+        return SCALE_UP, None
+
+    streams = sum(len(w.streams) for w in active)
+    measured = [w.infer_ms for w in active if w.streams and w.infer_ms]
+    infer_ms = sum(measured) / len(measured) if measured else 0.0
+    over_ms = config.scale_up_infer_ms > 0 and infer_ms > config.scale_up_infer_ms
+
+    if n < config.max_workers and (streams / n > config.max_streams_per_worker or over_ms):
+        return SCALE_UP, None
+
+    if n > config.min_workers:
+        fits_streams = streams / (n - 1) <= config.scale_down_ratio * config.max_streams_per_worker
+        fits_ms = config.scale_up_infer_ms <= 0 or infer_ms <= config.scale_down_ratio * config.scale_up_infer_ms
+        if fits_streams and fits_ms:
+            # cheapest worker to drain: fewest streams, newest first on ties
+            victim = min(active, key=lambda w: (scheduler.load(w.idx), len(w.streams), -w.idx))
+            return SCALE_DOWN, victim.idx
+    return None
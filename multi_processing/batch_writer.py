@@ -0,0 +1,153 @@
+"""
+Background batched writer.
+
+ray_actors OAIX_db_Logger.app_logger and OAIX_db_Event.app_ocr_event opened a
+session, inserted one row and committed while holding a lock. Every channel
+thread that logged therefore waited for its own SQLite commit (an fsync),
+one thread at a time. Under an error storm that is thousands of commits a
+second.
+
+BatchWriter.put() only appends the row to an in-memory queue. One background
+thread hands the queued rows to write(rows) as a single call, which inserts
+them in one transaction. It does this once max_rows are waiting, or once the
+oldest has waited flush_ms.
+
+The queue holds at most queue_size rows. A put() on a full queue waits up
+to its timeout for room (the backpressure), then drops the row and counts it
+in `dropped`. When write() raises, its rows are counted in `failed` and are
+not retried, which matches the old per-row behaviour. flush() waits until
+everything queued before the call is written. close() flushes and stops the
+thread.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional
+
+
+class BatchWriter:
+    def __init__(self, write: Callable[[List[Any]], None], max_rows: int = 256, flush_ms: float = 200.0,
+                 queue_size: int = 10000, name: str = "batch-writer") -> None:
+        self.write = write
+        self.max_rows = max(1, int(max_rows))
+        self.flush_ms = flush_ms
+        self.queue_size = max(1, int(queue_size))
+        self.queued = 0
+        self.written = 0
+        self.batches = 0     # write() calls, i.e. transactions
+        self.dropped = 0     # put() gave up on a full queue
+        self.failed = 0      # rows whose write() raised
+        self.waited_s = 0.0  # time put() spent blocked on a full queue
+        self._rows: Deque[Any] = deque()
+        self._oldest = 0.0   # monotonic time of the oldest queued row
+        self._done = 0       # rows written or failed, in queue order
+        self._flushing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, row: Any, timeout: float = 0.0) -> bool:
+        """Queue row. On a full queue, wait up to timeout for room, then drop it and return False."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batch writer closed")
+            if len(self._rows) >= self.queue_size:
+                t0 = time.monotonic()
+                deadline = t0 + timeout
+                self._cond.notify_all()  # the writer may be waiting on its window
+                while len(self._rows) >= self.queue_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self.waited_s += time.monotonic() - t0
+                if len(self._rows) >= self.queue_size or self._closed:
+                    self.dropped += 1
+                    return False
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            self.queued += 1
+            if len(self._rows) >= self.max_rows:
+                self._cond.notify_all()
+            return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return self.queued - self._done
+
+    def _next(self) -> Optional[List[Any]]:
+        with self._cond:
+            while True:
+                if self._rows:
+                    wait = self._oldest + self.flush_ms / 1000.0 - time.monotonic()
+                    if len(self._rows) >= self.max_rows or self._flushing or self._closed or wait <= 0:
+                        n = min(self.max_rows, len(self._rows))
+                        batch = [self._rows.popleft() for _ in range(n)]
+                        self._oldest = time.monotonic()
+                        self._cond.notify_all()  # room for blocked put() calls
+                        return batch
+                elif self._closed:
+                    return None
+                else:
+                    wait = 1.0
+                self._cond.wait(min(max(wait, 0.0), 1.0))
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next()
+            if batch is None:
+                return
+            ok = True
+            try:
+                self.write(batch)
+            except Exception as e:
+                ok = False
+                print(f"{self._thread.name}: write of {len(batch)} rows failed: {e}")
+            with self._cond:
+                if ok:
+                    self.written += len(batch)
+                    self.batches += 1
+                else:
+                    self.failed += len(batch)
+                self._done += len(batch)
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"queued": self.queued, "written": self.written, "batches": self.batches,
+                    "dropped": self.dropped, "failed": self.failed, "pending": self.queued - self._done,
+                    "waited_s": round(self.waited_s, 3)}
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Write everything queued so far now; True once it is written (or failed) within timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self.queued
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._done < target:
+                    if deadline is None:
+                        self._cond.wait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                return self._done >= target
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """Refuse new rows, write the queued ones and stop. False if they weren't all written in time."""
+        with self._cond:
+            if self._closed:
+                return self._done >= self.queued
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        with self._cond:
+            return self._done >= self.queued
@@ -0,0 +1,70 @@
+"""
+Cross-stream frame batching for detector_worker.
+Holds the newest frame per stream and hands them to a single batched
+YOLO call, so N cameras on one worker cost one forward pass instead of N.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FrameBatcher:
+    def __init__(self, batch_size: int = 8, max_wait_ms: float = 10.0) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        # sid -> (arrival_ts, frame); dict keeps arrival order for fair draining
+        self._pending: Dict[str, Tuple[float, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, sid: str, frame, ts: Optional[float] = None) -> None:
+        """Queue the newest frame for sid, replacing any older frame still waiting."""
+        ts = time.monotonic() if ts is None else ts
+        if sid in self._pending:
+            # keep the original arrival time and queue position (assigning an existing key doesn't
+            # reorder the dict), so a busy stream can't starve the wait bound or itself in drain()
+            ts = self._pending[sid][0]
+        self._pending[sid] = (ts, frame)
+
+    def discard(self, sid: str) -> None:
+        self._pending.pop(sid, None)
+
+    def oldest_wait_ms(self, now: Optional[float] = None) -> float:
+        if not self._pending:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        oldest = min(ts for ts, _ in self._pending.values())
+        return (now - oldest) * 1000.0
+
+    def ready(self, expected: Optional[int] = None, now: Optional[float] = None) -> bool:
+        """
+        True when a batch should run: it is full, every expected stream has
+        delivered a frame, or the oldest frame has waited max_wait_ms.
+        """
+        n = len(self._pending)
+        if n == 0:
+            return False
+        if n >= self.batch_size:
+            return True
+        if expected is not None and n >= expected:
+            return True
+        return self.oldest_wait_ms(now) >= self.max_wait_ms
+
+    def drain(self) -> List[Tuple[str, Any]]:
+        """Pop up to batch_size (sid, frame) pairs in arrival order."""
+        sids = list(self._pending.keys())[:self.batch_size]
+        return [(sid, self._pending.pop(sid)[1]) for sid in sids]
+
+
+def infer_batch(model, items: List[Tuple[str, Any]], **predict_kwargs) -> List[Tuple[str, Any]]:
+    """
+    Run one forward pass over every frame in items and route each result back
+    to its stream id. Ultralytics returns one Results object per input image,
+    in input order.
+    """
+    if not items:
+        return []
+    frames = [frame for _, frame in items]
+    results = model(frames, **predict_kwargs)
+    return [(sid, r) for (sid, _), r in zip(items, results)]
@@ -0,0 +1,124 @@
+"""
+Per-stream capture readers for detector_worker.
+Each stream decodes continuously on its own thread and publishes only the
+newest frame, so one slow camera can't stall the other streams in the worker
+and frames never pile up in the FFmpeg buffers (same idea as RTSPReader in
+med_service/app.py).
+"""
+
+import math
+import os
+import time
+import threading
+from typing import Optional, Tuple
+
+import cv2
+
+# Must be set before the first cv2.VideoCapture is created; only applies to FFmpeg
+FFMPEG_LOW_LATENCY_OPTIONS = (
+    "rtsp_transport;tcp"
+    "|stimeout;5000000"
+    "|fflags;nobuffer"
+    "|flags;low_delay"
+    "|max_delay;0"
+)
+
+
+class StreamReader:
+    def __init__(self, stream_id: str, url: str, reconnect_attempts: int = 3,
+                 reconnect_delay_s: float = 2.0) -> None:
+        self.stream_id = stream_id
+        self.url = url
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay_s = reconnect_delay_s
+        self.error: Optional[str] = None
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        # decode at most max_fps frames/s; the rest are grab()bed and dropped (inf = decode all)
+        self.max_fps = math.inf
+        self._lock = threading.Lock()
+        self._latest: Optional[Tuple[int, float, object]] = None  # (seq, ts, frame_bgr)
+        self._seq = 0
+        self._stop = threading.Event()
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._thread = threading.Thread(target=self._run, name=f"reader-{stream_id}", daemon=True)
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def set_max_fps(self, fps: float) -> None:
+        self.max_fps = fps if fps and fps > 0 else math.inf
+
+    @property
+    def failed(self) -> bool:
+        """True once the reader gave up reconnecting; error holds the reason."""
+        return self.error is not None and not self._thread.is_alive()
+
+    def latest(self, after_seq: int = 0) -> Optional[Tuple[int, float, object]]:
+        """Newest (seq, ts, frame) if it is newer than after_seq, else None."""
+        with self._lock:
+            if self._latest is None or self._latest[0] <= after_seq:
+                return None
+            return self._latest
+
+    def _open(self) -> bool:
+        if self.url.startswith("rtsp://"):
+            os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_LOW_LATENCY_OPTIONS)
+        self._cap = cv2.VideoCapture(self.url)
+        if not self._cap.isOpened():
+            return False
+        try:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+        return True
+
+    def _release(self) -> None:
+        try:
+            if self._cap is not None:
+                self._cap.release()
+        except Exception:
+            pass
+        self._cap = None
+
+    def _run(self) -> None:
+        failures = 0
+        last_decode = 0.0
+        while not self._stop.is_set():
+            if not self._open():
+                self.error = "open_failed"
+            else:
+                while not self._stop.is_set():
+                    # grab() pulls the packet without decoding; retrieve() decodes once
+                    if not self._cap.grab():
+                        self.error = "read_failed"
+                        break
+                    now = time.monotonic()
+                    if not math.isinf(self.max_fps) and now - last_decode < 1.0 / self.max_fps:
+                        self.frames_skipped += 1
+                        continue
+                    last_decode = now
+                    ok, frame = self._cap.retrieve()
+                    if not ok or frame is None:
+                        self.error = "read_failed"
+                        break
+                    failures = 0
+                    self.error = None
+                    self.frames_decoded += 1
+                    with self._lock:
+                        self._seq += 1
+                        self._latest = (self._seq, time.time(), frame)
+            self._release()
+            if self._stop.is_set():
+                break
+            failures += 1
+            if failures > self.reconnect_attempts:
+                return
+            self._stop.wait(self.reconnect_delay_s)
+        self.error = None
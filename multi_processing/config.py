@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class WorkerConfig:
+    """
+    Settings shared by every detector_worker started by run_supervisor.
+    Kept as a plain dataclass so it pickles cleanly into the worker processes.
+    """
+    model_path: str = 'yolo11m.pt'
+    imgsz: int = 640
+    warmup_frames: int = 1  # dummy forward passes at imgsz before the worker takes streams
+    conf: float = 0.25
+    # Cross-stream batching: collect up to batch_size fresh frames (one per stream)
+    # and run a single forward pass. max_batch_wait_ms bounds how long the first
+    # frame in a partial batch can wait for the other streams before we run anyway.
+    batched: bool = True
+    batch_size: int = 8
+    max_batch_wait_ms: float = 10.0
+    # Capture: each stream decodes on its own reader thread and keeps only the newest frame
+    reconnect_attempts: int = 3
+    reconnect_delay_s: float = 2.0
+    # START cmds with "ring" read a FrameRing filled by a capture process; a ring whose producer
+    # hasn't written for this long is dropped as dead (keep it below stall_timeout_s)
+    ring_stale_s: float = 30.0
+    # IPC for command queues and result_q: manager | queue | pipe | shm (see transport.py)
+    transport: str = 'manager'
+    # 'shm' result slot size; larger events (e.g. a frame near YOLO's max_det=300 boxes, ~16 KB as
+    # dicts) span several slots, so this only trades ring memory (1000 x slot) against copies
+    result_slot_bytes: int = 16384
+    # Placement: new streams go to the least-loaded worker (stream weight * ms/frame);
+    # a live stream is moved when the busiest worker exceeds rebalance_ratio x the idlest.
+    default_infer_ms: float = 30.0
+    rebalance_ratio: float = 1.5
+    rebalance_interval_s: float = 10.0  # 0 disables live rebalancing
+    # Health supervision: respawn dead/stalled workers on the same GPU and replay their streams
+    respawn_workers: bool = True
+    health_interval_s: float = 1.0
+    startup_grace_s: float = 60.0      # no stall checks while the model loads
+    heartbeat_timeout_s: float = 15.0  # worker loop hasn't iterated (hung inference/CUDA)
+    stall_timeout_s: float = 60.0      # worker owns streams but processed no frames
+    result_put_timeout_s: float = 1.0  # longest the supervisor waits on result_q; the event is dropped after
+    # Autoscaling: run_supervisor(num_workers) is the starting pool size. The pool grows when
+    # streams per worker or ms/frame pass their limit and shrinks when one worker fewer would
+    # stay under scale_down_ratio of both. New workers warm up before streams migrate to them;
+    # removed workers are drained (streams moved away) before SHUTDOWN.
+    autoscale: bool = False
+    min_workers: int = 1
+    max_workers: int = 4
+    max_streams_per_worker: float = 8.0
+    scale_up_infer_ms: float = 0.0   # scale up when average ms/frame exceeds this, 0 = streams only
+    scale_down_ratio: float = 0.5
+    scale_cooldown_s: float = 30.0   # between scaling actions
+    warmup_timeout_s: float = 180.0  # a new worker that never reports ready is discarded
+    drain_timeout_s: float = 30.0    # a draining worker still alive after this is terminated
+    # FPS budget: per-stream target fps (START cmd "fps" overrides, 0 = unlimited). In adaptive
+    # mode the worker's capacity (fps_headroom * 1000 / ms per frame) is split fairly across its
+    # streams and frames over budget are skipped with grab() instead of being decoded.
+    target_fps: float = 0.0
+    adaptive_fps: bool = True
+    fps_headroom: float = 0.9
+    budget_interval_s: float = 1.0
+    stats_interval_s: float = 5.0  # per-stream "stats" events on result_q, 0 disables
+    # Motion gate: skip YOLO on static scenes and reuse the last detections
+    # (START cmd "motion_gate" overrides per stream)
+    motion_gate: bool = False
+    motion_threshold: float = 0.01     # fraction of changed thumbnail pixels that counts as motion
+    motion_max_skip_frames: int = 150  # force a full inference at least this often
+    # Detection events on result_q: "dict" (legacy list of tuples) or "packed"
+    # (12 bytes/box blob with frame index + timestamp, read with result_codec.DetectionsView)
+    result_format: str = 'dict'
+    # gRPC SubscribeDetections (grpc_results_serv.py): result_q is fanned out to every client
+    # through a bounded per-subscriber buffer that drops its oldest events when a client lags
+    grpc_port: int = 50052
+    subscriber_buffer: int = 256  # events; a client request's buffer_size overrides
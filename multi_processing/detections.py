@@ -0,0 +1,63 @@
+"""
+Vectorized decoding of ultralytics Results.
+
+Walking r.boxes and calling b.xyxy[0].tolist() / b.cls.item() / b.conf.item()
+forces one device->host sync per box. decode_results pulls boxes.data (the
+(N, 6) xyxy/conf/cls tensor, or (N, 7) with a track id) to the host in a single
+transfer per image and returns a compact structured array used by
+detector_worker, ray_actors Detection and med_service YoloDetect.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ('xyxy', '<f4', (4,)),
+    ('cls', '<i4'),
+    ('conf', '<f4'),
+])
+
+
+def empty_detections() -> np.ndarray:
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def decode_boxes(boxes) -> np.ndarray:
+    """Structured array of detections from one ultralytics Boxes object."""
+    if boxes is None:
+        return empty_detections()
+    data = getattr(boxes, 'data', boxes)
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()  # the single device->host transfer
+    data = np.asarray(data, dtype=np.float32)
+    if data.ndim != 2 or len(data) == 0:
+        return empty_detections()
+    dets = np.empty(len(data), dtype=DETECTION_DTYPE)
+    dets['xyxy'] = data[:, :4]
+    # columns are xyxy, [track_id], conf, cls
+    dets['conf'] = data[:, -2]
+    dets['cls'] = data[:, -1]
+    return dets
+
+
+def decode_results(results: Iterable) -> np.ndarray:
+    """Detections of every Results object (one image each), concatenated."""
+    parts = [decode_boxes(getattr(r, 'boxes', None)) for r in results if r is not None]
+    if not parts:
+        return empty_detections()
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def as_tuples(dets: np.ndarray, round_xyxy: bool = False) -> List[Tuple[list, int, float]]:
+    """Legacy [(xyxy list, cls, conf), ...] form, converted in bulk."""
+    xyxy = np.rint(dets['xyxy']).astype(np.int32) if round_xyxy else dets['xyxy']
+    return list(zip(xyxy.tolist(), dets['cls'].tolist(), dets['conf'].tolist()))
+
+
+def as_lists(dets: np.ndarray, conf_decimals: int = None) -> Tuple[List[list], List[float], List[int]]:
+    """(boxes, confs, clids) as returned by med_service YoloDetect.predict; boxes truncated to int."""
+    confs = dets['conf'].astype(np.float64)
+    if conf_decimals is not None:
+        confs = np.round(confs, conf_decimals)
+    return dets['xyxy'].astype(np.int32).tolist(), confs.tolist(), dets['cls'].tolist()
@@ -0,0 +1,64 @@
+"""
+Per-stream FPS budgets for detector_worker.
+
+Each stream may ask for a target FPS (0 = as fast as possible). In adaptive
+mode the worker's detection capacity (1000 / measured ms per frame) is split
+across its streams with max-min fairness: streams asking for less than an
+equal share get what they asked for and the remainder is shared by the rest.
+Readers then only decode frames at their allocated rate and skip the others
+with grab(), so latency stays bounded under overload instead of queuing up.
+"""
+
+import math
+import time
+from typing import Dict
+
+
+def allocate_fps(capacity_fps: float, targets: Dict[str, float]) -> Dict[str, float]:
+    """
+    Max-min fair split of capacity_fps over streams. A target <= 0 means
+    unlimited. Returns sid -> allocated fps (inf when uncapped and capacity is unknown).
+    """
+    wants = {sid: (t if t and t > 0 else math.inf) for sid, t in targets.items()}
+    if not wants:
+        return {}
+    if capacity_fps is None or capacity_fps <= 0 or math.isinf(capacity_fps):
+        return dict(wants)
+
+    alloc: Dict[str, float] = {}
+    remaining = capacity_fps
+    pending = sorted(wants.items(), key=lambda kv: kv[1])
+    while pending:
+        share = remaining / len(pending)
+        sid, want = pending[0]
+        if want <= share:
+            # satisfied below the fair share; give the leftover to the others
+            alloc[sid] = want
+            remaining -= want
+            pending.pop(0)
+            continue
+        for sid, _ in pending:
+            alloc[sid] = share
+        break
+    return alloc
+
+
+class RateMeter:
+    """Counts events and reports their rate over a rolling window."""
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self._since = time.monotonic()
+
+    def tick(self, n: int = 1) -> None:
+        self.count += n
+        self.total += n
+
+    def rate(self, reset: bool = True) -> float:
+        now = time.monotonic()
+        elapsed = max(now - self._since, 1e-6)
+        fps = self.count / elapsed
+        if reset:
+            self.count = 0
+            self._since = now
+        return fps
@@ -0,0 +1,257 @@
+"""
+Zero-copy frame transport between capture and inference processes.
+
+A FrameRing is one multiprocessing.shared_memory block per stream holding
+num_slots fixed-size frame slots. A single capture process writes decoded
+frames round robin; any number of detector_worker processes attach by name
+and read the newest slot without pickling. Every slot carries a sequence
+number and timestamp, and readers validate the sequence before and after
+copying so a slot overwritten mid-read is detected and retried.
+
+The producer stamps a heartbeat on every write and state change. A reader
+treats RING_FAILED as a failed source, RING_STOPPED as the end of the stream
+and a heartbeat older than stale_after_s as a dead producer (killed capture
+process), so the worker drops the stream instead of waiting on it until the
+supervisor declares it stalled.
+
+Layout:
+    [ ring header | slot headers * num_slots | slot data * num_slots ]
+"""
+
+import math
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+RING_HEADER = np.dtype([
+    ('write_seq', '<i8'),   # seq of the newest committed slot (0 = nothing written)
+    ('state', '<i8'),       # RING_* state written by the producer
+    ('num_slots', '<i8'),
+    ('slot_bytes', '<i8'),
+    ('heartbeat', '<f8'),   # time.time() of the producer's last write / state change
+])
+SLOT_HEADER = np.dtype([
+    ('seq', '<i8'),         # -1 while the writer is copying into the slot
+    ('ts', '<f8'),
+    ('h', '<i4'),
+    ('w', '<i4'),
+    ('c', '<i4'),
+    ('_pad', '<i4'),
+])
+
+RING_IDLE = 0
+RING_RUNNING = 1
+RING_FAILED = 2
+RING_STOPPED = 3
+
+
+def ring_name(stream_id: str) -> str:
+    return f"oaix_ring_{stream_id}"
+
+
+class FrameRing:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        self._header = np.ndarray((1,), dtype=RING_HEADER, buffer=shm.buf, offset=0)
+        self.num_slots = int(self._header['num_slots'][0])
+        self.slot_bytes = int(self._header['slot_bytes'][0])
+        self._slots = np.ndarray((self.num_slots,), dtype=SLOT_HEADER, buffer=shm.buf,
+                                 offset=RING_HEADER.itemsize)
+        data_offset = RING_HEADER.itemsize + SLOT_HEADER.itemsize * self.num_slots
+        self._data = np.ndarray((self.num_slots, self.slot_bytes), dtype=np.uint8, buffer=shm.buf,
+                                offset=data_offset)
+
+    @classmethod
+    def create(cls, name: str, max_height: int = 1080, max_width: int = 1920, channels: int = 3,
+               num_slots: int = 4) -> "FrameRing":
+        """Allocate a ring sized for frames up to max_height x max_width x channels."""
+        slot_bytes = max_height * max_width * channels
+        size = RING_HEADER.itemsize + SLOT_HEADER.itemsize * num_slots + slot_bytes * num_slots
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((1,), dtype=RING_HEADER, buffer=shm.buf, offset=0)
+        header[0] = (0, RING_IDLE, num_slots, slot_bytes, 0.0)
+        slots = np.ndarray((num_slots,), dtype=SLOT_HEADER, buffer=shm.buf, offset=RING_HEADER.itemsize)
+        slots['seq'] = 0
+        del header, slots  # drop buffer exports so close() can release the mapping
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_seq(self) -> int:
+        return int(self._header['write_seq'][0])
+
+    @property
+    def state(self) -> int:
+        return int(self._header['state'][0])
+
+    @property
+    def heartbeat(self) -> float:
+        return float(self._header['heartbeat'][0])
+
+    def beat(self) -> None:
+        self._header['heartbeat'][0] = time.time()
+
+    def set_state(self, state: int) -> None:
+        self._header['state'][0] = state
+        self.beat()
+
+    def write(self, frame: np.ndarray, ts: Optional[float] = None) -> int:
+        """Copy frame into the next slot and publish it. Single producer only."""
+        n = frame.nbytes
+        if n > self.slot_bytes:
+            raise ValueError(f"frame of {n} bytes does not fit ring slot of {self.slot_bytes} bytes")
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+        seq = self.write_seq + 1
+        idx = (seq - 1) % self.num_slots
+        slot = self._slots[idx:idx + 1]
+        slot['seq'] = -1
+        self._data[idx, :n] = np.ascontiguousarray(frame).reshape(-1)
+        slot['ts'] = time.time() if ts is None else ts
+        slot['h'], slot['w'], slot['c'] = h, w, c
+        slot['seq'] = seq
+        self._header['write_seq'][0] = seq
+        self.beat()
+        return seq
+
+    def latest(self, after_seq: int = 0, copy: bool = True,
+               retries: int = 3) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Newest (seq, ts, frame) newer than after_seq, else None.
+        With copy=False the frame is a view straight into shared memory; it
+        stays valid until the producer laps the ring (num_slots - 1 more writes),
+        which is_current(seq) can confirm after use.
+        """
+        for _ in range(retries):
+            seq = self.write_seq
+            if seq <= after_seq:
+                return None
+            idx = (seq - 1) % self.num_slots
+            slot = self._slots[idx]
+            if int(slot['seq']) != seq:
+                continue  # producer already lapped this slot, re-read the head
+            ts = float(slot['ts'])
+            h, w, c = int(slot['h']), int(slot['w']), int(slot['c'])
+            view = self._data[idx, :h * w * c].reshape((h, w, c) if c > 1 else (h, w))
+            frame = view.copy() if copy else view
+            if int(self._slots[idx]['seq']) != seq:
+                continue  # torn read
+            return seq, ts, frame
+        return None
+
+    def is_current(self, seq: int) -> bool:
+        """True if the slot holding seq has not been overwritten yet."""
+        idx = (seq - 1) % self.num_slots
+        return int(self._slots[idx]['seq']) == seq
+
+    def close(self) -> None:
+        # numpy views hold exports on shm.buf; release them before closing the mapping
+        self._header = self._slots = self._data = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class RingReader:
+    """
+    detector_worker side of a FrameRing. Exposes the same latest()/failed/stop()
+    surface as StreamReader so the inference loop doesn't care where frames come from.
+    """
+    def __init__(self, stream_id: str, name: str, stale_after_s: float = 30.0) -> None:
+        self.stream_id = stream_id
+        self.ring = FrameRing.attach(name)
+        # a producer still opening its source hasn't beaten yet: count from attach time
+        self.stale_after_s = stale_after_s
+        self._attached_at = time.time()
+        self.error: Optional[str] = None
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        # the capture process decodes every frame; the budget is applied on the read side
+        self.max_fps = math.inf
+        self._last_read = 0.0
+
+    def start(self) -> None:
+        pass
+
+    def set_max_fps(self, fps: float) -> None:
+        self.max_fps = fps if fps and fps > 0 else math.inf
+
+    def stop(self, timeout: float = 0.0) -> None:
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    @property
+    def failed(self) -> bool:
+        """True once the producer failed, stopped (end of stream) or died; error holds the reason."""
+        if self.ring is None:
+            return False
+        state = self.ring.state
+        if state == RING_FAILED:
+            self.error = "read_failed"
+        elif state == RING_STOPPED:
+            self.error = "stopped"
+        elif time.time() - (self.ring.heartbeat or self._attached_at) > self.stale_after_s:
+            self.error = "producer_dead"
+        else:
+            return False
+        return True
+
+    def latest(self, after_seq: int = 0) -> Optional[Tuple[int, float, np.ndarray]]:
+        if self.ring is None:
+            return None
+        now = time.monotonic()
+        if not math.isinf(self.max_fps) and now - self._last_read < 1.0 / self.max_fps:
+            return None
+        # copy out: the batch may outlive the slot when the camera is faster than inference
+        latest = self.ring.latest(after_seq=after_seq, copy=True)
+        if latest is not None:
+            # frames the producer wrote since our last read were never looked at
+            self.frames_skipped += max(0, latest[0] - after_seq - 1) if after_seq else 0
+            self.frames_decoded += 1
+            self._last_read = now
+        return latest
+
+
+def ring_capture_worker(stream_id: str, url: str, name: str) -> None:
+    """
+    Capture/decode process body: decode url continuously into the ring
+    named name (created by the supervisor) until the source ends.
+    """
+    import cv2
+
+    ring = FrameRing.attach(name)
+    ring.beat()
+    cap = cv2.VideoCapture(url)
+    try:
+        if not cap.isOpened():
+            ring.set_state(RING_FAILED)
+            return
+        ring.set_state(RING_RUNNING)
+        while True:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                ring.set_state(RING_FAILED)
+                break
+            ring.write(frame)
+    except KeyboardInterrupt:
+        ring.set_state(RING_STOPPED)
+    except Exception:
+        ring.set_state(RING_FAILED)
+        raise
+    finally:
+        cap.release()
+        ring.close()
@@ -1,6 +1,8 @@
+from google.protobuf.internal import containers as _containers
 from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
+from collections.abc import Iterable as _Iterable, Mapping as _Mapping
 from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
 
 DESCRIPTOR: _descriptor.FileDescriptor
@@ -11,18 +13,71 @@ class Command(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
     START: _ClassVar[Command]
     STOP: _ClassVar[Command]
     RESTART: _ClassVar[Command]
+
+class FrameOrientation(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    UNKNOWN_ORIENTATION: _ClassVar[FrameOrientation]
+    PORTRAIT: _ClassVar[FrameOrientation]
+    LANDSCAPE: _ClassVar[FrameOrientation]
+
+class Rotation(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    UNKNOWN_ROTATION: _ClassVar[Rotation]
+    ROTATE_0: _ClassVar[Rotation]
+    ROTATE_90: _ClassVar[Rotation]
+    ROTATE_180: _ClassVar[Rotation]
+    ROTATE_270: _ClassVar[Rotation]
+
+class ProcessorType(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    ANY: _ClassVar[ProcessorType]
+    GPU: _ClassVar[ProcessorType]
+    CPU: _ClassVar[ProcessorType]
 UNKNOWN: Command
 START: Command
 STOP: Command
 RESTART: Command
+UNKNOWN_ORIENTATION: FrameOrientation
+PORTRAIT: FrameOrientation
+LANDSCAPE: FrameOrientation
+UNKNOWN_ROTATION: Rotation
+ROTATE_0: Rotation
+ROTATE_90: Rotation
+ROTATE_180: Rotation
+ROTATE_270: Rotation
+ANY: ProcessorType
+GPU: ProcessorType
+CPU: ProcessorType
 
-class ExecuteCommandRequest(_message.Message):
-    __slots__ = ("command", "url")
+class ExecuteCommand(_message.Message):
+    __slots__ = ("command", "name", "call_back_url", "input_url", "frame_orientation", "rotation", "processor_type", "model_name", "motion_gate", "motion_threshold")
     COMMAND_FIELD_NUMBER: _ClassVar[int]
-    URL_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    CALL_BACK_URL_FIELD_NUMBER: _ClassVar[int]
+    INPUT_URL_FIELD_NUMBER: _ClassVar[int]
+    FRAME_ORIENTATION_FIELD_NUMBER: _ClassVar[int]
+    ROTATION_FIELD_NUMBER: _ClassVar[int]
+    PROCESSOR_TYPE_FIELD_NUMBER: _ClassVar[int]
+    MODEL_NAME_FIELD_NUMBER: _ClassVar[int]
+    MOTION_GATE_FIELD_NUMBER: _ClassVar[int]
+    MOTION_THRESHOLD_FIELD_NUMBER: _ClassVar[int]
     command: Command
-    url: str
-    def __init__(self, command: _Optional[_Union[Command, str]] = ..., url: _Optional[str] = ...) -> None: ...
+    name: str
+    call_back_url: str
+    input_url: str
+    frame_orientation: FrameOrientation
+    rotation: Rotation
+    processor_type: ProcessorType
+    model_name: str
+    motion_gate: bool
+    motion_threshold: float
+    def __init__(self, command: _Optional[_Union[Command, str]] = ..., name: _Optional[str] = ..., call_back_url: _Optional[str] = ..., input_url: _Optional[str] = ..., frame_orientation: _Optional[_Union[FrameOrientation, str]] = ..., rotation: _Optional[_Union[Rotation, str]] = ..., processor_type: _Optional[_Union[ProcessorType, str]] = ..., model_name: _Optional[str] = ..., motion_gate: bool = ..., motion_threshold: _Optional[float] = ...) -> None: ...
+
+class ExecuteCommandRequest(_message.Message):
+    __slots__ = ("execute_commands",)
+    EXECUTE_COMMANDS_FIELD_NUMBER: _ClassVar[int]
+    execute_commands: _containers.RepeatedCompositeFieldContainer[ExecuteCommand]
+    def __init__(self, execute_commands: _Optional[_Iterable[_Union[ExecuteCommand, _Mapping]]] = ...) -> None: ...
 
 class ExecuteCommandResponse(_message.Message):
     __slots__ = ("success", "message")
@@ -31,3 +86,51 @@ class ExecuteCommandResponse(_message.Message):
     success: bool
     message: str
     def __init__(self, success: bool = ..., message: _Optional[str] = ...) -> None: ...
+
+class SubscribeDetectionsRequest(_message.Message):
+    __slots__ = ("stream_ids", "events", "buffer_size")
+    STREAM_IDS_FIELD_NUMBER: _ClassVar[int]
+    EVENTS_FIELD_NUMBER: _ClassVar[int]
+    BUFFER_SIZE_FIELD_NUMBER: _ClassVar[int]
+    stream_ids: _containers.RepeatedScalarFieldContainer[str]
+    events: _containers.RepeatedScalarFieldContainer[str]
+    buffer_size: int
+    def __init__(self, stream_ids: _Optional[_Iterable[str]] = ..., events: _Optional[_Iterable[str]] = ..., buffer_size: _Optional[int] = ...) -> None: ...
+
+class Box(_message.Message):
+    __slots__ = ("x1", "y1", "x2", "y2", "cls", "conf")
+    X1_FIELD_NUMBER: _ClassVar[int]
+    Y1_FIELD_NUMBER: _ClassVar[int]
+    X2_FIELD_NUMBER: _ClassVar[int]
+    Y2_FIELD_NUMBER: _ClassVar[int]
+    CLS_FIELD_NUMBER: _ClassVar[int]
+    CONF_FIELD_NUMBER: _ClassVar[int]
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    cls: int
+    conf: float
+    def __init__(self, x1: _Optional[float] = ..., y1: _Optional[float] = ..., x2: _Optional[float] = ..., y2: _Optional[float] = ..., cls: _Optional[int] = ..., conf: _Optional[float] = ...) -> None: ...
+
+class DetectionEvent(_message.Message):
+    __slots__ = ("stream_id", "event", "boxes", "packed", "frame_idx", "ts", "motion_skipped", "payload_json", "dropped")
+    STREAM_ID_FIELD_NUMBER: _ClassVar[int]
+    EVENT_FIELD_NUMBER: _ClassVar[int]
+    BOXES_FIELD_NUMBER: _ClassVar[int]
+    PACKED_FIELD_NUMBER: _ClassVar[int]
+    FRAME_IDX_FIELD_NUMBER: _ClassVar[int]
+    TS_FIELD_NUMBER: _ClassVar[int]
+    MOTION_SKIPPED_FIELD_NUMBER: _ClassVar[int]
+    PAYLOAD_JSON_FIELD_NUMBER: _ClassVar[int]
+    DROPPED_FIELD_NUMBER: _ClassVar[int]
+    stream_id: str
+    event: str
+    boxes: _containers.RepeatedCompositeFieldContainer[Box]
+    packed: bytes
+    frame_idx: int
+    ts: float
+    motion_skipped: bool
+    payload_json: str
+    dropped: int
+    def __init__(self, stream_id: _Optional[str] = ..., event: _Optional[str] = ..., boxes: _Optional[_Iterable[_Union[Box, _Mapping]]] = ..., packed: _Optional[bytes] = ..., frame_idx: _Optional[int] = ..., ts: _Optional[float] = ..., motion_skipped: bool = ..., payload_json: _Optional[str] = ..., dropped: _Optional[int] = ...) -> None: ...
@@ -3,7 +3,7 @@
 import grpc
 import warnings
 
-import server_commands_pb2 as server__commands__pb2
+from multi_processing.generated import server_commands_pb2 as server__commands__pb2
 
 GRPC_GENERATED_VERSION = '1.74.0'
 GRPC_VERSION = grpc.__version__
@@ -39,6 +39,11 @@ class ServerCommandsStub(object):
                 request_serializer=server__commands__pb2.ExecuteCommandRequest.SerializeToString,
                 response_deserializer=server__commands__pb2.ExecuteCommandResponse.FromString,
                 _registered_method=True)
+        self.SubscribeDetections = channel.unary_stream(
+                '/server_commands.ServerCommands/SubscribeDetections',
+                request_serializer=server__commands__pb2.SubscribeDetectionsRequest.SerializeToString,
+                response_deserializer=server__commands__pb2.DetectionEvent.FromString,
+                _registered_method=True)
 
 
 class ServerCommandsServicer(object):
@@ -50,6 +55,12 @@ class ServerCommandsServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubscribeDetections(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ServerCommandsServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +69,11 @@ def add_ServerCommandsServicer_to_server(servicer, server):
                     request_deserializer=server__commands__pb2.ExecuteCommandRequest.FromString,
                     response_serializer=server__commands__pb2.ExecuteCommandResponse.SerializeToString,
             ),
+            'SubscribeDetections': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeDetections,
+                    request_deserializer=server__commands__pb2.SubscribeDetectionsRequest.FromString,
+                    response_serializer=server__commands__pb2.DetectionEvent.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'server_commands.ServerCommands', rpc_method_handlers)
@@ -95,3 +111,30 @@ class ServerCommands(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SubscribeDetections(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/server_commands.ServerCommands/SubscribeDetections',
+            server__commands__pb2.SubscribeDetectionsRequest.SerializeToString,
+            server__commands__pb2.DetectionEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
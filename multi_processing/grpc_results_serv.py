@@ -0,0 +1,103 @@
+"""
+gRPC front end for the multiprocessing supervisor results.
+
+SubscribeDetections streams result_q events (fanned out by ResultsHub) to any
+number of clients. Events are converted to DetectionEvent protos once in the
+hub thread; each client then only pays for its own send.
+"""
+
+import json
+from concurrent import futures
+
+import grpc
+
+from multi_processing.generated import server_commands_pb2 as pb2
+from multi_processing.generated import server_commands_pb2_grpc as pb2_grpc
+from multi_processing.result_codec import HEADER
+from multi_processing.results_hub import ResultsHub
+
+# Channel options for SubscribeDetections clients. With gRPC defaults (BDP probing) the
+# client's HTTP/2 window grows to megabytes and a slow client's backlog queues up in the
+# transport, seconds deep, where drop-oldest can't reach it. A small fixed window keeps
+# the backlog in the server-side subscriber buffer, so a lagging client gets fresh events.
+SUBSCRIBER_CHANNEL_OPTIONS = [
+    ("grpc.http2.bdp_probe", 0),
+    ("grpc.http2.lookahead_bytes", 4096),
+]
+
+_DETECTION_KEYS = ("stream_id", "event", "data", "packed", "motion_skipped", "frame_idx", "ts")
+
+
+def to_proto(msg: dict) -> pb2.DetectionEvent:
+    """result_q event -> DetectionEvent; packed blobs are forwarded as-is."""
+    ev = pb2.DetectionEvent(stream_id=msg.get("stream_id", ""), event=msg.get("event", ""))
+    if "packed" in msg:
+        ev.packed = msg["packed"]
+        ev.frame_idx, ev.ts, _ = HEADER.unpack_from(msg["packed"], 0)
+    elif "data" in msg:
+        ev.boxes.extend(
+            pb2.Box(x1=xyxy[0], y1=xyxy[1], x2=xyxy[2], y2=xyxy[3], cls=int(cls), conf=conf)
+            for xyxy, cls, conf in msg["data"]
+        )
+        ev.frame_idx = msg.get("frame_idx", 0)
+        ev.ts = msg.get("ts", 0.0)
+    ev.motion_skipped = bool(msg.get("motion_skipped", False))
+    extra = {k: v for k, v in msg.items() if k not in _DETECTION_KEYS}
+    if extra:
+        ev.payload_json = json.dumps(extra, default=str)
+    return ev
+
+
+def from_proto(ev: pb2.DetectionEvent) -> dict:
+    """DetectionEvent -> result_q style dict (packed events stay packed, see unpack_message)."""
+    msg = {"stream_id": ev.stream_id, "event": ev.event}
+    if ev.packed:
+        msg["packed"] = ev.packed
+    elif ev.event == "detections":
+        msg["data"] = [([b.x1, b.y1, b.x2, b.y2], b.cls, b.conf) for b in ev.boxes]
+    if ev.motion_skipped:
+        msg["motion_skipped"] = True
+    if ev.payload_json:
+        msg.update(json.loads(ev.payload_json))
+    if ev.dropped:
+        msg["dropped"] = ev.dropped
+    return msg
+
+
+class ResultsStreamer(pb2_grpc.ServerCommandsServicer):
+    def __init__(self, hub: ResultsHub, poll_s: float = 0.5) -> None:
+        self.hub = hub
+        self.poll_s = poll_s
+
+    def SubscribeDetections(self, request: pb2.SubscribeDetectionsRequest, context):
+        sub = self.hub.subscribe(request.stream_ids, request.events, request.buffer_size)
+        # wake the get() below as soon as the client goes away
+        context.add_callback(sub.close)
+        reported = 0
+        try:
+            while context.is_active() and not sub.closed:
+                ev = sub.get(timeout=self.poll_s)
+                if ev is None:
+                    continue
+                if sub.dropped != reported:
+                    # the hub shares one proto between subscribers; copy before stamping ours
+                    reported = sub.dropped
+                    shared, ev = ev, pb2.DetectionEvent()
+                    ev.CopyFrom(shared)
+                    ev.dropped = reported
+                yield ev
+        finally:
+            self.hub.unsubscribe(sub)
+
+
+def serve_results(hub: ResultsHub, port=50052, max_workers=64):
+    """Start (non-blocking) a gRPC server; every open subscription holds one worker thread.
+
+    Returns (server, bound port); port=0 picks a free one.
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    pb2_grpc.add_ServerCommandsServicer_to_server(ResultsStreamer(hub), server)
+    port = server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    print(f"gRPC results server listening on port:{port}")
+    return server, port
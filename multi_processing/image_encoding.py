@@ -0,0 +1,69 @@
+"""
+JPEG encoding for event images.
+
+The ray_actors webhook path used to encode the resized full frame to base64,
+then cv2.imread the JPEG save_ocr_frame had just written, resize it and
+encode it again: two encodes and a disk read per OCR event. The OCR result
+now carries the saved image in memory together with the JPEG bytes written
+to disk. webhook_image() turns that into the payload with at most one
+encode. If the configured size and quality match what is already encoded,
+it reuses the bytes and does no encode at all.
+"""
+
+import base64
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class JpegSettings:
+    scale: float = 0.5   # resize factor applied first (0.5 = the old resize_frame)
+    max_side: int = 0    # then cap the longer side (0 = no cap)
+    quality: int = 95    # cv2 default
+
+    def target_size(self, width: int, height: int):
+        w, h = width * self.scale, height * self.scale
+        if self.max_side and max(w, h) > self.max_side:
+            k = self.max_side / max(w, h)
+            w, h = w * k, h * k
+        return max(1, int(w)), max(1, int(h))
+
+
+def fit(image: np.ndarray, settings: JpegSettings) -> np.ndarray:
+    h, w = image.shape[:2]
+    size = settings.target_size(w, h)
+    if size == (w, h):
+        return image
+    return cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 95) -> bytes:
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buffer.tobytes()
+
+
+def to_base64(jpeg: bytes, include_data_url: bool = True) -> str:
+    encoded = base64.b64encode(jpeg).decode('ascii')
+    return f"data:image/jpeg;base64,{encoded}" if include_data_url else encoded
+
+
+def webhook_image(image: Optional[np.ndarray], settings: JpegSettings, jpeg: Optional[bytes] = None,
+                  jpeg_quality: Optional[int] = None, include_data_url: bool = True) -> str:
+    """
+    Base64 payload for image at settings, encoding at most once.
+
+    jpeg / jpeg_quality: bytes already encoded from image at full size (e.g. the file save_ocr_frame
+    wrote). They are reused as-is when settings keep the full size at that quality.
+    """
+    if jpeg is not None and (image is None or (
+            settings.target_size(image.shape[1], image.shape[0]) == (image.shape[1], image.shape[0])
+            and jpeg_quality == settings.quality)):
+        return to_base64(jpeg, include_data_url)
+    if image is None:
+        raise ValueError("webhook_image needs an image or reusable JPEG bytes")
+    return to_base64(encode_jpeg(fit(image, settings), settings.quality), include_data_url)
@@ -0,0 +1,153 @@
+"""
+Process-wide YOLO inference service shared by many threads.
+
+ray_actors DetectionManager runs one Detection thread per channel and each
+used to hold its own YOLO instance. get_service() returns one
+InferenceService per (weights file, device), shared by every channel using
+that model. Frames submitted from any thread go through one queue. A single
+inference thread runs whatever is queued (up to max_batch frames, waiting at
+most max_wait_ms for more) as one batched forward pass and resolves each
+caller's Future with its own Results object. The model is never called
+concurrently and weights live in memory once per process, not once per
+channel.
+
+Every get_service() is paired with a release_service() when the channel
+stops; the last release closes the service and frees its model.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from multi_processing.batching import infer_batch
+from multi_processing.model_registry import LoadedModel, get_model, release_model
+
+
+class InferenceService:
+    def __init__(self, loaded: LoadedModel, max_batch: int = 8, max_wait_ms: float = 2.0) -> None:
+        self.loaded = loaded
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.clients = 0    # channels handed this service by get_service and not released yet
+        self.frames = 0     # frames inferred
+        self.batches = 0    # forward passes run
+        self._q: "queue.Queue" = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"inference-{loaded.path}", daemon=True)
+        self._thread.start()
+
+    @property
+    def model(self):
+        return self.loaded.model
+
+    def submit(self, frame, **predict_kwargs) -> Future:
+        """Queue one frame; the Future resolves to its Results object."""
+        fut: Future = Future()
+        if self._closed.is_set():
+            fut.set_exception(RuntimeError("inference service closed"))
+            return fut
+        self._q.put((fut, frame, predict_kwargs))
+        return fut
+
+    def predict(self, frame, timeout: Optional[float] = None, **predict_kwargs):
+        return self.submit(frame, **predict_kwargs).result(timeout)
+
+    @property
+    def avg_batch(self) -> float:
+        return self.frames / self.batches if self.batches else 0.0
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        # take what is already queued at once; only wait for stragglers when other channels share us
+        wait_s = self.max_wait_ms / 1000.0 if self.clients > 1 else 0.0
+        deadline = time.monotonic() + wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            try:
+                first = self._q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+            # calls with different predict kwargs (imgsz, conf, device) can't share a forward pass
+            groups: Dict[tuple, list] = {}
+            for item in self._collect(first):
+                if item is None:
+                    self._closed.set()
+                    continue
+                fut, frame, kwargs = item
+                if fut.set_running_or_notify_cancel():
+                    groups.setdefault(tuple(sorted(kwargs.items())), []).append((fut, frame))
+            for key, items in groups.items():
+                self._infer(items, dict(key))
+        self._fail_pending()
+
+    def _infer(self, items: list, kwargs: dict) -> None:
+        try:
+            with self.loaded.lock:
+                outputs = infer_batch(self.loaded.model, items, **kwargs)
+        except Exception as e:
+            for fut, _ in items:
+                fut.set_exception(e)
+            return
+        self.batches += 1
+        self.frames += len(items)
+        for fut, r in outputs:
+            fut.set_result(r)
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(RuntimeError("inference service closed"))
+
+    def close(self) -> None:
+        self._closed.set()
+        self._q.put(None)
+        self._thread.join(timeout=5)
+
+
+_services: Dict[Tuple[str, Optional[str]], InferenceService] = {}
+_services_lock = threading.Lock()
+
+
+def get_service(path: str, device: Optional[str] = None, imgsz: int = 640, warmup_frames: int = 1,
+                max_batch: int = 8, max_wait_ms: float = 2.0) -> InferenceService:
+    """Shared service for a weights file; the model is loaded (and warmed up) by the first caller."""
+    key = (path, device)
+    # the registry already makes concurrent first callers share one load; don't hold the
+    # services lock through it, other models may be starting at the same time
+    loaded = get_model(path, device, imgsz, warmup_frames)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = InferenceService(loaded, max_batch, max_wait_ms)
+            _services[key] = service
+        service.clients += 1
+        return service
+
+
+def release_service(service: InferenceService) -> None:
+    """Give back one get_service(); the last client closes the service and releases its model."""
+    loaded = service.loaded
+    with _services_lock:
+        service.clients -= 1
+        last = service.clients <= 0
+        if last and _services.get((loaded.path, loaded.device)) is service:
+            del _services[(loaded.path, loaded.device)]
+    if last:
+        service.close()
+    release_model(loaded.path, loaded.device)
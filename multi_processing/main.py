@@ -2,105 +2,316 @@
 Multi-processing supervisor ( no external infra )
 Use this pattern when on a single machine ( 1 - 2 GPU or CPU )
 with 5 to 30 streams.  attach to a gRPC server to send commands
+results are streamed to gRPC clients via SubscribeDetections (grpc_results_serv.py)
 """
 
-from tabnanny import verbose
-import os, signal, time
+import os, time, math
 from multiprocessing import Process, Queue, Manager
 from queue import Empty
 from typing import Dict
-import torch, cv2
-from torch.cpu import stream
-from ultralytics import YOLO
+import numpy as np
+from multi_processing.batching import FrameBatcher, infer_batch
+from multi_processing.capture import StreamReader
+from multi_processing.config import WorkerConfig
+from multi_processing.detections import as_tuples, decode_results
+from multi_processing.fps_budget import RateMeter, allocate_fps
+from multi_processing.frame_ring import RingReader
+from multi_processing.model_registry import get_model
+from multi_processing.motion import MotionGate
+from multi_processing.placement import PlacementScheduler
+from multi_processing.result_codec import pack_detections, unpack_message
+from multi_processing.results_hub import ResultsHub
+from multi_processing.supervision import WorkerStats, WorkerSupervisor
+from multi_processing.transport import make_queue
 
 
-def run_supervisor(num_workers=2, gpus=(0,)):
-    manager = Manager()
-    cmd_qs, result_q = [], manager.Queue(maxsize=1000)
+def run_supervisor(num_workers=2, gpus=(0,), config:WorkerConfig=None):
+    config = config or WorkerConfig()
+    # Manager proxies are only needed for the original 'manager' transport
+    manager = Manager() if config.transport == "manager" else None
+    cmd_qs = []
+    result_q = make_queue(config.transport, maxsize=1000, manager=manager, results=True,
+                          slot_bytes=config.result_slot_bytes)
     workers = []
+    # heartbeats and inference ms/frame, written by the workers, read by the supervisor thread;
+    # sized for the largest pool autoscaling may grow to
+    stats = WorkerStats(max(num_workers, config.max_workers) if config.autoscale else num_workers)
+    gpu_ids = [gpus[i % len(gpus)] for i in range(num_workers)]
+
+    # assign streams to the least-loaded worker; STOP follows the stream to its owner
+    scheduler = PlacementScheduler(
+        gpu_ids,
+        send=lambda idx, cmd: cmd_qs[idx].put(cmd),
+        default_infer_ms=config.default_infer_ms,
+        rebalance_ratio=config.rebalance_ratio,
+        # commands for unknown streams come back as "error" events
+        report=lambda event: supervisor.publish(event)
+    )
+
+    def spawn(i):
+        gpu_id = scheduler.workers[i].gpu_id
+        p = Process(target=detector_worker, args=(cmd_qs[i], result_q, gpu_id, config, i, stats), daemon=True)
+        p.start()  # Start the worker process
+        return p
+
     # start N workers; map to GPUs round robin
     for i in range(num_workers):
-        q = manager.Queue(maxsize=200)
-        cmd_qs.append(q)
-        p = Process(target=detector_worker, args=(q, result_q, gpus[i % len(gpus)]), daemon=True)
-        workers.append(p)
-        p.start()  # Start the worker process
+        cmd_qs.append(make_queue(config.transport, maxsize=200, manager=manager))
+        workers.append(spawn(i))
+
+    # respawns dead/stalled workers (replaying their streams), rebalances placement and
+    # grows / shrinks the pool when config.autoscale is on
+    supervisor = WorkerSupervisor(
+        workers, cmd_qs, result_q, stats, scheduler,
+        spawn=spawn,
+        make_cmd_q=lambda: make_queue(config.transport, maxsize=200, manager=manager),
+        config=config,
+        gpus=gpus
+    )
+    supervisor.start()
 
-    # example: assign streams to workers by simple hash
     def dispatch(cmd):
-        sid = cmd.get("stream_id", "")
-        idx = hash(sid) % num_workers
-        cmd_qs[idx].put(cmd)
+        if cmd.get("type") == "SHUTDOWN":
+            return shutdown()
+        for slot in scheduler.workers:
+            scheduler.update_infer_ms(slot.idx, stats.infer_ms[slot.idx])
+        return scheduler.dispatch(cmd)
 
+    def shutdown(timeout=10.0):
+        """Stop supervision, retire every worker and send it SHUTDOWN, then wait for the processes to exit."""
+        supervisor.stop()
+        scheduler.shutdown()
+        deadline = time.time() + timeout
+        for p in workers:
+            if p is None:
+                continue
+            p.join(timeout=max(0.0, deadline - time.time()))
+            if p.is_alive():
+                p.terminate()
+                p.join(timeout=5)
+
+    dispatch.shutdown = shutdown
+    dispatch.scheduler = scheduler
+    dispatch.supervisor = supervisor
     return dispatch, result_q, workers, cmd_qs
 
 
-def detector_worker(cmd_q:Queue, result_q:Queue, gpu_id:int=0):
+def detector_worker(cmd_q:Queue, result_q:Queue, gpu_id:int=0, config:WorkerConfig=None,
+                    worker_idx:int=0, stats:WorkerStats=None):
+    config = config or WorkerConfig()
     os.environ["CUDA_VISIBLE_DEVICES"] = str(gpu_id)
-    model = YOLO('yolo11m.pt')
-    streams = {}
+    # loaded once per process and warmed up with dummy frames, so CUDA init / kernel selection
+    # isn't paid by the first real frames; the supervisor only migrates streams onto a ready worker
+    loaded = get_model(config.model_path, imgsz=config.imgsz, warmup_frames=config.warmup_frames)
+    model = loaded.model
+    if stats is not None:
+        stats.ready[worker_idx] = time.time()
+    streams: Dict[str, StreamReader] = {}
+    last_seq: Dict[str, int] = {}  # newest frame seq already queued per stream
+    target_fps: Dict[str, float] = {}  # requested fps per stream, 0 = unlimited
+    detected: Dict[str, RateMeter] = {}  # frames actually run through YOLO per stream
+    gates: Dict[str, MotionGate] = {}  # streams with motion-gated inference enabled
+    last_dets: Dict[str, np.ndarray] = {}  # reused while the motion gate reports a static scene
+    frame_meta: Dict[str, tuple] = {}  # (seq, ts) of the frame queued for inference per stream
+    started: Dict[str, float] = {}  # START time of streams that haven't had a frame inferred yet
+    ttfd_ms: Dict[str, float] = {}  # time-to-first-detection per stream
+    infer_ms_ema = 0.0
+    next_budget = next_stats = time.time()
+    # batch_size=1 degrades to the old one-forward-pass-per-frame behaviour
+    batcher = FrameBatcher(
+        batch_size=config.batch_size if config.batched else 1,
+        max_wait_ms=config.max_batch_wait_ms
+    )
+
+    def run_batch():
+        nonlocal infer_ms_ema
+        items = batcher.drain()
+        t0 = time.perf_counter()
+        outputs = infer_batch(model, items, imgsz=config.imgsz, conf=config.conf, verbose=False)
+        if items:
+            # EMA of ms/frame: drives the fps budget and the scheduler's load signal
+            ms = (time.perf_counter() - t0) * 1000.0 / len(items)
+            infer_ms_ema = ms if infer_ms_ema <= 0 else 0.8 * infer_ms_ema + 0.2 * ms
+            if stats is not None:
+                stats.infer_ms[worker_idx] = infer_ms_ema
+                stats.last_frame[worker_idx] = time.time()
+        for sid, r in outputs:
+            if sid in detected:
+                detected[sid].tick()
+            if sid in started:
+                report_first_detection(sid)
+            dets = decode_results([r])
+            if sid in gates:
+                last_dets[sid] = dets
+            emit_detections(sid, dets)
+
+    def report_first_detection(sid):
+        ttfd_ms[sid] = (time.time() - started.pop(sid)) * 1000.0
+        result_q.put({
+            "stream_id": sid,
+            "event": "first_detection",
+            "ttfd_ms": round(ttfd_ms[sid], 1),  # START received -> first frame through the model
+            "worker": worker_idx,
+            "model_load_ms": round(loaded.load_ms, 1),
+            "warmup_ms": round(loaded.warmup_ms, 1),
+        })
+
+    def emit_detections(sid, dets, **extra):
+        if not len(dets):  # Only send if there are detections
+            return
+        if config.result_format == "packed":
+            seq, ts = frame_meta.get(sid, (0, 0.0))
+            msg = {"stream_id": sid, "event": "detections", "packed": pack_detections(dets, seq, ts)}
+        else:
+            msg = {"stream_id": sid, "event": "detections", "data": as_tuples(dets)}
+        msg.update(extra)
+        result_q.put(msg)
     
+    def drop_stream(sid):
+        last_seq.pop(sid, None)
+        frame_meta.pop(sid, None)
+        started.pop(sid, None)
+        ttfd_ms.pop(sid, None)
+        target_fps.pop(sid, None)
+        detected.pop(sid, None)
+        gates.pop(sid, None)
+        last_dets.pop(sid, None)
+        batcher.discard(sid)
+        return streams.pop(sid)
+
     while True:
+        if stats is not None:
+            stats.heartbeat[worker_idx] = time.time()
+            stats.streams[worker_idx] = len(streams)
         try:
-            cmd = cmd_q.get(timeout=0.1)  # Use timeout instead of get_nowait()
+            # only block on the command queue while idle; readers keep decoding meanwhile
+            cmd = cmd_q.get(timeout=0.001 if streams else 0.1)
             
             if cmd["type"] == "START":
-                sid, url = cmd["stream_id"], cmd["rtsp"]  # Fixed typo: rstp -> rtsp
-                cap = cv2.VideoCapture(url)
-                streams[sid] = cap
+                sid = cmd["stream_id"]
+                if sid in streams:
+                    streams[sid].stop()
+                if cmd.get("ring"):
+                    # frames decoded by a separate capture process into shared memory
+                    reader = RingReader(sid, cmd["ring"], stale_after_s=config.ring_stale_s)
+                else:
+                    reader = StreamReader(sid, cmd["rtsp"],  # Fixed typo: rstp -> rtsp
+                        reconnect_attempts=config.reconnect_attempts,
+                        reconnect_delay_s=config.reconnect_delay_s)
+                reader.start()
+                streams[sid] = reader
+                last_seq[sid] = 0
+                started[sid] = time.time()
+                ttfd_ms.pop(sid, None)
+                target_fps[sid] = float(cmd.get("fps", config.target_fps))
+                detected[sid] = RateMeter()
+                gates.pop(sid, None)
+                last_dets.pop(sid, None)
+                if cmd.get("motion_gate", config.motion_gate):
+                    gates[sid] = MotionGate(
+                        threshold=config.motion_threshold,
+                        max_skip_frames=config.motion_max_skip_frames)
+                next_budget = time.time()  # re-split the budget with the new stream
                 print(f"Started stream {sid}")
                 
             elif cmd["type"] == "STOP":
                 sid = cmd["stream_id"]
                 if sid in streams:
-                    streams[sid].release()
-                    del streams[sid]
+                    drop_stream(sid).stop()
+                    next_budget = time.time()
                     print(f"Stopped stream {sid}")
                     
             elif cmd["type"] == "SHUTDOWN":
+                for reader in streams.values():
+                    reader.stop()
                 break
                 
         except Empty:
             pass  # No commands, continue to process streams
         
-        # Process all active streams
-        for sid, cap in list(streams.items()):
-            ok, frame = cap.read()
-            if not ok:
-                result_q.put({"stream_id":sid, "event":"error", "msg":"read_failed"})
-                cap.release()
-                del streams[sid]
+        now = time.time()
+        if streams and now >= next_budget:
+            # split detection capacity fairly; readers skip (grab only) frames over budget
+            capacity = None
+            if config.adaptive_fps and infer_ms_ema > 0:
+                capacity = config.fps_headroom * 1000.0 / infer_ms_ema
+            for sid, fps in allocate_fps(capacity, target_fps).items():
+                streams[sid].set_max_fps(fps)
+            next_budget = now + config.budget_interval_s
+
+        if streams and config.stats_interval_s > 0 and now >= next_stats:
+            for sid, reader in streams.items():
+                result_q.put({
+                    "stream_id": sid,
+                    "event": "stats",
+                    "fps": round(detected[sid].rate(), 2),  # effective detection fps
+                    "target_fps": target_fps[sid],
+                    "budget_fps": None if math.isinf(reader.max_fps) else round(reader.max_fps, 2),
+                    "frames_decoded": reader.frames_decoded,
+                    "frames_skipped": reader.frames_skipped,
+                    "infer_ms": round(infer_ms_ema, 2),
+                    "motion_skipped": gates[sid].frames_skipped if sid in gates else 0,
+                    "ttfd_ms": round(ttfd_ms[sid], 1) if sid in ttfd_ms else None,
+                })
+            next_stats = now + config.stats_interval_s
+
+        # Take whatever frames are fresh; never block on a slow camera
+        for sid, reader in list(streams.items()):
+            if reader.failed:
+                result_q.put({"stream_id":sid, "event":"error", "msg":reader.error or "read_failed"})
+                drop_stream(sid)
                 continue
-            
-            results = model(frame, imgsz=640, conf=0.25, verbose=False)
-            dets = []
-            for r in results:
-                if r is None: continue
-                for b in r.boxes:
-                    xyxy = b.xyxy[0].tolist()
-                    cls = int(b.cls.item())
-                    conf = float(b.conf.item())
-                    dets.append((xyxy, cls, conf))
-            
-            if dets:  # Only send if there are detections
-                result_q.put({"stream_id": sid, "event": "detections", "data": dets})
+
+            latest = reader.latest(after_seq=last_seq[sid])
+            if latest is None:
+                continue
+            seq, ts, frame = latest
+            last_seq[sid] = seq
+            frame_meta[sid] = (seq, ts)
+            gate = gates.get(sid)
+            if gate is not None and not gate.should_infer(frame):
+                # static scene: skip YOLO and reuse the last detections
+                if stats is not None:
+                    stats.last_frame[worker_idx] = time.time()
+                if sid in last_dets:
+                    emit_detections(sid, last_dets[sid], motion_skipped=True)
+                continue
+            batcher.add(sid, frame)
+            if len(batcher) >= batcher.batch_size:
+                run_batch()
+
+        # One batched forward pass once every stream has delivered or max wait expired
+        while batcher.ready(expected=len(streams)):
+            run_batch()
         
         time.sleep(0.001)  # tiny yield
 
 if __name__ == "__main__":
+    from multi_processing.grpc_results_serv import from_proto, serve_results, to_proto
+
     print("Starting")
-    dispatch, result_q, workers, _ = run_supervisor(num_workers=2, gpus=(0,))
+    config = WorkerConfig()
+    dispatch, result_q, workers, _ = run_supervisor(num_workers=2, gpus=(0,), config=config)
     print("run_supervisor complete")
     # example commands
     dispatch({"type":"START","stream_id":"cam1","rtsp":"rtsp://172.23.23.15:8554/mystream"})
     dispatch({"type":"START","stream_id":"cam2","rtsp":"rtsp://172.23.23.15:8554/mystream"})
     print("commands dispatched")
 
+    # result_q has a single reader: the hub, which fans out to gRPC subscribers
+    hub = ResultsHub(result_q, buffer_size=config.subscriber_buffer, encode=to_proto).start()
+    server, _ = serve_results(hub, port=config.grpc_port)
+    # local subscriber for console output (could be websockets / DB)
+    local = hub.subscribe()
     try:
         while True:
-            print("in while loop")
-            msg = result_q.get()
-            # forward to gRPC subscribers / websockets / DB
-            print(msg)
+            ev = local.get(timeout=1.0)
+            if ev is not None:
+                print(unpack_message(from_proto(ev)))
     except KeyboardInterrupt:
-        pass
\ No newline at end of file
+        pass
+    finally:
+        # supervision first, so the workers exiting on SHUTDOWN aren't respawned
+        dispatch.shutdown()
+        server.stop(grace=None)
+        hub.stop()
\ No newline at end of file
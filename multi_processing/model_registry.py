@@ -0,0 +1,114 @@
+"""
+Per-process model registry.
+
+Every detector_worker and every ray_actors Detection.start_worker used to call
+YOLO(path) itself and then pay for CUDA init / kernel selection on its first
+real frame. get_model() loads each (weights file, device) once per process,
+runs warmup_frames dummy forward passes at imgsz and hands out the ready
+model. Concurrent callers asking for a model that is still loading wait for
+that load instead of starting their own. Each get() is paired with a
+release(); the registry drops a model once its last user has released it.
+
+Ultralytics models are not safe to call from several threads at once: callers
+sharing a model across threads hold LoadedModel.lock around each call.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class LoadedModel:
+    model: object
+    path: str
+    device: Optional[str]
+    load_ms: float
+    warmup_ms: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+
+
+def _load_yolo(path: str, device: Optional[str]):
+    from ultralytics import YOLO
+
+    model = YOLO(path)
+    if device:
+        model.to(device)
+    return model
+
+
+class ModelRegistry:
+    def __init__(self, loader: Callable[[str, Optional[str]], object] = _load_yolo) -> None:
+        self.loader = loader
+        self._models: Dict[Tuple[str, Optional[str]], LoadedModel] = {}
+        self._loading: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, device: Optional[str] = None, imgsz: int = 640,
+            warmup_frames: int = 1) -> LoadedModel:
+        key = (path, device)
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        # one loader per key; everyone else blocks here until it is ready
+        with key_lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                loaded = self._load(path, device, imgsz, warmup_frames)
+                self._models[key] = loaded
+            loaded.users += 1
+            return loaded
+
+    def _load(self, path: str, device: Optional[str], imgsz: int, warmup_frames: int) -> LoadedModel:
+        t0 = time.perf_counter()
+        model = self.loader(path, device)
+        t1 = time.perf_counter()
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        kwargs = {"device": device} if device else {}
+        for _ in range(warmup_frames):
+            model(dummy, imgsz=imgsz, verbose=False, **kwargs)
+        t2 = time.perf_counter()
+        loaded = LoadedModel(model, path, device, (t1 - t0) * 1000.0, (t2 - t1) * 1000.0)
+        print(f"Model {path} loaded on {device or 'default device'} in {loaded.load_ms:.0f} ms, "
+              f"warm-up {warmup_frames}x{imgsz} in {loaded.warmup_ms:.0f} ms")
+        return loaded
+
+    def release(self, path: str, device: Optional[str] = None) -> None:
+        """Hand back one get(); the model is dropped (and its memory freed) when nobody uses it."""
+        key = (path, device)
+        with self._lock:
+            key_lock = self._loading.get(key)
+        if key_lock is None:
+            return
+        with key_lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                return
+            loaded.users -= 1
+            if loaded.users <= 0:
+                del self._models[key]
+                print(f"Model {path} on {device or 'default device'} released")
+
+    def loaded(self) -> Dict[Tuple[str, Optional[str]], LoadedModel]:
+        with self._lock:
+            return dict(self._models)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._loading.clear()
+
+
+registry = ModelRegistry()
+
+
+def get_model(path: str, device: Optional[str] = None, imgsz: int = 640, warmup_frames: int = 1) -> LoadedModel:
+    """Ready (loaded + warmed up) model from the process-wide registry."""
+    return registry.get(path, device, imgsz, warmup_frames)
+
+
+def release_model(path: str, device: Optional[str] = None) -> None:
+    registry.release(path, device)
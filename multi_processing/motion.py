@@ -0,0 +1,68 @@
+"""
+Motion-gated inference.
+
+A cheap pre-filter run before YOLO: the frame is downscaled to a small
+grayscale thumbnail and compared against the thumbnail of the last frame that
+went through inference. When the fraction of changed pixels stays under
+threshold the caller skips inference and reuses its last detections. A full
+inference is still forced every max_skip_frames so slow drift (lighting,
+objects creeping into view) can't hide forever.
+
+Shared by multi_processing.detector_worker and ray_actors Detection.start_worker.
+"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, threshold: float = 0.01, pixel_delta: int = 25, width: int = 160,
+                 max_skip_frames: int = 150) -> None:
+        self.threshold = threshold        # fraction of changed pixels that counts as motion
+        self.pixel_delta = pixel_delta    # per-pixel gray level change that counts as changed
+        self.width = width                # thumbnail width; height follows the aspect ratio
+        self.max_skip_frames = max_skip_frames
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.last_score = 0.0
+        self._reference: Optional[np.ndarray] = None
+        self._skipped_in_row = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, int(h * self.width / w))), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # blur away sensor noise / compression artifacts before differencing
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _changed(self, thumb: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that changed versus the reference frame."""
+        if self._reference is None or self._reference.shape != thumb.shape:
+            return 1.0
+        diff = cv2.absdiff(thumb, self._reference)
+        return float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """True when the scene changed enough (or too long since the last inference)."""
+        self.frames_seen += 1
+        thumb = self._thumbnail(frame)
+        self.last_score = self._changed(thumb)
+
+        if self.last_score >= self.threshold or self._skipped_in_row >= self.max_skip_frames:
+            self._reference = thumb
+            self._skipped_in_row = 0
+            return True
+        self._skipped_in_row += 1
+        self.frames_skipped += 1
+        return False
+
+    def reset(self) -> None:
+        self._reference = None
+        self._skipped_in_row = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.frames_skipped / self.frames_seen if self.frames_seen else 0.0
@@ -0,0 +1,179 @@
+"""
+Shared OCR worker pool.
+
+ray_actors Detection threads used to call OCRProcessor.process_frame inline,
+so a 300-800 ms EasyOCR call froze that channel's capture and YOLO loop, and
+every channel kept its own idle reader. OCRPool runs `size` worker threads,
+each owning one processor built by factory(i) (so OCR memory scales with the
+pool size, not the channel count). Channels submit ROI jobs and get a
+Future back.
+
+Jobs wait in one FIFO per channel and workers serve channels round robin, so a
+busy channel can't starve the others. A channel with max_pending_per_channel
+jobs already waiting has its oldest one cancelled (a newer ROI of the same
+scene is worth more), and submit() raises queue.Full when max_queue jobs are
+waiting overall.
+
+With max_batch > 1 and a processor that has process_batch(images,
+channel_names=..., **kwargs) (OCRProcessor does), a free worker takes up to
+max_batch waiting jobs at once, still round robin across channels, and runs
+each group with the same kwargs as one batched OCR call. It never waits for a
+batch to fill: batches only form when jobs are already queued.
+
+If factory raises (CUDA out of memory, missing weights), that worker exits.
+Once no worker has a processor, the pool has failed: every waiting job fails
+with the factory's exception, and submit() raises RuntimeError from it.
+"""
+
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+class OCRPool:
+    def __init__(self, factory: Callable[[int], object], size: int = 2, max_queue: int = 16,
+                 max_pending_per_channel: int = 2, max_batch: int = 1) -> None:
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_queue = max_queue
+        self.max_pending_per_channel = max(1, int(max_pending_per_channel))
+        self.max_batch = max(1, int(max_batch))
+        self.submitted = 0
+        self.completed = 0
+        self.calls = 0       # process_frame / process_batch calls
+        self.cancelled = 0   # superseded by a newer job of the same channel
+        self.rejected = 0    # queue.Full
+        self.processors: List[object] = [None] * self.size
+        self._jobs: "OrderedDict[str, Deque[Tuple[Future, object, dict]]]" = OrderedDict()
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._starting = self.size      # workers still building their processor
+        self._live = 0                  # workers with a processor
+        self.error: Optional[BaseException] = None   # set once every worker's factory has failed
+        self._threads = [threading.Thread(target=self._worker, args=(i,), name=f"ocr-pool-{i}", daemon=True)
+                         for i in range(self.size)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, channel: str, image, **kwargs) -> Future:
+        """Queue processor.process_frame(image, **kwargs) for channel; never blocks."""
+        fut: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OCR pool closed")
+            if self.error is not None:
+                raise RuntimeError(f"OCR pool failed: {self.error}") from self.error
+            jobs = self._jobs.setdefault(channel, deque())
+            if len(jobs) >= self.max_pending_per_channel:
+                old, _, _ = jobs.popleft()
+                old.cancel()
+                self._waiting -= 1
+                self.cancelled += 1
+            elif self._waiting >= self.max_queue:
+                self.rejected += 1
+                raise queue.Full(f"OCR queue full ({self._waiting} jobs)")
+            jobs.append((fut, image, kwargs))
+            self._waiting += 1
+            self.submitted += 1
+            self._cond.notify()
+        return fut
+
+    def pending(self, channel: Optional[str] = None) -> int:
+        with self._cond:
+            if channel is None:
+                return self._waiting
+            return len(self._jobs.get(channel, ()))
+
+    @property
+    def avg_batch(self) -> float:
+        return self.completed / self.calls if self.calls else 0.0
+
+    def _next_jobs(self, limit: int) -> List[Tuple[str, Future, object, dict]]:
+        with self._cond:
+            while not self._closed and not self._waiting:
+                self._cond.wait()
+            if self._closed:
+                return []
+            taken = []
+            while self._waiting and len(taken) < limit:
+                # round robin: first channel with work, which then goes to the back of the line
+                channel, jobs = next((c, j) for c, j in self._jobs.items() if j)
+                fut, image, kwargs = jobs.popleft()
+                self._jobs.move_to_end(channel)
+                self._waiting -= 1
+                taken.append((channel, fut, image, kwargs))
+            return taken
+
+    def _start(self, i: int) -> Optional[object]:
+        """Build worker i's processor; when the last one fails, fail the pool and every waiting job."""
+        try:
+            processor = self.factory(i)
+        except Exception as e:
+            print(f"OCR pool worker {i} failed to start: {e}")
+            with self._cond:
+                self._starting -= 1
+                if not self._starting and not self._live:
+                    self.error = e
+                    for jobs in self._jobs.values():
+                        for fut, _, _ in jobs:
+                            if fut.set_running_or_notify_cancel():
+                                fut.set_exception(e)
+                    self._jobs.clear()
+                    self._waiting = 0
+            return None
+        with self._cond:
+            self._starting -= 1
+            self._live += 1
+        return processor
+
+    def _worker(self, i: int) -> None:
+        processor = self.processors[i] = self._start(i)
+        if processor is None:
+            return
+        batch = getattr(processor, "process_batch", None) if self.max_batch > 1 else None
+        while True:
+            jobs = self._next_jobs(self.max_batch if batch else 1)
+            if not jobs:
+                return
+            # jobs with different kwargs (rotation, saving) can't share a call
+            groups: Dict[tuple, list] = {}
+            for channel, fut, image, kwargs in jobs:
+                if fut.set_running_or_notify_cancel():
+                    groups.setdefault(tuple(sorted(kwargs.items())), []).append((channel, fut, image))
+            for key, items in groups.items():
+                self._run(processor, batch, items, dict(key))
+
+    def _run(self, processor, batch, items: list, kwargs: dict) -> None:
+        try:
+            if batch is not None and len(items) > 1:
+                results = batch([image for _, _, image in items],
+                                channel_names=[channel for channel, _, _ in items], **kwargs)
+            else:
+                # results are saved / logged under the channel that asked for them
+                channel, _, image = items[0]
+                processor.channel_name = channel
+                results = [processor.process_frame(image, **kwargs)]
+        except Exception as e:
+            for _, fut, _ in items:
+                fut.set_exception(e)
+        else:
+            for (_, fut, _), result in zip(items, results):
+                fut.set_result(result)
+        with self._cond:
+            self.calls += 1
+            self.completed += len(items)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for jobs in self._jobs.values():
+                for fut, _, _ in jobs:
+                    fut.cancel()
+            self._jobs.clear()
+            self._waiting = 0
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
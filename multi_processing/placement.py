@@ -0,0 +1,232 @@
+"""
+Load-aware stream placement for run_supervisor.
+
+Replaces hash(sid) % num_workers (salted per process, blind to load) with a
+scheduler that tracks, per worker, the streams it owns, the measured
+inference ms/frame and its GPU id. New streams go to the worker whose load
+(stream weight * ms/frame) stays lowest after adding them, and live streams
+are moved (STOP on one worker, START on another) when load skews past
+rebalance_ratio.
+
+Slots follow the pool lifecycle used by autoscaling: a new worker is WARMING
+(model loading, gets no streams) until activated, and a worker being removed
+is DRAINING (streams moved away) until RETIRED. Only ACTIVE workers are
+placement targets.
+
+Commands without a stream_id go to every live worker. SHUTDOWN retires
+every slot before it is sent, so the supervisor sees workers that exit on
+purpose, not dead ones to respawn.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+WORKER_WARMING = "warming"
+WORKER_ACTIVE = "active"
+WORKER_DRAINING = "draining"
+WORKER_RETIRED = "retired"
+
+
+class WorkerSlot:
+    def __init__(self, idx: int, gpu_id: int, state: str = WORKER_ACTIVE) -> None:
+        self.idx = idx
+        self.gpu_id = gpu_id
+        self.state = state
+        self.streams: Dict[str, float] = {}  # sid -> weight
+        self.infer_ms: Optional[float] = None  # measured ms/frame, None until reported
+
+    @property
+    def weight(self) -> float:
+        return sum(self.streams.values())
+
+
+class PlacementScheduler:
+    def __init__(self, gpu_ids: Sequence[int], send: Callable[[int, dict], None],
+                 default_infer_ms: float = 30.0, rebalance_ratio: float = 1.5,
+                 report: Optional[Callable[[dict], None]] = None) -> None:
+        self.workers = [WorkerSlot(i, g) for i, g in enumerate(gpu_ids)]
+        self.send = send
+        self.report = report  # gets an "error" event for each command no worker could take
+        self.default_infer_ms = default_infer_ms
+        self.rebalance_ratio = rebalance_ratio
+        self.owner: Dict[str, int] = {}       # sid -> worker idx
+        self.start_cmds: Dict[str, dict] = {}  # sid -> START command, replayed on moves
+        self._lock = threading.Lock()
+
+    # ---------- load model ----------
+    def _ms(self, w: WorkerSlot) -> float:
+        return w.infer_ms if w.infer_ms is not None else self.default_infer_ms
+
+    def load(self, idx: int, extra_weight: float = 0.0) -> float:
+        w = self.workers[idx]
+        return (w.weight + extra_weight) * self._ms(w)
+
+    def update_infer_ms(self, idx: int, ms: float) -> None:
+        if ms > 0:
+            self.workers[idx].infer_ms = ms
+
+    def _gpu_weight(self, gpu_id: int) -> float:
+        return sum(w.weight for w in self.workers if w.gpu_id == gpu_id)
+
+    def active(self) -> List[WorkerSlot]:
+        return [w for w in self.workers if w.state == WORKER_ACTIVE]
+
+    def live(self) -> List[WorkerSlot]:
+        """Workers with a process: warming, active or draining."""
+        return [w for w in self.workers if w.state != WORKER_RETIRED]
+
+    def choose(self, weight: float = 1.0, exclude: int = None) -> int:
+        """Least-loaded active worker after adding a stream of the given weight."""
+        return min(
+            (w for w in self.active() if w.idx != exclude),
+            key=lambda w: (self.load(w.idx, weight), len(w.streams), self._gpu_weight(w.gpu_id), w.idx)
+        ).idx
+
+    # ---------- command routing ----------
+    def dispatch(self, cmd: dict) -> Optional[int]:
+        """
+        Send cmd to the worker owning its stream and return that worker's idx. Commands without a
+        stream_id go to every live worker, and commands for a stream no worker owns are dropped
+        and reported; both return None.
+        """
+        if cmd.get("type") == "SHUTDOWN":
+            self.shutdown()
+            return None
+        sid = cmd.get("stream_id", "")
+        with self._lock:
+            if not sid and cmd.get("type") != "START":
+                for w in self.live():
+                    self.send(w.idx, cmd)
+                return None
+            if cmd.get("type") == "START":
+                idx = self.owner.get(sid)
+                if idx is None:
+                    weight = float(cmd.get("weight", 1.0))
+                    idx = self.choose(weight)
+                    self.workers[idx].streams[sid] = weight
+                    self.owner[sid] = idx
+                self.start_cmds[sid] = cmd
+            elif sid in self.owner:
+                idx = self.owner[sid]
+                if cmd.get("type") == "STOP":
+                    self._forget(sid)
+            else:
+                idx = None
+            if idx is not None:
+                # in order with the STOP/START of a move that picks this stream up next
+                self.send(idx, cmd)
+                return idx
+        # never started (or already stopped): no worker has anything to do with it
+        if self.report is not None:
+            self.report({"stream_id": sid, "event": "error", "msg": f"unknown_stream: {cmd.get('type')}"})
+        return None
+
+    def shutdown(self) -> List[int]:
+        """Retire every live worker and send it SHUTDOWN; returns the workers told to exit."""
+        with self._lock:
+            live = [w.idx for w in self.live()]
+            for idx in live:
+                w = self.workers[idx]
+                w.state, w.infer_ms = WORKER_RETIRED, None
+                w.streams.clear()
+            self.owner.clear()
+            self.start_cmds.clear()
+            # retired before the command goes out: the supervisor never sees a live slot without a process
+            for idx in live:
+                self.send(idx, {"type": "SHUTDOWN"})
+        return live
+
+    def start_commands_for(self, idx: int) -> List[dict]:
+        """START commands of every stream owned by worker idx (replayed on respawn)."""
+        with self._lock:
+            return [self.start_cmds[sid] for sid, owner in self.owner.items() if owner == idx]
+
+    def _forget(self, sid: str) -> None:
+        idx = self.owner.pop(sid)
+        self.workers[idx].streams.pop(sid, None)
+        self.start_cmds.pop(sid, None)
+
+    # ---------- pool lifecycle ----------
+    def add_worker(self, gpu_id: int) -> int:
+        """New WARMING slot (a retired slot is reused); it gets streams once activated."""
+        with self._lock:
+            for w in self.workers:
+                if w.state == WORKER_RETIRED:
+                    w.gpu_id, w.state, w.infer_ms = gpu_id, WORKER_WARMING, None
+                    w.streams.clear()
+                    return w.idx
+            self.workers.append(WorkerSlot(len(self.workers), gpu_id, WORKER_WARMING))
+            return self.workers[-1].idx
+
+    def activate(self, idx: int) -> None:
+        with self._lock:
+            self.workers[idx].state = WORKER_ACTIVE
+
+    def drain(self, idx: int) -> List[Tuple[str, int, int]]:
+        """Stop placing on worker idx and move each of its streams to the least-loaded other worker."""
+        moves = []
+        with self._lock:
+            src = self.workers[idx]
+            src.state = WORKER_DRAINING
+            for sid, weight in sorted(src.streams.items(), key=lambda kv: -kv[1]):
+                dst = self.choose(weight, exclude=idx)
+                self.workers[dst].streams[sid] = weight
+                self.owner[sid] = dst
+                moves.append((sid, idx, dst))
+                # sent under the lock, so a concurrent STOP for sid lands after this START
+                self.send(idx, {"type": "STOP", "stream_id": sid})
+                self.send(dst, self.start_cmds[sid])
+            src.streams.clear()
+        return moves
+
+    def retire(self, idx: int) -> None:
+        with self._lock:
+            w = self.workers[idx]
+            w.state, w.infer_ms = WORKER_RETIRED, None
+            w.streams.clear()
+
+    # ---------- rebalancing ----------
+    def plan_move(self) -> Optional[Tuple[str, int, int]]:
+        """(sid, src, dst) for one move that reduces the peak load, or None."""
+        active = self.active()
+        if len(active) < 2:
+            return None
+        loads = {w.idx: self.load(w.idx) for w in active}
+        src = max(loads, key=lambda i: (loads[i], -i))
+        dst = min(loads, key=lambda i: (loads[i], i))
+        if len(self.workers[src].streams) < 2 or loads[src] <= self.rebalance_ratio * max(loads[dst], 1e-6):
+            return None
+        src_ms, dst_ms = self._ms(self.workers[src]), self._ms(self.workers[dst])
+        # heaviest stream whose move still lowers the peak of the two workers
+        for sid, weight in sorted(self.workers[src].streams.items(), key=lambda kv: -kv[1]):
+            if max(loads[src] - weight * src_ms, loads[dst] + weight * dst_ms) < loads[src]:
+                return sid, src, dst
+        return None
+
+    def rebalance(self) -> List[Tuple[str, int, int]]:
+        """Apply at most one move per call so load settles without thrashing."""
+        with self._lock:
+            move = self.plan_move()
+            if move is None:
+                return []
+            sid, src, dst = move
+            weight = self.workers[src].streams.pop(sid)
+            self.workers[dst].streams[sid] = weight
+            self.owner[sid] = dst
+            # queued before the lock is released: a STOP dispatched meanwhile can't be overtaken
+            self.send(src, {"type": "STOP", "stream_id": sid})
+            self.send(dst, self.start_cmds[sid])
+        print(f"Rebalanced stream {sid}: worker {src} -> worker {dst}")
+        return [move]
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [{
+                "worker": w.idx,
+                "gpu_id": w.gpu_id,
+                "state": w.state,
+                "streams": sorted(w.streams),
+                "infer_ms": w.infer_ms,
+                "load": self.load(w.idx),
+            } for w in self.workers]
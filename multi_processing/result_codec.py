@@ -0,0 +1,95 @@
+"""
+Compact binary encoding for detection events on result_q.
+
+The dict form {"stream_id", "event", "data": [(xyxy list, cls, conf), ...]}
+pickles every box as a tuple of Python objects. The packed form carries the
+same detections as one bytes blob:
+
+    header  : frame_idx (u64) | ts (f64) | count (u32)
+    records : count * (xyxy int16[4] | cls int16 | conf float16) = 12 bytes/box
+
+Consumers wrap the blob in a DetectionsView, which only parses the header up
+front and exposes the boxes as zero-copy NumPy views on demand.
+"""
+
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from multi_processing.detections import DETECTION_DTYPE
+
+PACKED_DTYPE = np.dtype([
+    ('xyxy', '<i2', (4,)),
+    ('cls', '<i2'),
+    ('conf', '<f2'),
+])
+HEADER = struct.Struct('<QdI')
+
+RESULT_FORMATS = ("dict", "packed")
+
+
+def pack_detections(dets: np.ndarray, frame_idx: int = 0, ts: float = 0.0) -> bytes:
+    """Pack a DETECTION_DTYPE array (see detections.decode_results) into bytes."""
+    packed = np.empty(len(dets), dtype=PACKED_DTYPE)
+    # pixel coordinates fit int16 for anything up to 32K wide frames
+    packed['xyxy'] = np.clip(np.rint(dets['xyxy']), -32768, 32767)
+    packed['cls'] = dets['cls']
+    packed['conf'] = dets['conf']
+    return HEADER.pack(int(frame_idx), float(ts), len(packed)) + packed.tobytes()
+
+
+class DetectionsView:
+    """Lazy, read-only view over a packed detections blob."""
+    __slots__ = ('_buf', 'frame_idx', 'ts', 'count', '_records')
+
+    def __init__(self, buf: bytes) -> None:
+        self._buf = buf
+        self.frame_idx, self.ts, self.count = HEADER.unpack_from(buf, 0)
+        self._records: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def records(self) -> np.ndarray:
+        if self._records is None:
+            self._records = np.frombuffer(self._buf, dtype=PACKED_DTYPE, count=self.count, offset=HEADER.size)
+        return self._records
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        return self.records['xyxy']
+
+    @property
+    def cls(self) -> np.ndarray:
+        return self.records['cls']
+
+    @property
+    def conf(self) -> np.ndarray:
+        return self.records['conf']
+
+    def to_array(self) -> np.ndarray:
+        """Full-precision DETECTION_DTYPE copy (float32 coordinates)."""
+        dets = np.empty(self.count, dtype=DETECTION_DTYPE)
+        dets['xyxy'] = self.xyxy
+        dets['cls'] = self.cls
+        dets['conf'] = self.conf
+        return dets
+
+    def to_tuples(self) -> List[Tuple[list, int, float]]:
+        """Legacy [(xyxy list, cls, conf), ...] form."""
+        return list(zip(self.xyxy.astype(np.float32).tolist(), self.cls.tolist(),
+                        self.conf.astype(np.float32).tolist()))
+
+
+def unpack_message(msg: dict) -> dict:
+    """Return a packed detection event in the legacy dict form; other messages pass through."""
+    if "packed" not in msg:
+        return msg
+    view = DetectionsView(msg["packed"])
+    out = {k: v for k, v in msg.items() if k != "packed"}
+    out["data"] = view.to_tuples()
+    out["frame_idx"] = view.frame_idx
+    out["ts"] = view.ts
+    return out
@@ -0,0 +1,136 @@
+"""
+Fan-out of result_q events to many subscribers.
+
+A single drain thread pulls events off result_q and hands each one to every
+matching subscriber. Each subscriber owns a bounded deque: when it is full the
+oldest event is dropped (and counted) instead of blocking, so a slow gRPC
+client loses stale detections but never back-pressures the hub or, through a
+full result_q, the detector workers.
+
+An optional encode callable (e.g. dict -> DetectionEvent proto) runs once per
+event, not once per subscriber, and only when at least one subscriber wants it.
+"""
+
+import threading
+from collections import deque
+from queue import Empty
+from typing import Any, Callable, Iterable, List, Optional
+
+
+def event_streams(msg: dict) -> List[str]:
+    """Stream ids an event belongs to (worker_restart events carry a list)."""
+    if "stream_id" in msg:
+        return [msg["stream_id"]]
+    return list(msg.get("streams", ()))
+
+
+class Subscription:
+    def __init__(self, stream_ids: Iterable[str] = (), events: Iterable[str] = (), buffer_size: int = 256) -> None:
+        self.stream_ids = frozenset(stream_ids)   # empty = every stream
+        self.events = frozenset(events)           # empty = every event type
+        self.buffer_size = buffer_size
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._buf = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+
+    def matches(self, msg: dict) -> bool:
+        if self.events and msg.get("event") not in self.events:
+            return False
+        if self.stream_ids and not self.stream_ids.intersection(event_streams(msg)):
+            return False
+        return True
+
+    def offer(self, item: Any) -> None:
+        """Never blocks; a full buffer drops its oldest item."""
+        with self._cond:
+            if len(self._buf) == self.buffer_size:
+                self.dropped += 1
+            self._buf.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Next item, or None on timeout / close."""
+        with self._cond:
+            if not self._buf and not self.closed:
+                self._cond.wait(timeout)
+            if not self._buf:
+                return None
+            self.delivered += 1
+            return self._buf.popleft()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+
+class ResultsHub:
+    def __init__(self, result_q=None, buffer_size: int = 256, encode: Callable[[dict], Any] = None,
+                 poll_s: float = 0.5) -> None:
+        self.result_q = result_q
+        self.buffer_size = buffer_size
+        self.encode = encode
+        self.poll_s = poll_s
+        self.published = 0
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, stream_ids: Iterable[str] = (), events: Iterable[str] = (),
+                  buffer_size: int = 0) -> Subscription:
+        sub = Subscription(stream_ids, events, buffer_size or self.buffer_size)
+        with self._lock:
+            # copy-on-write so publish() iterates without holding the lock
+            self._subs = self._subs + [sub]
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        sub.close()
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+
+    @property
+    def subscribers(self) -> List[Subscription]:
+        return self._subs
+
+    def publish(self, msg: dict) -> int:
+        """Hand msg to every matching subscriber; returns how many received it."""
+        self.published += 1
+        item = None
+        n = 0
+        for sub in self._subs:
+            if not sub.matches(msg):
+                continue
+            if item is None:
+                item = self.encode(msg) if self.encode else msg
+            sub.offer(item)
+            n += 1
+        return n
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                msg = self.result_q.get(timeout=self.poll_s)
+            except Empty:
+                continue
+            except (EOFError, OSError):
+                break  # queue closed underneath us
+            self.publish(msg)
+
+    def start(self) -> "ResultsHub":
+        self._thread = threading.Thread(target=self.run, name="results-hub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for sub in self._subs:
+            sub.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
@@ -0,0 +1,254 @@
+"""
+Worker health supervision for run_supervisor.
+
+Workers publish a heartbeat (every loop iteration) and the time of their last
+processed batch into shared arrays. WorkerSupervisor watches those, detects a
+dead process (OOM kill, CUDA abort) or a stalled one, respawns it on the same
+GPU with a fresh command queue, replays the START commands for the streams it
+owned and reports every restart on result_q (never waiting more than
+config.result_put_timeout_s on it: a full or wedged result channel costs
+the event, not supervision). It also drives the periodic
+placement rebalance and, with config.autoscale, grows and shrinks the pool:
+new workers only receive streams once their model is loaded and warmed up,
+and retired workers are drained before they get SHUTDOWN.
+
+Only WARMING and ACTIVE slots are health-checked. Every path that sends
+SHUTDOWN (drain, PlacementScheduler.shutdown) first moves the slot to
+DRAINING or RETIRED, so a worker that exits on request is never respawned.
+"""
+
+import time
+import threading
+from multiprocessing import Array
+from queue import Full
+from typing import Callable, List, Optional, Sequence
+
+from multi_processing.autoscale import SCALE_UP, scale_decision
+from multi_processing.placement import (WORKER_ACTIVE, WORKER_DRAINING, WORKER_WARMING,
+                                        PlacementScheduler)
+
+
+class WorkerStats:
+    """Shared per-worker counters; written by workers, read by the supervisor."""
+    def __init__(self, num_workers: int) -> None:
+        self.infer_ms = Array('d', num_workers, lock=False)    # EMA ms/frame
+        self.heartbeat = Array('d', num_workers, lock=False)   # time.time() of last loop iteration
+        self.last_frame = Array('d', num_workers, lock=False)  # time.time() of last processed batch
+        self.streams = Array('i', num_workers, lock=False)     # streams the worker is actively reading
+        self.ready = Array('d', num_workers, lock=False)       # time.time() the model finished warm-up
+
+    def __len__(self) -> int:
+        return len(self.heartbeat)
+
+    def reset(self, idx: int) -> None:
+        self.infer_ms[idx] = 0.0
+        self.heartbeat[idx] = 0.0
+        self.last_frame[idx] = 0.0
+        self.streams[idx] = 0
+        self.ready[idx] = 0.0
+
+
+class WorkerSupervisor:
+    def __init__(self, workers: List, cmd_qs: List, result_q, stats: WorkerStats,
+                 scheduler: PlacementScheduler, spawn: Callable[[int], object],
+                 make_cmd_q: Callable[[], object], config, gpus: Sequence[int] = ()) -> None:
+        self.workers = workers
+        self.cmd_qs = cmd_qs
+        self.result_q = result_q
+        self.stats = stats
+        self.scheduler = scheduler
+        self.spawn = spawn
+        self.make_cmd_q = make_cmd_q
+        self.config = config
+        self.gpus = list(gpus) or sorted({w.gpu_id for w in scheduler.workers})
+        self.restarts = [0] * len(workers)
+        self.started_at = [time.time()] * len(workers)
+        self.drain_started = {}  # idx -> time SHUTDOWN was queued
+        self.events_dropped = 0  # supervisor events result_q didn't take in time
+        self._next_scale = time.time() + config.scale_cooldown_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="worker-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop supervising; returns once the loop has exited (no restart or scaling step in flight)."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def supervised(self, idx: int) -> bool:
+        """True for slots whose process should be running; the others are exiting on purpose."""
+        return self.scheduler.workers[idx].state in (WORKER_WARMING, WORKER_ACTIVE)
+
+    def check(self, idx: int, now: Optional[float] = None) -> Optional[str]:
+        """Reason the worker needs a restart, or None if it looks healthy."""
+        now = time.time() if now is None else now
+        if not self.workers[idx].is_alive():
+            return "dead"
+        if now - self.started_at[idx] < self.config.startup_grace_s:
+            return None  # still loading / warming up the model
+        heartbeat = self.stats.heartbeat[idx]
+        if heartbeat and now - heartbeat > self.config.heartbeat_timeout_s:
+            return "heartbeat_timeout"
+        # failed cameras are dropped by the worker, so they don't count as a stall
+        last_frame = self.stats.last_frame[idx] or self.started_at[idx]
+        if self.stats.streams[idx] > 0 and now - last_frame > self.config.stall_timeout_s:
+            return "stalled"
+        return None
+
+    def restart(self, idx: int, reason: str) -> None:
+        if self._stop.is_set() or not self.supervised(idx):
+            return  # shut down (or retired) since the check
+        old = self.workers[idx]
+        if old.is_alive():
+            old.terminate()
+            old.join(timeout=5)
+        # fresh queue: the old one may hold stale commands or a lock the dead process owned
+        self.cmd_qs[idx] = self.make_cmd_q()
+        self.stats.reset(idx)
+        self.scheduler.workers[idx].infer_ms = None
+        self.workers[idx] = self.spawn(idx)
+        self.started_at[idx] = time.time()
+        self.restarts[idx] += 1
+
+        replayed = self.scheduler.start_commands_for(idx)
+        for cmd in replayed:
+            self.cmd_qs[idx].put(cmd)
+
+        msg = f"Worker {idx} restarted ({reason}), replayed {len(replayed)} streams"
+        print(msg)
+        self.publish({
+            "event": "worker_restart",
+            "worker": idx,
+            "gpu_id": self.scheduler.workers[idx].gpu_id,
+            "reason": reason,
+            "restarts": self.restarts[idx],
+            "streams": [cmd["stream_id"] for cmd in replayed],
+        })
+
+    # ---------- pool scaling ----------
+    def _pick_gpu(self) -> int:
+        """GPU running the fewest live workers."""
+        live = [w.gpu_id for w in self.scheduler.workers if w.state in (WORKER_WARMING, WORKER_ACTIVE)]
+        return min(self.gpus, key=lambda g: (live.count(g), self.gpus.index(g)))
+
+    def add_worker(self) -> int:
+        """Spawn a WARMING worker; streams move onto it once it reports warm-up."""
+        idx = self.scheduler.add_worker(self._pick_gpu())
+        if idx == len(self.workers):
+            self.workers.append(None)
+            self.cmd_qs.append(None)
+            self.restarts.append(0)
+            self.started_at.append(0.0)
+        self.cmd_qs[idx] = self.make_cmd_q()
+        self.stats.reset(idx)
+        self.workers[idx] = self.spawn(idx)
+        self.started_at[idx] = time.time()
+        print(f"Worker {idx} spawned on GPU {self.scheduler.workers[idx].gpu_id}, warming up")
+        return idx
+
+    def drain_worker(self, idx: int) -> None:
+        """Move the worker's streams away, then let it exit; _advance() retires it."""
+        moves = self.scheduler.drain(idx)
+        # queued behind the STOPs drain() just sent
+        self.cmd_qs[idx].put({"type": "SHUTDOWN"})
+        self.drain_started[idx] = time.time()
+        print(f"Worker {idx} draining, moved {len(moves)} streams")
+
+    def publish(self, event: dict) -> bool:
+        """Put event on result_q without stalling the supervisor loop; False (and counted) if dropped."""
+        try:
+            self.result_q.put(event, timeout=self.config.result_put_timeout_s)
+            return True
+        except Full:
+            self.events_dropped += 1
+            print(f"result_q full, dropped {event.get('event')} event ({self.events_dropped} so far)")
+            return False
+
+    def _report(self, action: str, idx: int, streams: List[str]) -> None:
+        self.publish({
+            "event": "worker_scaled",
+            "action": action,
+            "worker": idx,
+            "gpu_id": self.scheduler.workers[idx].gpu_id,
+            "workers": len(self.scheduler.active()),
+            "streams": streams,
+        })
+
+    def _advance(self, now: float) -> None:
+        """Activate warmed-up workers and retire drained ones."""
+        for slot in self.scheduler.workers:
+            idx = slot.idx
+            if slot.state == WORKER_WARMING and self.stats.ready[idx] > 0:
+                self.scheduler.activate(idx)
+                moved = []
+                for _ in range(len(self.scheduler.owner)):
+                    step = self.scheduler.rebalance()
+                    if not step:
+                        break
+                    moved += [sid for sid, _, dst in step if dst == idx]
+                print(f"Worker {idx} ready, took over {len(moved)} streams")
+                self._report("added", idx, moved)
+            elif slot.state == WORKER_WARMING and now - self.started_at[idx] > self.config.warmup_timeout_s:
+                self._terminate(idx)
+                self.scheduler.retire(idx)
+                self._report("add_failed", idx, [])
+            elif slot.state == WORKER_DRAINING:
+                if self.workers[idx].is_alive() and now - self.drain_started[idx] < self.config.drain_timeout_s:
+                    continue
+                self._terminate(idx)
+                self.scheduler.retire(idx)
+                self.stats.reset(idx)
+                self.drain_started.pop(idx, None)
+                print(f"Worker {idx} retired")
+                self._report("retired", idx, [])
+
+    def _terminate(self, idx: int) -> None:
+        proc = self.workers[idx]
+        if proc.is_alive():
+            proc.terminate()
+        proc.join(timeout=5)
+
+    def _refresh_infer_ms(self) -> None:
+        for slot in self.scheduler.workers:
+            self.scheduler.update_infer_ms(slot.idx, self.stats.infer_ms[slot.idx])
+
+    def autoscale(self, now: Optional[float] = None):
+        """One scaling step: finish pending transitions, then maybe start a new one."""
+        now = time.time() if now is None else now
+        self._advance(now)
+        if now < self._next_scale:
+            return None
+        self._refresh_infer_ms()
+        decision = scale_decision(self.scheduler, self.config)
+        if decision is None:
+            return None
+        action, idx = decision
+        if action == SCALE_UP:
+            self.add_worker()
+        else:
+            self.drain_worker(idx)
+        self._next_scale = now + self.config.scale_cooldown_s
+        return decision
+
+    def run(self) -> None:
+        next_rebalance = time.time() + self.config.rebalance_interval_s
+        while not self._stop.wait(self.config.health_interval_s):
+            if self.config.respawn_workers:
+                for slot in self.scheduler.workers:
+                    if self._stop.is_set() or not self.supervised(slot.idx):
+                        continue  # draining / retired workers exit on purpose
+                    reason = self.check(slot.idx)
+                    if reason:
+                        self.restart(slot.idx, reason)
+            if self._stop.is_set():
+                break
+            if self.config.autoscale:
+                self.autoscale()
+            if self.config.rebalance_interval_s > 0 and time.time() >= next_rebalance:
+                next_rebalance = time.time() + self.config.rebalance_interval_s
+                self._refresh_infer_ms()
+                self.scheduler.rebalance()
@@ -0,0 +1,179 @@
+"""
+Swappable IPC transports for run_supervisor command queues and result_q.
+
+    manager : multiprocessing.Manager().Queue proxies (original behaviour; every
+              put/get is a round trip through the manager server process)
+    queue   : native multiprocessing.Queue (pipe + feeder thread, pickled once)
+    pipe    : one-way multiprocessing.Pipe with a writer lock, no feeder thread
+    shm     : shared-memory ring of fixed-size slots (results only; command
+              queues fall back to native queues)
+
+All transports expose put(obj, block=True, timeout=None) and
+get(block=True, timeout=None) raising queue.Empty / queue.Full like queue.Queue.
+"""
+
+import pickle
+import time
+from multiprocessing import Lock, Pipe, Queue, Semaphore, shared_memory
+from queue import Empty, Full
+
+import numpy as np
+
+TRANSPORTS = ("manager", "queue", "pipe", "shm")
+
+
+class PipeQueue:
+    """
+    Many-writer, single-reader queue over a one-way Pipe. With maxsize > 0 a
+    semaphore counts the messages in flight, so put() blocks (or raises Full)
+    like Queue(maxsize) instead of growing the pipe without bound. put()'s
+    timeout also bounds the wait for the writer lock.
+    """
+    def __init__(self, maxsize: int = 0) -> None:
+        self._reader, self._writer = Pipe(duplex=False)
+        self._wlock = Lock()
+        self._spaces = Semaphore(maxsize) if maxsize > 0 else None
+
+    def put(self, obj, block=True, timeout=None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self._spaces is not None and not self._spaces.acquire(block, timeout):
+            raise Full
+        # the timeout covers the writer lock too: a writer killed mid-send never releases it
+        left = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not self._wlock.acquire(block, left):
+            if self._spaces is not None:
+                self._spaces.release()
+            raise Full
+        try:
+            self._writer.send(obj)
+        finally:
+            self._wlock.release()
+
+    def get(self, block=True, timeout=None):
+        if not self._reader.poll(timeout if block else 0):
+            raise Empty
+        obj = self._reader.recv()
+        if self._spaces is not None:
+            self._spaces.release()
+        return obj
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+
+class ShmResultRing:
+    """
+    Many-writer, single-reader ring of pickled messages in shared memory.
+    Messages are pickled once straight into a slot; the reader unpickles from
+    the slot. `spaces` (free slots) / `items` (messages) semaphores give
+    Queue-like blocking and backpressure. A message larger than slot_bytes
+    (a crowded frame's detections) spans as many consecutive slots as it
+    needs; only one larger than the whole ring raises ValueError.
+    """
+    _HEADER = np.dtype([('head', '<i8'), ('tail', '<i8')])
+    _LEN = np.dtype('<i4')
+
+    def __init__(self, maxsize: int = 1000, slot_bytes: int = 16384) -> None:
+        self.maxsize = maxsize
+        self.slot_bytes = slot_bytes
+        size = self._HEADER.itemsize + maxsize * (self._LEN.itemsize + slot_bytes)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._owner = True
+        self._wlock = Lock()
+        self._items = Semaphore(0)
+        self._spaces = Semaphore(maxsize)
+        self._map()
+        self._header['head'] = 0
+        self._header['tail'] = 0
+
+    def _map(self) -> None:
+        buf = self._shm.buf
+        self._header = np.ndarray((1,), dtype=self._HEADER, buffer=buf, offset=0)
+        offset = self._HEADER.itemsize
+        self._lens = np.ndarray((self.maxsize,), dtype=self._LEN, buffer=buf, offset=offset)
+        offset += self._LEN.itemsize * self.maxsize
+        self._slots = np.ndarray((self.maxsize, self.slot_bytes), dtype=np.uint8, buffer=buf, offset=offset)
+
+    def __getstate__(self):
+        return (self._shm.name, self.maxsize, self.slot_bytes, self._wlock, self._items, self._spaces)
+
+    def __setstate__(self, state):
+        name, self.maxsize, self.slot_bytes, self._wlock, self._items, self._spaces = state
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._map()
+
+    def _slots_for(self, nbytes: int) -> int:
+        return max(1, -(-nbytes // self.slot_bytes))
+
+    def put(self, obj, block=True, timeout=None) -> None:
+        data = np.frombuffer(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+        n = self._slots_for(len(data))
+        if n > self.maxsize:
+            raise ValueError(f"message of {len(data)} bytes exceeds the whole result ring "
+                             f"({self.maxsize} x {self.slot_bytes} bytes)")
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def left():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        # the write lock is held while the slots are claimed, so a multi-slot message stays contiguous
+        if not self._wlock.acquire(block, left()):
+            raise Full
+        try:
+            for taken in range(n):
+                if not self._spaces.acquire(block, left()):
+                    for _ in range(taken):
+                        self._spaces.release()
+                    raise Full
+            head = int(self._header['head'][0])
+            self._lens[head % self.maxsize] = len(data)
+            for k in range(n):
+                chunk = data[k * self.slot_bytes:(k + 1) * self.slot_bytes]
+                self._slots[(head + k) % self.maxsize, :len(chunk)] = chunk
+            self._header['head'] += n
+        finally:
+            self._wlock.release()
+        self._items.release()
+
+    def get(self, block=True, timeout=None):
+        if not self._items.acquire(block, timeout):
+            raise Empty
+        # single reader: tail is only touched here
+        tail = int(self._header['tail'][0])
+        size = int(self._lens[tail % self.maxsize])
+        n = self._slots_for(size)
+        if n == 1:
+            data = self._slots[tail % self.maxsize, :size].tobytes()
+        else:
+            data = b"".join(self._slots[(tail + k) % self.maxsize].tobytes() for k in range(n))[:size]
+        obj = pickle.loads(data)
+        self._header['tail'] += n
+        for _ in range(n):
+            self._spaces.release()
+        return obj
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def close(self) -> None:
+        self._header = self._lens = self._slots = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def make_queue(transport: str, maxsize: int = 0, manager=None, results: bool = False, slot_bytes: int = 16384):
+    """Build one queue for the given transport. manager is required for 'manager'; slot_bytes sizes 'shm' slots."""
+    if transport not in TRANSPORTS:
+        raise ValueError(f"unknown transport {transport!r}, expected one of {TRANSPORTS}")
+    if transport == "manager":
+        return manager.Queue(maxsize=maxsize)
+    if transport == "pipe":
+        return PipeQueue(maxsize=maxsize)
+    if transport == "shm" and results:
+        return ShmResultRing(maxsize=maxsize or 1000, slot_bytes=slot_bytes)
+    return Queue(maxsize=maxsize)
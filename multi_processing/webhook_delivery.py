@@ -0,0 +1,453 @@
+"""
+Asynchronous webhook delivery.
+
+ray_actors Detection threads used to POST every OCR event inline with a fresh
+connection and a 10 s timeout, so a slow or dead callback endpoint stalled
+that camera's detection loop. WebhookDelivery.submit() only queues the event
+and returns. Background sender threads POST queued events through one pooled
+requests.Session per endpoint (scheme://host:port), taking channels round
+robin so one busy camera can't starve the rest.
+
+A failed attempt (connection error, timeout, 5xx, 408 or 429) is retried after
+backoff_s * 2**attempt seconds (capped at backoff_max_s). Other 4xx responses
+are final. After max_attempts, or when the channel's queue already holds
+queue_size events, the event is written to spool_dir as one JSON file. The
+spool survives restarts: it is replayed when the delivery starts and then
+every spool_replay_s, up to spool_replay_batch files at a time, each getting
+one attempt. A file is deleted once its event is delivered.
+
+on_done callbacks live in memory and are gone after a restart. Work that
+must follow delivery even for an event replayed from disk, such as recording
+it in oaix.db, goes in the delivery's on_delivered(event). That callback
+reads event.record, a JSON-able dict that submit() stores with the event and
+its spool file.
+
+Batch mode (batch_events > 1) groups the queued events for one callback URL,
+from all channels, and POSTs them together once batch_events are waiting or
+the oldest has waited batch_window_s: as a JSON array (batch_format "json")
+or one JSON object per line ("ndjson"). With multipart=True the batch goes as
+multipart/form-data: an "events" part with the bodies, whose image_field is
+replaced by "imagePart": "image-<i>", plus one image/jpeg part per image with
+the raw JPEG bytes (base64 is a third larger). flush() and close() send
+partial batches at once.
+
+Throughput against a slow endpoint is about senders / response time, so size
+senders for the worst endpoint you expect.
+"""
+
+import base64
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DELIVERED = "delivered"
+REJECTED = "rejected"  # endpoint answered with a non-retriable status
+SPOOLED = "spooled"    # retries exhausted or channel queue full; kept on disk
+
+BATCH_JSON = "json"
+BATCH_NDJSON = "ndjson"
+
+RETRY_STATUS = (408, 429)
+
+
+@dataclass
+class WebhookEvent:
+    channel: str
+    url: str
+    body: dict
+    attempts: int = 0
+    created: float = field(default_factory=time.time)
+    spool_path: Optional[str] = None
+    record: Optional[dict] = None   # caller data kept with the event (and its spool file) for on_delivered
+    on_done: Optional[Callable[[str], None]] = field(default=None, repr=False)
+    queued: float = field(default_factory=time.monotonic, repr=False)
+
+    def to_json(self) -> dict:
+        return {"channel": self.channel, "url": self.url, "body": self.body,
+                "attempts": self.attempts, "created": self.created, "record": self.record}
+
+
+def split_image(body: dict, image_field: str, name: str) -> Tuple[dict, Optional[bytes]]:
+    """body without its base64 (or data URL) image, pointing at part `name`, and the decoded bytes."""
+    data = body.get(image_field)
+    if not data:
+        return body, None
+    if data.startswith("data:"):
+        data = data.split(",", 1)[1]
+    stripped = {k: v for k, v in body.items() if k != image_field}
+    stripped["imagePart"] = name
+    return stripped, base64.b64decode(data)
+
+
+class WebhookDelivery:
+    def __init__(self, spool_dir: Optional[str] = None, queue_size: int = 64, senders: int = 4,
+                 timeout_s: float = 10.0, max_attempts: int = 5, backoff_s: float = 0.5,
+                 backoff_max_s: float = 30.0, spool_replay_s: float = 60.0, spool_replay_batch: int = 32,
+                 headers: Optional[Dict[str, str]] = None, batch_events: int = 0, batch_window_s: float = 2.0,
+                 batch_format: str = BATCH_JSON, multipart: bool = False, image_field: str = "imageBase64",
+                 on_delivered: Optional[Callable[[WebhookEvent], None]] = None) -> None:
+        if batch_format not in (BATCH_JSON, BATCH_NDJSON):
+            raise ValueError(f"batch_format must be {BATCH_JSON!r} or {BATCH_NDJSON!r}, not {batch_format!r}")
+        self.spool_dir = spool_dir
+        self.queue_size = max(1, int(queue_size))
+        self.timeout_s = timeout_s
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.spool_replay_s = spool_replay_s
+        self.spool_replay_batch = spool_replay_batch
+        self.headers = headers or {"Content-Type": "application/json"}
+        self.batch_events = max(0, int(batch_events))  # 0/1: one POST per event
+        self.batch_window_s = batch_window_s
+        self.batch_format = batch_format
+        self.multipart = multipart
+        self.image_field = image_field
+        self.on_delivered = on_delivered
+        self.sent = 0
+        self.requests = 0    # POSTs made
+        self.retried = 0
+        self.rejected = 0
+        self.spooled = 0
+        self.overflowed = 0  # spooled straight away because the channel queue was full
+        self.replayed = 0
+        self._queues: "OrderedDict[str, Deque[WebhookEvent]]" = OrderedDict()
+        self._retries: List[Tuple[float, int, List[WebhookEvent]]] = []  # (due, seq, events) heap
+        self._seq = itertools.count()
+        self._waiting = 0
+        self._in_flight = 0
+        self._spool_loaded: set = set()  # spool files currently queued in memory
+        self._sessions: Dict[str, requests.Session] = {}
+        self._senders = max(1, int(senders))
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flushing = 0
+        self._stopping = False
+        self._next_replay = 0.0
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._threads = [threading.Thread(target=self._run, args=(i,), name=f"webhook-sender-{i}", daemon=True)
+                         for i in range(self._senders)]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def batching(self) -> bool:
+        return self.batch_events > 1
+
+    def submit(self, channel: str, url: str, body: dict, on_done: Optional[Callable[[str], None]] = None,
+               record: Optional[dict] = None) -> bool:
+        """Queue body for url; never blocks. False when the channel queue was full and the event was spooled."""
+        event = WebhookEvent(channel, url, body, record=record, on_done=on_done)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("webhook delivery closed")
+            q = self._queues.setdefault(channel, deque())
+            if len(q) < self.queue_size:
+                q.append(event)
+                self._waiting += 1
+                self._cond.notify_all()
+                return True
+            self.overflowed += 1
+        self._spool(event)
+        return False
+
+    def pending(self, channel: Optional[str] = None) -> int:
+        with self._cond:
+            if channel is not None:
+                return len(self._queues.get(channel, ()))
+            return self._waiting + sum(len(b) for _, _, b in self._retries) + self._in_flight
+
+    def session(self, url: str) -> requests.Session:
+        """Pooled keep-alive session for url's endpoint, shared by all senders."""
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        with self._cond:
+            s = self._sessions.get(key)
+            if s is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._senders, max_retries=0)
+                s.mount(key, adapter)
+                self._sessions[key] = s
+            return s
+
+    def _due_url(self, now: float) -> Tuple[Optional[str], float]:
+        """Callback URL whose batch should go now (oldest first), else how long until one is due."""
+        counts: Dict[str, int] = {}
+        oldest: Dict[str, float] = {}
+        for q in self._queues.values():
+            for e in q:
+                counts[e.url] = counts.get(e.url, 0) + 1
+                oldest[e.url] = min(oldest.get(e.url, e.queued), e.queued)
+        flush = self._closed or self._flushing
+        due = [u for u in counts
+               if flush or counts[u] >= self.batch_events or now - oldest[u] >= self.batch_window_s]
+        if due:
+            return min(due, key=oldest.get), 0.0
+        return None, min(oldest.values()) + self.batch_window_s - now
+
+    def _take(self, url: Optional[str], limit: int) -> List[WebhookEvent]:
+        """Up to limit queued events (for url, or any), one channel at a time round robin."""
+        batch: List[WebhookEvent] = []
+        while len(batch) < limit and self._waiting:
+            taken = False
+            for channel in list(self._queues):
+                q = self._queues[channel]
+                e = next((e for e in q if url is None or e.url == url), None)
+                if e is None:
+                    continue
+                q.remove(e)
+                # the channel that was just served goes to the back of the line
+                self._queues.move_to_end(channel)
+                self._waiting -= 1
+                batch.append(e)
+                taken = True
+                if len(batch) >= limit:
+                    break
+            if not taken:
+                break
+        return batch
+
+    def _next(self) -> Optional[List[WebhookEvent]]:
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                now = time.monotonic()
+                batch = None
+                wait = 1.0
+                if self._retries and self._retries[0][0] <= now:
+                    batch = heapq.heappop(self._retries)[2]
+                elif self._waiting and not self.batching:
+                    batch = self._take(None, 1)
+                elif self._waiting:
+                    url, wait = self._due_url(now)
+                    if url is not None:
+                        batch = self._take(url, self.batch_events)
+                if batch:
+                    self._in_flight += len(batch)
+                    return batch
+                if self._closed and not self._waiting:
+                    return None
+                if self._retries:
+                    wait = min(wait, self._retries[0][0] - now)
+                self._cond.wait(min(max(wait, 0.0), 1.0))
+
+    def _run(self, i: int) -> None:
+        while True:
+            if i == 0 and self.spool_dir and time.monotonic() >= self._next_replay:
+                self._next_replay = time.monotonic() + self.spool_replay_s
+                self.replay_spool()
+            batch = self._next()
+            if batch is None:
+                return
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._in_flight -= len(batch)
+                    self._cond.notify_all()
+
+    def _post(self, batch: List[WebhookEvent]) -> requests.Response:
+        url = batch[0].url
+        session = self.session(url)
+        if not self.batching:
+            return session.post(url, json=batch[0].body, headers=self.headers, timeout=self.timeout_s)
+
+        bodies = [e.body for e in batch]
+        images = []
+        if self.multipart:
+            split = [split_image(b, self.image_field, f"image-{i}") for i, b in enumerate(bodies)]
+            bodies = [b for b, _ in split]
+            images = [(f"image-{i}", data) for i, (_, data) in enumerate(split) if data is not None]
+        if self.batch_format == BATCH_NDJSON:
+            payload = "".join(json.dumps(b) + "\n" for b in bodies)
+            content_type = "application/x-ndjson"
+        else:
+            payload = json.dumps(bodies)
+            content_type = "application/json"
+
+        if not self.multipart:
+            headers = dict(self.headers, **{"Content-Type": content_type})
+            return session.post(url, data=payload.encode("utf-8"), headers=headers, timeout=self.timeout_s)
+        # requests writes the multipart Content-Type (with its boundary) itself
+        headers = {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
+        files = [("events", (f"events.{self.batch_format}", payload, content_type))]
+        files += [(name, (f"{name}.jpg", data, "image/jpeg")) for name, data in images]
+        return session.post(url, files=files, headers=headers, timeout=self.timeout_s)
+
+    def _deliver(self, batch: List[WebhookEvent]) -> None:
+        for event in batch:
+            event.attempts += 1
+        url = batch[0].url
+        channels = ",".join(sorted({e.channel for e in batch}))
+        retriable = True
+        try:
+            response = self._post(batch)
+            with self._cond:
+                self.requests += 1
+            if 200 <= response.status_code < 300:
+                for event in batch:
+                    self._done(event, DELIVERED)
+                return
+            retriable = response.status_code >= 500 or response.status_code in RETRY_STATUS
+            print(f"Webhook:{url} answered {response.status_code} for {channels} ({len(batch)} events)")
+        except requests.exceptions.RequestException as e:
+            print(f"Webhook:{url} failed for {channels} ({len(batch)} events): {e}")
+
+        if not retriable:
+            for event in batch:
+                self._done(event, REJECTED)
+            return
+        retry = []
+        for event in batch:
+            if event.spool_path is not None:
+                # replayed from disk: one attempt per replay, the file stays where it is
+                self._forget(event)
+            elif event.attempts >= self.max_attempts:
+                self._spool(event)
+            else:
+                retry.append(event)
+        if retry:
+            delay = min(self.backoff_s * 2 ** (retry[0].attempts - 1), self.backoff_max_s)
+            with self._cond:
+                # checked under the lock close() takes its last snapshot with: a batch that fails after
+                # that snapshot is spooled here, there is nobody left to retry it
+                if not self._stopping:
+                    self.retried += len(retry)
+                    heapq.heappush(self._retries, (time.monotonic() + delay, next(self._seq), retry))
+                    self._cond.notify()
+                    retry = []
+            for event in retry:
+                self._spool(event)
+
+    def _done(self, event: WebhookEvent, outcome: str) -> None:
+        if outcome == DELIVERED:
+            with self._cond:
+                self.sent += 1
+            if self.on_delivered is not None:
+                try:
+                    self.on_delivered(event)
+                except Exception as e:   # a failing hook must not take the sender thread down
+                    print(f"Webhook:on_delivered failed for {event.channel}: {e}")
+        else:
+            with self._cond:
+                self.rejected += 1
+        if event.spool_path is not None:
+            try:
+                os.remove(event.spool_path)
+            except OSError:
+                pass
+            self._forget(event)
+        if event.on_done is not None:
+            event.on_done(outcome)
+
+    def _forget(self, event: WebhookEvent) -> None:
+        with self._cond:
+            self._spool_loaded.discard(event.spool_path)
+
+    def _spool(self, event: WebhookEvent) -> None:
+        if self.spool_dir:
+            path = os.path.join(self.spool_dir, f"{time.time():.6f}-{uuid.uuid4().hex[:8]}.json")
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(event.to_json(), f)
+            os.replace(tmp, path)  # never leave a half-written event behind
+        with self._cond:
+            self.spooled += 1
+        if event.on_done is not None:
+            event.on_done(SPOOLED)
+
+    def spool_files(self) -> List[str]:
+        if not self.spool_dir:
+            return []
+        return sorted(os.path.join(self.spool_dir, n) for n in os.listdir(self.spool_dir) if n.endswith(".json"))
+
+    def replay_spool(self, limit: Optional[int] = None) -> int:
+        """Queue up to limit (default spool_replay_batch) spooled events, oldest first, for one attempt each."""
+        limit = self.spool_replay_batch if limit is None else limit
+        loaded = []
+        for path in self.spool_files():
+            if len(loaded) >= limit:
+                break
+            with self._cond:
+                if path in self._spool_loaded:
+                    continue
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            loaded.append(WebhookEvent(data["channel"], data["url"], data["body"], data.get("attempts", 0),
+                                       data.get("created", time.time()), spool_path=path,
+                                       record=data.get("record")))
+        if not loaded:
+            return 0
+        # replayed events for the same URL still go out in batches when batching is on
+        size = self.batch_events if self.batching else 1
+        by_url: Dict[str, List[WebhookEvent]] = {}
+        for event in loaded:
+            by_url.setdefault(event.url, []).append(event)
+        with self._cond:
+            for events in by_url.values():
+                for i in range(0, len(events), size):
+                    heapq.heappush(self._retries, (time.monotonic(), next(self._seq), events[i:i + size]))
+            self._spool_loaded.update(e.spool_path for e in loaded)
+            self.replayed += len(loaded)
+            self._cond.notify_all()
+        return len(loaded)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"sent": self.sent, "requests": self.requests, "retried": self.retried,
+                    "rejected": self.rejected, "spooled": self.spooled, "overflowed": self.overflowed,
+                    "replayed": self.replayed,
+                    "pending": self._waiting + sum(len(b) for _, _, b in self._retries) + self._in_flight}
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Send everything queued now, partial batches included; True when nothing is left queued or in flight."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while (self._waiting or self._in_flight) and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+                return not (self._waiting or self._in_flight)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting events and send what is queued (partial batches at once) for up to timeout
+        seconds. Whatever is still queued or waiting for a retry then is spooled, so no event is lost.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            while (self._waiting or self._in_flight) and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+            self._stopping = True
+            left = [e for q in self._queues.values() for e in q] + [e for _, _, b in self._retries for e in b]
+            self._queues.clear()
+            self._retries = []
+            self._waiting = 0
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()) + self.timeout_s)
+        for event in left:
+            if event.spool_path is None:
+                self._spool(event)
+        for s in self._sessions.values():
+            s.close()
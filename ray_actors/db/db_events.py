@@ -1,25 +1,22 @@
-from db.db_manager import SessionLocal, WebhookEvent
-import threading
+from db.db_manager import WebhookEvent
+from db.db_writer import flush_writer, queue_row
 
 class OAIX_db_Event():
-    def __init__(self) -> None:
-        self.lock = threading.Lock()
+    # events matter more than log lines: wait longer for room before dropping one
+    PUT_TIMEOUT_S = 2.0
 
     def app_ocr_event(self, camera_name:str, all_text:str, lot:str=None, expiry:str=None, image_path:str=None, mime:str='ocr_data'):
-        with self.lock:
-            session = SessionLocal()
-            try:
-                ocr_event = WebhookEvent(
-                    camera_name=camera_name,
-                    all_text=all_text,
-                    lot=lot,
-                    expiry=expiry,
-                    image_path=image_path,
-                    mime=mime
-                ) 
-                session.add(ocr_event)
-                session.commit()
-            except:
-                print('OAIX_db_ocr_event:error')
-            finally:
-                session.close()
\ No newline at end of file
+        # queued for the background writer, which inserts in batched transactions
+        if not queue_row(WebhookEvent.__table__, {
+            "camera_name": camera_name,
+            "all_text": all_text,
+            "lot": lot,
+            "expiry": expiry,
+            "image_path": image_path,
+            "mime": mime,
+        }, timeout=self.PUT_TIMEOUT_S):
+            print('OAIX_db_ocr_event:dropped')
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every queued log and event row is written."""
+        return flush_writer(timeout)
@@ -1,9 +1,9 @@
 from enum import IntEnum
-from .db_manager import SessionLocal, AppLogger
+from .db_manager import AppLogger
 from .error_codes import ErrorCode, ErrorSeverity, format_error_message
 from .error_codes import get_error_info
 from .info_codes import InfoCode
-import threading
+from .db_writer import flush_writer, queue_row
 
 class LoggerLevel(IntEnum):
     INFO = 1
@@ -13,24 +13,20 @@ class LoggerLevel(IntEnum):
 
 
 class OAIX_db_Logger():
-    def __init__(self) -> None:
-        self.lock = threading.Lock()
+    # a full writer queue holds a logging thread this long before the row is dropped
+    PUT_TIMEOUT_S = 0.05
 
     def app_logger(self, log_code:ErrorCode | InfoCode,  msg:str, level:LoggerLevel=LoggerLevel.INFO):
-        with self.lock:
-            session = SessionLocal()
-            try:
-                log_msg = AppLogger(
-                    level=level,
-                    log_code=log_code,
-                    message=msg
-                ) 
-                session.add(log_msg)
-                session.commit()
-            except:
-                print('OAIX_Logger:error')
-            finally:
-                session.close()    
+        # queued for the background writer, which inserts in batched transactions
+        queue_row(AppLogger.__table__, {
+            "level": level,
+            "log_code": log_code,
+            "message": msg,
+        }, timeout=self.PUT_TIMEOUT_S)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every queued log and event row is written."""
+        return flush_writer(timeout)
 
     
     def log_error(self, error_code: ErrorCode , context: str = "", details: str = ""):
@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, func
+from sqlalchemy import create_engine, event, Column, String, Integer, DateTime, Index, func
 from sqlalchemy.orm import declarative_base, sessionmaker
 import os
 
+from .db_migrations import migrate
+
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-_DB = f"sqlite:///{ROOT}/oaix.db"
+# OAIX_DB_URL points the app (and the benchmarks) at another database
+_DB = os.getenv("OAIX_DB_URL", f"sqlite:///{ROOT}/oaix.db")
 Base = declarative_base()
 
 class WebhookEvent(Base):
@@ -18,6 +21,13 @@ class WebhookEvent(Base):
     mime = Column(String, nullable=False)
     image_path = Column(String, nullable=True)  # Store file path instead of base64
 
+    # existing databases get these from db_migrations
+    __table_args__ = (
+        Index("ix_webhook_events_camera_created", "camera_name", "created_at"),
+        Index("ix_webhook_events_created", "created_at"),
+        Index("ix_webhook_events_lot", "lot"),
+    )
+
 
 class AppLogger(Base):
     __tablename__ = "app_logs"
@@ -27,11 +37,42 @@ class AppLogger(Base):
     level = Column(String, nullable=False)
     message = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    
-    
-# start the database engine
-engine = create_engine(_DB, echo=True)
-# create the tables
+
+    __table_args__ = (
+        Index("ix_app_logs_created", "created_at"),
+        Index("ix_app_logs_log_code", "log_code"),
+    )
+
+
+# WAL lets the viewer read while the writer commits; NORMAL syncs at checkpoints, not every commit
+# (a power cut can lose the last transactions but never corrupts the file)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -int(os.getenv("OAIX_DB_CACHE_MB", "64")) * 1024,  # negative = KiB
+    "busy_timeout": 5000,  # ms to wait for a lock instead of failing with "database is locked"
+    "temp_store": "MEMORY",
+}
+
+
+def tune_sqlite(engine, pragmas=SQLITE_PRAGMAS):
+    """Apply pragmas to every new connection of engine (no-op for other databases)."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# start the database engine; OAIX_DB_ECHO=1 prints every statement
+engine = create_engine(_DB, echo=os.getenv("OAIX_DB_ECHO", "0") == "1")
+tune_sqlite(engine)
+# create the tables, then bring an existing database up to the current schema
 Base.metadata.create_all(engine)
+migrate(engine)
 # create the session factory
 SessionLocal = sessionmaker(bind=engine)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Schema migrations for oaix.db.
+
+Base.metadata.create_all only creates missing tables. It never adds an index
+or a trigger to a table that already exists. Each step below brings an
+existing database up one version. PRAGMA user_version records the version
+the file is at. migrate() runs the missing steps in order and bumps the
+version only after a step has completed. Steps are written with IF NOT
+EXISTS, so a step that was interrupted is simply run again on the next
+start. A fresh database gets its tables (and the indexes the models declare)
+from create_all and then runs every step, which is a no-op where the objects
+already exist.
+
+v2 is the one optional step: on a SQLite built without FTS5 it skips the
+full-text index (search falls back to LIKE scans) and the version still
+moves on, so v3 and later aren't held back. Every later start tries to
+create the missing index again, e.g. after SQLite was upgraded.
+"""
+
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+
+def _v1_indexes(conn: Connection) -> None:
+    # viewer: newest events overall / per camera, lot lookups; log views by time and code
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_webhook_events_camera_created "
+                      "ON webhook_events (camera_name, created_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_webhook_events_created ON webhook_events (created_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_webhook_events_lot ON webhook_events (lot)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_app_logs_created ON app_logs (created_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_app_logs_log_code ON app_logs (log_code)"))
+    conn.execute(text("ANALYZE"))
+
+
+def _v2_event_fts(conn: Connection) -> bool:
+    # trigram FTS5 over the searchable text: MATCH '"abc"' is a case-insensitive substring match, like the
+    # viewer's str.contains. External content (no second copy of the text), kept in sync by triggers.
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS webhook_events_fts USING fts5("
+                          "all_text, lot, expiry, content='webhook_events', content_rowid='id', "
+                          "tokenize='trigram')"))
+    except OperationalError as e:
+        # SQLite built without FTS5 (or older than 3.34): event_search falls back to LIKE scans
+        print(f"oaix.db: full-text index not available ({e})")
+        return False
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS webhook_events_fts_ai AFTER INSERT ON webhook_events BEGIN
+            INSERT INTO webhook_events_fts (rowid, all_text, lot, expiry)
+            VALUES (new.id, new.all_text, new.lot, new.expiry);
+        END"""))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS webhook_events_fts_ad AFTER DELETE ON webhook_events BEGIN
+            INSERT INTO webhook_events_fts (webhook_events_fts, rowid, all_text, lot, expiry)
+            VALUES ('delete', old.id, old.all_text, old.lot, old.expiry);
+        END"""))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS webhook_events_fts_au AFTER UPDATE OF all_text, lot, expiry
+        ON webhook_events BEGIN
+            INSERT INTO webhook_events_fts (webhook_events_fts, rowid, all_text, lot, expiry)
+            VALUES ('delete', old.id, old.all_text, old.lot, old.expiry);
+            INSERT INTO webhook_events_fts (rowid, all_text, lot, expiry)
+            VALUES (new.id, new.all_text, new.lot, new.expiry);
+        END"""))
+    # index the events written before this version
+    conn.execute(text("INSERT INTO webhook_events_fts (webhook_events_fts) VALUES ('rebuild')"))
+    return True
+
+
+def _has_table(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}).first() is not None
+
+
+def _rollup_sql(table: str, period: str, row: str, sign: str) -> str:
+    """UPSERT adding (sign = '+') or removing ('-') one event `row` (new/old) to its camera x period bucket."""
+    return (f"INSERT INTO {table} (camera_name, {period}, events, with_lot, with_expiry) "
+            f"VALUES ({row}.camera_name, substr({row}.created_at, 1, {13 if period == 'hour' else 10}), {sign}1, "
+            f"{sign}(coalesce({row}.lot, '') != ''), {sign}(coalesce({row}.expiry, '') != '')) "
+            f"ON CONFLICT (camera_name, {period}) DO UPDATE SET events = events + excluded.events, "
+            f"with_lot = with_lot + excluded.with_lot, with_expiry = with_expiry + excluded.with_expiry;")
+
+
+def _v3_event_rollups(conn: Connection) -> None:
+    # per camera x hour and camera x day: events and how many carried a lot / expiry. Triggers keep them
+    # current in the inserting transaction, so the viewer's analytics never scan webhook_events.
+    for table, period in (("event_rollup_hourly", "hour"), ("event_rollup_daily", "day")):
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table} ("
+                          f"camera_name VARCHAR NOT NULL, {period} VARCHAR NOT NULL, "
+                          f"events INTEGER NOT NULL DEFAULT 0, with_lot INTEGER NOT NULL DEFAULT 0, "
+                          f"with_expiry INTEGER NOT NULL DEFAULT 0, PRIMARY KEY ({period}, camera_name)) "
+                          f"WITHOUT ROWID"))
+
+    def both(row: str, sign: str) -> str:
+        return _rollup_sql("event_rollup_hourly", "hour", row, sign) + _rollup_sql("event_rollup_daily", "day", row, sign)
+
+    conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS event_rollups_ai AFTER INSERT ON webhook_events BEGIN "
+                      f"{both('new', '+')} END"))
+    conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS event_rollups_ad AFTER DELETE ON webhook_events BEGIN "
+                      f"{both('old', '-')} END"))
+    conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS event_rollups_au AFTER UPDATE OF camera_name, created_at, "
+                      f"lot, expiry ON webhook_events BEGIN {both('old', '-')} {both('new', '+')} END"))
+    # backfill once the triggers exist: the rebuild recounts anything inserted in between
+    rebuild_rollups(conn)
+
+
+def rebuild_rollups(conn: Connection) -> None:
+    """Recompute the rollup tables from webhook_events (backfill, or repair after manual edits)."""
+    for table, period, width in (("event_rollup_hourly", "hour", 13), ("event_rollup_daily", "day", 10)):
+        conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(text(f"INSERT INTO {table} (camera_name, {period}, events, with_lot, with_expiry) "
+                          f"SELECT camera_name, substr(created_at, 1, {width}), count(*), "
+                          f"sum(coalesce(lot, '') != ''), sum(coalesce(expiry, '') != '') "
+                          f"FROM webhook_events GROUP BY 1, 2"))
+
+
+# MIGRATIONS[i] takes the database from user_version i to i + 1; only ever append
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _v1_indexes,
+    _v2_event_fts,
+    _v3_event_rollups,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Apply the missing migrations; returns the version the database is at afterwards.
+    The steps are SQLite (PRAGMA, FTS5, UPSERT triggers): other databases are left alone and report 0.
+    """
+    if engine.dialect.name != "sqlite":
+        return 0
+    with engine.begin() as conn:
+        version = schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"oaix.db schema version {version} is newer than this code ({SCHEMA_VERSION})")
+    for step in range(version, SCHEMA_VERSION):
+        with engine.begin() as conn:
+            MIGRATIONS[step](conn)
+            conn.execute(text(f"PRAGMA user_version = {step + 1}"))
+        print(f"oaix.db migrated to schema version {step + 1} ({MIGRATIONS[step].__name__})")
+    if version >= 2:
+        # v2 ran on an earlier start and may have skipped the index: try again
+        with engine.begin() as conn:
+            if not _has_table(conn, "webhook_events_fts") and _v2_event_fts(conn):
+                print("oaix.db: full-text index created")
+    return SCHEMA_VERSION
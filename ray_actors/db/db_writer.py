@@ -0,0 +1,91 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, bindparam, func
+
+from .db_manager import ROOT, engine
+
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from multi_processing.batch_writer import BatchWriter
+
+# One writer per process: app_logs and webhook_events rows are queued and inserted in one
+# transaction every DB_BATCH_ROWS rows or DB_FLUSH_MS, whichever comes first
+DB_BATCH_ROWS = int(os.getenv("OAIX_DB_BATCH_ROWS", "256"))
+DB_FLUSH_MS = float(os.getenv("OAIX_DB_FLUSH_MS", "200"))
+DB_QUEUE_SIZE = int(os.getenv("OAIX_DB_QUEUE_SIZE", "10000"))
+DB_SHUTDOWN_TIMEOUT_S = 10.0
+
+_writer: Optional[BatchWriter] = None
+_writer_lock = threading.Lock()
+_statements: Dict[str, object] = {}
+
+
+def _insert(table: Table):
+    """
+    executemany INSERT for table. created_at is the time the row was queued (created_ts),
+    stored like the CURRENT_TIMESTAMP server default so old and new rows sort and parse alike.
+    """
+    stmt = _statements.get(table.name)
+    if stmt is None:
+        stmt = table.insert()
+        if "created_at" in table.c and engine.dialect.name == "sqlite":
+            stmt = stmt.values(created_at=func.datetime(bindparam("created_ts"), "unixepoch"))
+        _statements[table.name] = stmt
+    return stmt
+
+
+def write_rows(rows: List[Tuple[Table, dict, float]]) -> None:
+    """Insert (table, row, queued time) triples in one transaction, one executemany per table."""
+    by_table: Dict[str, Tuple[Table, List[dict]]] = {}
+    for table, row, ts in rows:
+        if "created_at" in table.c:
+            if engine.dialect.name == "sqlite":
+                row = dict(row, created_ts=ts)
+            else:
+                row = dict(row, created_at=datetime.fromtimestamp(ts, timezone.utc))
+        by_table.setdefault(table.name, (table, []))[1].append(row)
+    with engine.begin() as conn:
+        for table, table_rows in by_table.values():
+            conn.execute(_insert(table), table_rows)
+
+
+def queue_row(table: Table, row: dict, timeout: float = 0.0) -> bool:
+    """Queue one row for table; False when it was dropped because the queue stayed full for timeout."""
+    return get_writer().put((table, row, time.time()), timeout=timeout)
+
+
+def get_writer() -> BatchWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BatchWriter(write_rows, max_rows=DB_BATCH_ROWS, flush_ms=DB_FLUSH_MS,
+                                  queue_size=DB_QUEUE_SIZE, name="oaix-db-writer")
+            # write whatever is still queued when the process exits
+            atexit.register(shutdown_writer)
+        return _writer
+
+
+def flush_writer(timeout: float = DB_SHUTDOWN_TIMEOUT_S) -> bool:
+    """Write every row queued so far, blocking until done (or timeout)."""
+    with _writer_lock:
+        writer = _writer
+    return writer is None or writer.flush(timeout)
+
+
+def shutdown_writer(timeout: float = DB_SHUTDOWN_TIMEOUT_S) -> None:
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        if not writer.close(timeout):
+            print(f"oaix-db-writer: {writer.pending()} rows not written at shutdown")
+        stats = writer.stats()
+        if stats["dropped"] or stats["failed"]:
+            print(f"oaix-db-writer: dropped {stats['dropped']} rows, failed {stats['failed']}")
@@ -94,6 +94,8 @@ class ErrorCode(IntEnum):
     NETWORK_UNREACHABLE = 6008
     DNS_RESOLUTION_FAILED = 6009
     SSL_CERTIFICATE_ERROR = 6010
+    WEBHOOK_SPOOLED = 6011
+    WEBHOOK_REJECTED = 6012
     
     # gRPC/Communication errors (7000-7999)
     GRPC_SERVER_START_FAILED = 7001
@@ -237,6 +239,16 @@ def get_error_info(error_code: ErrorCode) -> dict:
             "severity": ErrorSeverity.ERROR,
             "description": "Failed to send webhook"
         },
+        ErrorCode.WEBHOOK_SPOOLED: {
+            "category": ErrorCategory.NETWORK,
+            "severity": ErrorSeverity.WARNING,
+            "description": "Webhook retries exhausted, event spooled to disk"
+        },
+        ErrorCode.WEBHOOK_REJECTED: {
+            "category": ErrorCategory.NETWORK,
+            "severity": ErrorSeverity.ERROR,
+            "description": "Webhook endpoint rejected the event"
+        },
         
         # gRPC errors
         ErrorCode.GRPC_SERVER_START_FAILED: {
@@ -0,0 +1,278 @@
+"""
+Paginated, time-bounded search over webhook_events.
+
+Meant for streamlit_detection_viewer.py and for any code holding a sqlite3
+connection to oaix.db. It deliberately avoids importing db_manager, which
+creates an engine and migrates the database on import.
+
+The text, lot and expiry filters are case-insensitive substring matches, as
+the viewer's str.contains filters were. Filters of three or more characters
+go through the trigram FTS5 index (db_migrations v2). Shorter ones, or a
+database that hasn't been migrated yet, fall back to LIKE.
+
+Pages are keyset-paginated, newest first, on (created_at, id). The
+ix_webhook_events_created index covers that ordering, because id is the
+rowid. EventPage.cursor goes back in as `after` to fetch the next page. Its
+cost doesn't grow with the page number the way OFFSET would.
+
+EventQuery.since_id limits any of these calls to events newer than an id
+already seen. The viewer refreshes that way. It fetches the new rows and the
+EventSummary of just those rows, and merges them into what it already
+holds. A refresh therefore costs the same however large the table has grown.
+
+summarize_events reads the camera x hour / day rollup tables (db_migrations
+v3) when the query filters only on camera and time, with bounds on whole
+hours or days. Its cost then depends on the number of days and cameras
+covered, not on the number of events.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+FTS_TABLE = "webhook_events_fts"
+EVENT_COLUMNS = ("id", "camera_name", "lot", "expiry", "all_text", "created_at", "mime", "image_path")
+MIN_FTS_CHARS = 3  # trigram index: shorter strings can't be looked up
+ROLLUP_TABLES = {"day": "event_rollup_daily", "hour": "event_rollup_hourly"}
+WINDOW_BOUND_MAX_SHARE = 0.25  # bound FTS lookups by id only for windows holding at most this share of events
+
+Cursor = Tuple[str, int]  # (created_at, id) of the last row of a page
+TimeBound = Union[datetime, str, None]
+
+
+@dataclass
+class EventQuery:
+    text: str = ""                 # substring of all_text
+    lot: str = ""                  # substring of lot
+    expiry: str = ""               # substring of expiry
+    camera: Optional[str] = None   # exact camera_name
+    start: TimeBound = None        # created_at >= start (UTC, as stored)
+    end: TimeBound = None          # created_at < end
+    limit: int = 100               # rows per page
+    since_id: Optional[int] = None # only events with id > since_id (incremental refresh)
+
+
+@dataclass
+class EventPage:
+    rows: List[dict] = field(default_factory=list)
+    cursor: Optional[Cursor] = None  # pass as `after` for the next page; None on the last page
+
+
+@dataclass
+class EventSummary:
+    """Counts over the events matching a query; summaries of disjoint sets of events add up."""
+    total: int = 0
+    with_lot: int = 0
+    with_expiry: int = 0
+    by_camera: Dict[str, int] = field(default_factory=dict)
+    by_day: Dict[str, int] = field(default_factory=dict)   # 'YYYY-MM-DD' -> events
+
+    def add(self, other: "EventSummary") -> "EventSummary":
+        self.total += other.total
+        self.with_lot += other.with_lot
+        self.with_expiry += other.with_expiry
+        for mine, theirs in ((self.by_camera, other.by_camera), (self.by_day, other.by_day)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        return self
+
+
+def _timestamp(value: TimeBound) -> Optional[str]:
+    """created_at is stored as 'YYYY-MM-DD HH:MM:SS' text, so bounds compare as strings."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def fts_available(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone() is not None
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _like(value: str) -> str:
+    return "%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _window_ids(conn: sqlite3.Connection, query: EventQuery, time_clauses, time_params) -> Optional[Tuple[int, int]]:
+    """
+    (min id, max id) of the events in the time window, to bound the FTS lookup: a common term matches a
+    large share of all events, and the bound keeps its cost proportional to the window. Only worth it for
+    a narrow window, since finding the exact bounds scans the window's index entries. Ids roughly follow
+    created_at, so two index probes estimate the window's share of ids first. None: don't bound.
+    """
+    top = conn.execute("SELECT max(id) FROM webhook_events").fetchone()[0]
+    if not top:
+        return None
+    first = last = None
+    if query.start is not None:
+        first = conn.execute("SELECT id FROM webhook_events WHERE created_at >= ? ORDER BY created_at, id LIMIT 1",
+                             (_timestamp(query.start),)).fetchone()
+    if query.end is not None:
+        last = conn.execute("SELECT id FROM webhook_events WHERE created_at < ? "
+                            "ORDER BY created_at DESC, id DESC LIMIT 1", (_timestamp(query.end),)).fetchone()
+    span = (last[0] if last else top) - (first[0] if first else 0)
+    if span > top * WINDOW_BOUND_MAX_SHARE:
+        return None
+    lo, hi = conn.execute(f"SELECT min(e.id), max(e.id) FROM webhook_events e WHERE {' AND '.join(time_clauses)}",
+                          time_params).fetchone()
+    return (lo, hi) if lo is not None else (0, -1)
+
+
+def _where(conn: sqlite3.Connection, query: EventQuery, after: Optional[Cursor] = None):
+    clauses, params, match = [], [], []
+    time_clauses, time_params = [], []
+    if query.start is not None:
+        time_clauses.append("e.created_at >= ?")
+        time_params.append(_timestamp(query.start))
+    if query.end is not None:
+        time_clauses.append("e.created_at < ?")
+        time_params.append(_timestamp(query.end))
+    # a refresh (since_id) touches a handful of new rows: let the rowid range drive it, not an index
+    # over the whole time window ("+" keeps SQLite from using an index for that term)
+    unindexed = "+" if query.since_id is not None else ""
+    clauses += [unindexed + c for c in time_clauses]
+    params += time_params
+    use_fts = fts_available(conn)
+    for column, value in (("all_text", query.text), ("lot", query.lot), ("expiry", query.expiry)):
+        value = (value or "").strip()
+        if not value:
+            continue
+        if use_fts and len(value) >= MIN_FTS_CHARS:
+            match.append(f"{column} : {_phrase(value)}")
+        else:
+            clauses.append(f"e.{column} LIKE ? ESCAPE '\\'")
+            params.append(_like(value))
+    if match:
+        fts = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
+        fts_params = [" AND ".join(match)]
+        id_range = (_window_ids(conn, query, time_clauses, time_params)
+                    if time_clauses and query.since_id is None else None)
+        if id_range is not None:
+            fts += " AND rowid BETWEEN ? AND ?"
+            fts_params.extend(id_range)
+        if query.since_id is not None:
+            fts += " AND rowid > ?"
+            fts_params.append(query.since_id)
+        clauses.append(f"e.id IN ({fts})")
+        params.extend(fts_params)
+    if query.camera:
+        clauses.append(f"{unindexed}e.camera_name = ?")
+        params.append(query.camera)
+    if query.since_id is not None:
+        clauses.append("e.id > ?")
+        params.append(query.since_id)
+    if after is not None:
+        clauses.append("(e.created_at, e.id) < (?, ?)")
+        params.extend(after)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def search_events(conn: sqlite3.Connection, query: EventQuery, after: Optional[Cursor] = None) -> EventPage:
+    """One page of events matching query, newest first, starting after cursor `after`."""
+    where, params = _where(conn, query, after)
+    # for a refresh, sorting the few new rows beats walking the created_at index to avoid the sort
+    order = "+e.created_at" if query.since_id is not None else "e.created_at"
+    sql = (f"SELECT {', '.join('e.' + c for c in EVENT_COLUMNS)} FROM webhook_events e{where} "
+           f"ORDER BY {order} DESC, e.id DESC LIMIT ?")
+    rows = [dict(zip(EVENT_COLUMNS, r)) for r in conn.execute(sql, params + [query.limit + 1])]
+    more = len(rows) > query.limit
+    rows = rows[:query.limit]
+    cursor = (rows[-1]["created_at"], rows[-1]["id"]) if more else None
+    return EventPage(rows=rows, cursor=cursor)
+
+
+def count_events(conn: sqlite3.Connection, query: EventQuery) -> int:
+    where, params = _where(conn, query)
+    return conn.execute(f"SELECT count(*) FROM webhook_events e{where}", params).fetchone()[0]
+
+
+def _rollup_period(query: EventQuery) -> Optional[str]:
+    """'day' or 'hour' when the rollups can answer query exactly, else None."""
+    if query.text or query.lot or query.expiry or query.since_id is not None:
+        return None
+    bounds = [_timestamp(b) for b in (query.start, query.end) if b is not None]
+    if all(len(b) == 10 or b[10:] == " 00:00:00" for b in bounds):
+        return "day"
+    if all(len(b) == 13 or b[13:] == ":00:00" for b in bounds):
+        return "hour"
+    return None
+
+
+def _rollup_summary(conn: sqlite3.Connection, query: EventQuery, period: str) -> EventSummary:
+    width = 10 if period == "day" else 13
+    clauses, params = ["events > 0"], []
+    if query.start is not None:
+        clauses.append(f"{period} >= ?")
+        params.append(_timestamp(query.start)[:width])
+    if query.end is not None:
+        clauses.append(f"{period} < ?")
+        params.append(_timestamp(query.end)[:width])
+    if query.camera:
+        clauses.append("camera_name = ?")
+        params.append(query.camera)
+    summary = EventSummary()
+    sql = (f"SELECT substr({period}, 1, 10), camera_name, events, with_lot, with_expiry "
+           f"FROM {ROLLUP_TABLES[period]} WHERE {' AND '.join(clauses)}")
+    for day, camera, n, with_lot, with_expiry in conn.execute(sql, params):
+        summary.add(EventSummary(total=n, with_lot=with_lot, with_expiry=with_expiry,
+                                 by_camera={camera: n}, by_day={day: n}))
+    return summary
+
+
+def rollups_available(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT count(*) FROM sqlite_master WHERE name IN (?, ?)",
+                        tuple(ROLLUP_TABLES.values())).fetchone()[0] == len(ROLLUP_TABLES)
+
+
+def summarize_events(conn: sqlite3.Connection, query: EventQuery, use_rollups: bool = True) -> EventSummary:
+    """Totals, lot/expiry fill and per-camera / per-day counts of the events matching query, in one pass."""
+    period = _rollup_period(query) if use_rollups else None
+    if period is not None and rollups_available(conn):
+        return _rollup_summary(conn, query, period)
+    where, params = _where(conn, query)
+    summary = EventSummary()
+    sql = (f"SELECT substr(e.created_at, 1, 10), e.camera_name, count(*), "
+           f"sum(coalesce(e.lot, '') != ''), sum(coalesce(e.expiry, '') != '') "
+           f"FROM webhook_events e{where} GROUP BY 1, 2")
+    for day, camera, n, with_lot, with_expiry in conn.execute(sql, params):
+        summary.add(EventSummary(total=n, with_lot=with_lot, with_expiry=with_expiry,
+                                 by_camera={camera: n}, by_day={day: n}))
+    return summary
+
+
+def list_cameras(conn: sqlite3.Connection) -> List[str]:
+    """Distinct camera names, one index seek per camera instead of a pass over every event."""
+    sql = """
+        WITH RECURSIVE cams(name) AS (
+            SELECT min(camera_name) FROM webhook_events
+            UNION ALL
+            SELECT (SELECT min(camera_name) FROM webhook_events WHERE camera_name > cams.name)
+            FROM cams WHERE cams.name IS NOT NULL)
+        SELECT name FROM cams WHERE name IS NOT NULL"""
+    return [name for (name,) in conn.execute(sql)]
+
+
+def time_range(conn: sqlite3.Connection) -> Tuple[Optional[str], Optional[str]]:
+    """(oldest, newest) created_at, from the ends of the created_at index."""
+    oldest = conn.execute("SELECT min(created_at) FROM webhook_events").fetchone()[0]
+    newest = conn.execute("SELECT max(created_at) FROM webhook_events").fetchone()[0]
+    return oldest, newest
+
+
+@contextmanager
+def read_snapshot(conn: sqlite3.Connection):
+    """Run several reads against one snapshot (a read transaction; WAL keeps writers unblocked meanwhile)."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.execute("COMMIT")
+
+
+def last_event_id(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT max(id) FROM webhook_events").fetchone()[0] or 0
@@ -7,7 +7,9 @@ from db.info_codes import InfoCode
 from db.error_codes import ErrorCode
 from video_processor import DetectionManager as DM
 from video_processor import Detection_processor_type, DetectionParams
+from webhook import shutdown_delivery
 from db.db_logger import OAIX_db_Logger, LoggerLevel
+from db.db_writer import shutdown_writer
 
 MODEL_ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'models'))
 
@@ -36,7 +38,9 @@ class ServerCommand(pb2_grpc.ServerCommandsServicer):
             webhook_call_back_url=excecute_command.call_back_url,
             rotate_90_clock=det_rotation,
             processor_type=det_process,
-            model_name=os.path.join(MODEL_ROOT_PATH, excecute_command.model_name)
+            model_name=os.path.join(MODEL_ROOT_PATH, excecute_command.model_name),
+            motion_gate=excecute_command.motion_gate,
+            motion_threshold=excecute_command.motion_threshold
         )
 
         return detection_params
@@ -110,6 +114,11 @@ def serve(port=50051):
         server.wait_for_termination()
     except KeyboardInterrupt:
         print(f"exiting service")
+    finally:
+        # deliver (or spool) the webhook events still queued or waiting for their batch
+        shutdown_delivery()
+        # then write the queued log rows and the events delivery just recorded
+        shutdown_writer()
 
 
 if __name__ == '__main__':
@@ -7,10 +7,18 @@ import time
 from datetime import datetime
 import re
 import os
+import sys
+import threading
 from app_base import AppBase
 from db.db_logger import LoggerLevel
 from db.error_codes import ErrorCode
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from multi_processing.image_encoding import encode_jpeg
+from multi_processing.thumbnails import cache_from_env
 try:
     from .ocr.common import clean_line, collapse_spaced_digits, find_lot_on_line, parse_expiry_from_text, has_exp_key
 except Exception:
@@ -19,13 +27,45 @@ except Exception:
     except Exception:
         from ocr.common import clean_line, collapse_spaced_digits, find_lot_on_line, parse_expiry_from_text, has_exp_key
 
+# One EasyOCR reader per (languages, gpu) per process, shared by every channel's OCRProcessor;
+# readtext isn't thread-safe, so calls go through the reader's lock
+_READERS: Dict[Tuple[Tuple[str, ...], bool], Tuple[easyocr.Reader, threading.Lock]] = {}
+_READERS_LOCK = threading.Lock()
+
+
+def shared_reader(languages: List[str], gpu: bool) -> Tuple[easyocr.Reader, threading.Lock]:
+    key = (tuple(languages), gpu)
+    with _READERS_LOCK:
+        if key not in _READERS:
+            _READERS[key] = (easyocr.Reader(list(languages), gpu=gpu), threading.Lock())
+        return _READERS[key]
+
+
+def new_reader(languages: List[str], gpu: bool, shared: bool = True) -> Tuple[easyocr.Reader, threading.Lock]:
+    """The process-wide reader, or (shared=False) a private one, e.g. for an OCR pool worker."""
+    if shared:
+        return shared_reader(languages, gpu)
+    return easyocr.Reader(list(languages), gpu=gpu), threading.Lock()
+
+
+def pad_batch(images: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    Pad images (bottom/right, black) to the largest height and width so readtext_batched can stack them;
+    text boxes found in the padded image keep each original image's coordinates
+    """
+    h = max(img.shape[0] for img in images)
+    w = max(img.shape[1] for img in images)
+    return [cv2.copyMakeBorder(img, 0, h - img.shape[0], 0, w - img.shape[1], cv2.BORDER_CONSTANT, value=0)
+            for img in images]
+
+
 class OCRProcessor(AppBase):
     """
     GPU-accelerated OCR processor for Ray actors
     Optimized for RTX 5090 with CUDA support
     """
     
-    def __init__(self, channel_name:str, languages: List[str] = ['en'], gpu: bool = True):
+    def __init__(self, channel_name:str, languages: List[str] = ['en'], gpu: bool = True, shared: bool = True):
         """
         Initialize OCR processor with optional GPU support (safe fallback to CPU)
         """
@@ -42,16 +82,16 @@ class OCRProcessor(AppBase):
         self.device = "cuda" if self.gpu_available else "cpu"
         print(f"OCR Processor - Using device: {self.device}")
         
-        # Initialize EasyOCR reader with fallback to CPU on any error
+        # EasyOCR reader (shared unless this processor belongs to an OCR pool worker) with fallback to CPU on any error
         try:
-            self.reader = easyocr.Reader(languages, gpu=self.gpu_available)
+            self.reader, self._reader_lock = new_reader(languages, self.gpu_available, shared)
         except Exception as e:
             msg = f"EasyOCR:init failed on {self.device} for {self.channel_name}, falling back to CPU: {e}"
             print(msg)
             self.app_logger.log_error(ErrorCode.OCR_ENGINE_FAILED, e)
             self.gpu_available = False
             self.device = "cpu"
-            self.reader = easyocr.Reader(languages, gpu=False)
+            self.reader, self._reader_lock = new_reader(languages, False, shared)
         
         # Best-effort device reporting
         try:
@@ -66,8 +106,15 @@ class OCRProcessor(AppBase):
         # OCR processing parameters
         self.min_confidence = 0.35
         self.max_text_length = 100
+        self.recognizer_batch_size = 8  # text crops per recognizer pass in process_batch
+        self.jpeg_quality = 95  # saved OCR frames; the webhook reuses these bytes when its settings match
+        # OAIX_THUMBS_AT_SAVE=1: thumbnail each saved frame for the viewer now, not on its first display
+        self.thumbnails = cache_from_env() if os.getenv("OAIX_THUMBS_AT_SAVE") == "1" else None
 
-    def save_ocr_frame(self, frame: np.ndarray) -> str:        
+    def save_ocr_frame(self, frame: np.ndarray, jpeg: Optional[bytes] = None) -> str:
+        """
+        Write frame (or its already-encoded JPEG bytes) under ROOT/ocr/; returns the path or None
+        """
         # Get current timestamp
         now = datetime.now()
         timestamp = int(time.time())
@@ -89,22 +136,29 @@ class OCRProcessor(AppBase):
         filename = f"ocr_frame_{timestamp}_{now.microsecond:06d}.jpg"
         full_path = os.path.join(ocr_dir, filename)
         
-        # Save the frame as JPEG
+        # Save the frame as JPEG (encoded once; the same bytes travel on to the webhook)
         try:
-            success = cv2.imwrite(full_path, frame)
-            if success:
-                print(f"OCR frame saved: {full_path=}")
-                return full_path
-            else:
-                msg = f"EasyOCR:Failed to save OCR {self.channel_name=} frame: {full_path=}"
-                print(msg)
-                self.app_logger.log_error(ErrorCode.IMAGE_SAVE_FAILED, msg)
-                return None
+            if jpeg is None:
+                jpeg = encode_jpeg(frame, self.jpeg_quality)
+            with open(full_path, 'wb') as f:
+                f.write(jpeg)
+            print(f"OCR frame saved: {full_path=}")
+        except (OSError, ValueError) as e:
+            msg = f"EasyOCR:Failed to save OCR {self.channel_name=} frame: {full_path=}: {e}"
+            print(msg)
+            self.app_logger.log_error(ErrorCode.IMAGE_SAVE_FAILED, msg)
+            return None
         except Exception as e:
             msg = f"Error saving OCR frame: {e}"
             print(msg)
             self.app_logger.log_error(ErrorCode.OCR_ENGINE_FAILED, msg)
             return None
+        if self.thumbnails is not None:
+            try:
+                self.thumbnails.put(full_path, jpeg, frame)
+            except Exception as e:  # the viewer makes it lazily instead
+                print(f"OCR frame thumbnail failed: {full_path=}: {e}")
+        return full_path
         
     def preprocess_image(self, bgr_image: np.ndarray, rotate_90_clock: bool = True, save_ocr_images: bool = True) -> np.ndarray:
 
@@ -170,25 +224,73 @@ class OCRProcessor(AppBase):
         processed = self.preprocess_image(bgr_image, rotate_90_clock=rotate_90_clock)
         
         try:
-            # Perform OCR
-            results = self.reader.readtext(processed, detail=detail, paragraph=False)
-            
-            # Filter results by confidence
-            filtered_results = []
-            for result in results:
-                if detail == 1:
-                    bbox, text, confidence = result
-                    if confidence >= self.min_confidence and len(text.strip()) > 0:
-                        filtered_results.append((bbox, text.strip(), confidence))
-                else:
-                    if len(result.strip()) > 0:
-                        filtered_results.append(result.strip())
-            
-            return filtered_results
+            # Perform OCR (reader may be shared with the other channels)
+            with self._reader_lock:
+                results = self.reader.readtext(processed, detail=detail, paragraph=False)
+            return self.filter_results(results, detail=detail)
             
         except Exception as e:
             print(f"OCR extraction error: {e}")
             return []
+
+    def filter_results(self, results: List, detail: int = 1) -> List:
+        """
+        Filter raw EasyOCR results by confidence and drop empty strings
+        """
+        filtered_results = []
+        for result in results:
+            if detail == 1:
+                bbox, text, confidence = result
+                if confidence >= self.min_confidence and len(text.strip()) > 0:
+                    filtered_results.append((bbox, text.strip(), confidence))
+            else:
+                if len(result.strip()) > 0:
+                    filtered_results.append(result.strip())
+        return filtered_results
+
+    def extract_text_batch(self, bgr_images: List[np.ndarray], rotate_90_clock: bool = True,
+                           channel_names: Optional[List[str]] = None) -> List[List[Tuple]]:
+        """
+        Extract text from several ROIs (from any channels) with one batched EasyOCR call
+        
+        ROIs are preprocessed as in extract_text and padded to a common size, so the text
+        detector runs once over the whole stack and the recognizer batches the crops of each ROI.
+        Falls back to one readtext call per ROI if the batched call fails.
+        
+        Returns:
+            One list of (bbox, text, confidence) tuples per input ROI
+        """
+        batch_results: List[List[Tuple]] = [[] for _ in bgr_images]
+        processed, index = [], []
+        for i, bgr_image in enumerate(bgr_images):
+            if channel_names:
+                self.channel_name = channel_names[i]
+            if bgr_image is None or bgr_image.size == 0:
+                self.app_logger.log_error(ErrorCode.INVALID_OCR_IMAGE_SIZE, 'Invalid image size - extract_text_batch', self.channel_name)
+                continue
+            processed.append(self.preprocess_image(bgr_image, rotate_90_clock=rotate_90_clock))
+            index.append(i)
+        if not processed:
+            return batch_results
+
+        try:
+            with self._reader_lock:
+                raw = self.reader.readtext_batched(pad_batch(processed), detail=1, paragraph=False,
+                                                   batch_size=self.recognizer_batch_size)
+        except Exception as e:
+            print(f"OCR batched extraction error, falling back to one ROI at a time: {e}")
+            raw = []
+            for image in processed:
+                try:
+                    with self._reader_lock:
+                        raw.append(self.reader.readtext(image, detail=1, paragraph=False))
+                except Exception as e:
+                    print(f"OCR extraction error: {e}")
+                    raw.append([])
+
+        for i, results in zip(index, raw):
+            batch_results[i] = self.filter_results(results, detail=1)
+        return batch_results
     
     def process_frame(self, frame: np.ndarray, rotate_90_clock: bool = True, save_frame = True) -> Dict:
         """
@@ -208,6 +310,36 @@ class OCRProcessor(AppBase):
         
         processing_time = (time.time() - start_time) * 1000  # Convert to ms
         
+        return self.build_result(frame, ocr_results, processing_time, rotate_90_clock, save_frame)
+
+    def process_batch(self, frames: List[np.ndarray], rotate_90_clock: bool = True, save_frame = True,
+                      channel_names: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Batched process_frame for ROIs from one or more channels
+        
+        Args:
+            frames: Input ROIs
+            channel_names: Channel of each ROI (debug images are saved under it)
+            
+        Returns:
+            One dictionary per ROI, same shape as process_frame; processing_time_ms is the ROI's share of the batch
+        """
+        start_time = time.time()
+        batch_results = self.extract_text_batch(frames, rotate_90_clock=rotate_90_clock, channel_names=channel_names)
+        processing_time = (time.time() - start_time) * 1000 / max(1, len(frames))
+        
+        results = []
+        for i, (frame, ocr_results) in enumerate(zip(frames, batch_results)):
+            if channel_names:
+                self.channel_name = channel_names[i]
+            results.append(self.build_result(frame, ocr_results, processing_time, rotate_90_clock, save_frame))
+        return results
+
+    def build_result(self, frame: np.ndarray, ocr_results: List[Tuple], processing_time: float,
+                     rotate_90_clock: bool = True, save_frame = True) -> Dict:
+        """
+        Parse LOT / EXPIRY from filtered OCR results and assemble the process_frame dictionary
+        """
         # Organize results
         text_lines = []
         all_text = []
@@ -237,7 +369,15 @@ class OCRProcessor(AppBase):
         if rotate_90_clock:
             frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
 
-        ocr_image_path = self.save_ocr_frame(frame) if save_frame else "_EMPTY"
+        # Encode once: written to disk and handed to the webhook, with the image itself, in the result
+        ocr_image_jpeg = None
+        ocr_image_path = "_EMPTY"
+        if save_frame:
+            try:
+                ocr_image_jpeg = encode_jpeg(frame, self.jpeg_quality)
+            except ValueError as e:
+                print(f"OCR frame encode failed: {e}")
+            ocr_image_path = self.save_ocr_frame(frame, ocr_image_jpeg)
         
         return {
             'text': full_text,
@@ -247,10 +387,14 @@ class OCRProcessor(AppBase):
             'processing_time_ms': processing_time,
             'text_count': len(text_lines),
             'device': self.device,
-            'ocr_image_path':ocr_image_path
+            'ocr_image_path':ocr_image_path,
+            'ocr_image': frame,
+            'ocr_image_jpeg': ocr_image_jpeg,
+            'ocr_image_quality': self.jpeg_quality
         }
     
-    def draw_ocr_results(self, frame: np.ndarray, ocr_results: Dict) -> np.ndarray:
+    @staticmethod
+    def draw_ocr_results(frame: np.ndarray, ocr_results: Dict) -> np.ndarray:
         """
         Draw OCR results on frame with high visibility
         
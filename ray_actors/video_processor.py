@@ -3,13 +3,13 @@ import os
 import cv2
 import time
 import json
+import queue
 import sys
 import threading
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from app_base import AppBase
-from db.db_events import OAIX_db_Event
-from webhook import Webhook, WebhookFrame
+from webhook import DELIVERED, Webhook, WebhookFrame
 import numpy as np
 
 import torch
@@ -22,6 +22,11 @@ if ROOT not in sys.path:
     print(f'ROOT:append:{ROOT=}')
     sys.path.append(ROOT)
 
+from multi_processing.detections import as_tuples, decode_results
+from multi_processing.inference_service import get_service, release_service
+from multi_processing.motion import MotionGate
+from multi_processing.ocr_pool import OCRPool
+
 class Detection_processor_type(Enum):
     ANY = 1
     CPU = 2
@@ -35,6 +40,26 @@ class DetectionParams:
     rotate_90_clock:bool
     processor_type:Detection_processor_type
     model_name:str
+    motion_gate:bool = False  # skip YOLO on static scenes, reusing the last detections
+    motion_threshold:float = 0.0  # fraction of changed pixels that counts as motion, 0 = MotionGate default
+
+
+# One OCR pool per device per process, shared by every channel; each pool worker owns its EasyOCR reader
+_OCR_POOLS: Dict[bool, OCRPool] = {}
+_OCR_POOLS_LOCK = threading.Lock()
+
+
+def get_ocr_pool(gpu: bool, size: int = 2, max_queue: int = 16, max_batch: int = 8) -> OCRPool:
+    """Process-wide OCR pool; size, max_queue and max_batch come from the first caller."""
+    with _OCR_POOLS_LOCK:
+        pool = _OCR_POOLS.get(gpu)
+        if pool is None:
+            pool = OCRPool(
+                lambda i: OCRProcessor(channel_name=f"ocr-pool-{i}", languages=['en'], gpu=gpu, shared=False),
+                size=size, max_queue=max_queue, max_batch=max_batch)
+            _OCR_POOLS[gpu] = pool
+            print(f"OCR pool started: {pool.size} workers on {'cuda' if gpu else 'cpu'}, queue {max_queue}, batch {max_batch}")
+        return pool
 
 
 class Detection():
@@ -45,6 +70,12 @@ class Detection():
         self.rotate_90_clock = detection_params.rotate_90_clock
         self.processor_type = detection_params.processor_type
         self.model_path = detection_params.model_name
+        self.imgsz = 640
+        self.warmup_frames = 1  # dummy passes when this process first loads the model
+        self.ttfd_ms: Optional[float] = None  # worker start -> first frame through YOLO
+        self.ocr_pool_size = 2    # OCR worker threads (one EasyOCR reader each) shared by all channels
+        self.ocr_queue_size = 16  # OCR jobs waiting across all channels before submits are refused
+        self.ocr_batch_size = 8   # queued ROIs (from any channels) one pool worker OCRs in one batched call
         self._stop_event = threading.Event()
         self.webhook = Webhook()
         self.running = False
@@ -58,6 +89,11 @@ class Detection():
         self._last_roi_hash: Optional[int] = None
         self._last_text_signature: Optional[str] = None
         self._stable_target = None  # { 'bbox': [x1,y1,x2,y2], 'cls_id': int, 'count': int }
+        # Motion gate: cheap frame-difference pre-filter in front of YOLO
+        self.motion_gate: Optional[MotionGate] = None
+        if detection_params.motion_gate:
+            self.motion_gate = (MotionGate(threshold=detection_params.motion_threshold)
+                                if detection_params.motion_threshold > 0 else MotionGate())
         self.print_start_settings()
 
 
@@ -73,11 +109,13 @@ class Detection():
             "rotate_90_clock": self.rotate_90_clock,
             "processor_type": proc_type,
             "model_path": self.model_path,
+            "imgsz": self.imgsz,
             "min_stable_frames": self.min_stable_frames,
             "iou_threshold": self.iou_threshold,
             "min_area_ratio": self.min_area_ratio,
             "focus_laplacian_thresh": self.focus_laplacian_thresh,
             "ocr_cooldown_frames": self.ocr_cooldown_frames,
+            "motion_gate": self.motion_gate is not None,
         }
         for k, v in settings.items():
             print(f"  {k}: {v}")
@@ -178,8 +216,7 @@ class Detection():
         return int(bin(a ^ b).count('1'))
 
 
-    def save_outputs(self, channel_name: str, channel_run: str, frame, dets, ocr_results,
-        model: YOLO, ocr):
+    def save_outputs(self, channel_name: str, channel_run: str, frame, dets, ocr_results, model: YOLO):
         timestamp = int(time.time())
         save_dir = os.path.join(ROOT, channel_name, channel_run)
         os.makedirs(save_dir, exist_ok=True)
@@ -192,11 +229,58 @@ class Detection():
         #     label = model.names[cls_id] if hasattr(model, 'names') else str(cls_id)
         #     cv2.putText(normal_frame, f"{label} {conf:.2f}", (x1, y1 - 10), cv2.FONT_HERSHEY_PLAIN, 0.9, (0, 255, 0), 2)
         
-        ocr_frame = ocr.draw_ocr_results(frame, ocr_results)
+        # drawing needs no reader: the pool worker that produced ocr_results isn't involved
+        ocr_frame = OCRProcessor.draw_ocr_results(frame, ocr_results)
         ocr_path = os.path.join(save_dir, f"{channel_name}_ocr_{timestamp}.jpg")
         cv2.imwrite(ocr_path, ocr_frame)
 
 
+    def publish_ocr(self, frame, ocr_results: Dict) -> bool:
+        """Queue changed OCR text for the webhook; the event is recorded once delivered. True when queued."""
+        text_sig = f"{ocr_results.get('lot','')}|{ocr_results.get('expiry','')}|{ocr_results.get('text','')[:64]}"
+        if self._last_text_signature == text_sig:
+            return False
+        # Prefer the OCR image (kept in memory, with the JPEG bytes already written to disk) over the frame;
+        # exactly one encode per event, none when the saved bytes already match the webhook settings
+        ocr_image = ocr_results.get('ocr_image')
+        if ocr_image is None:
+            img_b64 = self.webhook.encode_event_image(frame)
+        else:
+            img_b64 = self.webhook.encode_event_image(
+                ocr_image,
+                jpeg=ocr_results.get('ocr_image_jpeg'),
+                jpeg_quality=ocr_results.get('ocr_image_quality')
+            )
+
+        webhook_frame = WebhookFrame(
+            cameraId=self.name,
+            lot=ocr_results.get('lot'),
+            expiry=ocr_results.get('expiry'),
+            all_text=ocr_results.get('text'),
+            mime='detecton_data',
+            imageBase64=img_b64
+        )
+
+        def on_done(outcome: str):
+            if outcome == DELIVERED:
+                print(f"Success frame sent")
+
+        # saved in the database once delivered, by the delivery itself: the row is kept with the event,
+        # so an event spooled and delivered after a restart is recorded too
+        record = dict(
+            camera_name=self.name,
+            all_text=ocr_results.get('text'),
+            lot=ocr_results.get('lot'),
+            expiry=ocr_results.get('expiry'),
+            image_path=ocr_results.get('ocr_image_path'),
+            mime='OCR_EVENT'
+        )
+
+        # delivery retries (and spools) on its own, so the same text isn't queued again meanwhile
+        self._last_text_signature = text_sig
+        return self.webhook.post_async(self.webhook_callback, webhook_frame, on_done=on_done, record=record)
+
+
     def start_worker(self):
         # Reduce OpenCV logs
         try:
@@ -205,6 +289,7 @@ class Detection():
             pass
 
         print(f"[{self.name}] Starting worker for {self.video_source}")
+        t_start = time.time()
 
         # Video
         cap = cv2.VideoCapture(self.video_source)
@@ -226,18 +311,21 @@ class Detection():
             use_cuda = False
         device = 'cuda' if use_cuda else 'cpu'
 
-        # Models
-        model = YOLO(self.model_path)
+        # Models: one inference service per weights file, shared by every channel using it
         try:
-            model.to(device)
+            service = get_service(self.model_path, device=device, imgsz=self.imgsz, warmup_frames=self.warmup_frames)
         except Exception:
             device = 'cpu'
-        
-        # Initialize OCR with runtime fallback if Paddle backend is present but not installed:
-        ocr = OCRProcessor(channel_name=self.name, languages=['en'], gpu=(device == 'cuda'))
-        
+            service = get_service(self.model_path, device=device, imgsz=self.imgsz, warmup_frames=self.warmup_frames)
+        model = service.model
+
+        # OCR runs in the shared pool; this channel keeps at most one job in flight and keeps detecting meanwhile
+        ocr_pool = get_ocr_pool(device == 'cuda', self.ocr_pool_size, self.ocr_queue_size, self.ocr_batch_size)
+        ocr_job = None  # (future, frame, roi, dets, submitted_at)
+        ocr_failed = False
 
         channel_run = f"run-{int(time.time())}"
+        last_dets: List[Tuple[List[int], int, float]] = []
         self.running = True
         try:
             while not self._stop_event.is_set():
@@ -250,26 +338,30 @@ class Detection():
                         time.sleep(0.05)
                         continue
 
-                t0 = time.time()
-                try:
-                    res = model(frame, imgsz=640, conf=0.25, verbose=False, device=device)
-                except Exception:
-                    # Last resort: force CPU
-                    res = model(frame, imgsz=640, conf=0.25, verbose=False, device='cpu')
-                    device = 'cpu'
-                yolo_time = (time.time() - t0) * 1000
-
-                # Parse detections
-                dets: List[Tuple[List[int], int, float]] = []
-                for r in res:
-                    if getattr(r, 'boxes', None) is None:
-                        continue
-                    for b in r.boxes:
-                        dets.append((
-                            [int(round(x)) for x in b.xyxy[0].tolist()],
-                            int(b.cls.item()),
-                            float(b.conf.item())
-                        ))
+                if self.motion_gate is not None and not self.motion_gate.should_infer(frame):
+                    # Static scene: reuse the last detections instead of running YOLO
+                    dets = last_dets
+                    yolo_time = 0.0
+                else:
+                    t0 = time.time()
+                    # batched with frames from the other channels sharing this model
+                    try:
+                        res = [service.predict(frame, imgsz=self.imgsz, conf=0.25, verbose=False, device=device)]
+                    except Exception:
+                        # Last resort: force CPU
+                        res = [service.predict(frame, imgsz=self.imgsz, conf=0.25, verbose=False, device='cpu')]
+                        device = 'cpu'
+                    yolo_time = (time.time() - t0) * 1000
+                    if self.ttfd_ms is None:
+                        self.ttfd_ms = (time.time() - t_start) * 1000
+                        loaded = service.loaded
+                        source = (f"model load {loaded.load_ms:.0f} ms, warm-up {loaded.warmup_ms:.0f} ms"
+                                  if service.clients == 1 else "model already loaded")
+                        print(f"[{self.name}] Time to first detection {self.ttfd_ms:.0f} ms ({source})")
+
+                    # Parse detections (one device->host transfer per frame)
+                    dets: List[Tuple[List[int], int, float]] = as_tuples(decode_results(res), round_xyxy=True)
+                    last_dets = dets
 
                 # Gate OCR by stability across frames to avoid over-processing
                 is_stable = self._update_stability(dets, frame.shape)
@@ -279,6 +371,7 @@ class Detection():
                 do_ocr = is_stable and self._cooldown_remaining == 0
 
                 ocr_triggered = False
+                ocr_time = 0.0
                 ocr_results: Dict = {
                     'text': '',
                     'lot': '',
@@ -286,11 +379,25 @@ class Detection():
                     'lines': [],
                     'processing_time_ms': 0.0,
                     'text_count': 0,
-                    'device': getattr(ocr, 'device', 'cpu')
+                    'device': device
                 }
 
+                # Pick up the OCR job submitted on an earlier frame once the pool has finished it
+                if ocr_job is not None and ocr_job[0].done():
+                    ocr_future, ocr_frame, ocr_roi, ocr_dets, t1 = ocr_job
+                    ocr_job = None
+                    ocr_time = (time.time() - t1) * 1000
+                    if not ocr_future.cancelled():
+                        try:
+                            ocr_results = ocr_future.result()
+                            ocr_triggered = True
+                        except Exception as e:
+                            print(f"[{self.name}] OCR failed: {e}")
+                    if ocr_triggered:
+                        self.save_outputs(self.name, channel_run, ocr_roi, ocr_dets, ocr_results, model)
+
                 # Decide whether to OCR based on focus and duplicates on ROI
-                if do_ocr and self._stable_target:
+                if do_ocr and self._stable_target and ocr_job is None:
                     roi = self._crop_expand(frame, self._stable_target['bbox'], margin_ratio=0.3)
                     # Focus check
                     focus_val = self._variance_of_laplacian(roi)
@@ -298,70 +405,35 @@ class Detection():
                     roi_hash = self._ahash(roi)
                     is_duplicate_roi = (self._last_roi_hash is not None and self._hamming_distance(roi_hash, self._last_roi_hash) <= 2)
 
+                    submitted = False
                     if focus_val >= self.focus_laplacian_thresh and not is_duplicate_roi:
-                        t1 = time.time()
                         # Run OCR on the ROI to reduce load and improve focus
-                        ocr_roi = ocr.process_frame(roi, rotate_90_clock=self.rotate_90_clock, save_frame=True)
-                        ocr_results = ocr_roi
-                        ocr_time = (time.time() - t1) * 1000
-                        ocr_triggered = True
+                        try:
+                            ocr_future = ocr_pool.submit(self.name, roi, rotate_90_clock=self.rotate_90_clock, save_frame=True)
+                            ocr_job = (ocr_future, frame, roi, dets, time.time())
+                            submitted = True
+                        except queue.Full:
+                            print(f"[{self.name}] OCR pool busy ({ocr_pool.pending()} jobs queued), skipping ROI")
+                        except RuntimeError as e:
+                            # no OCR worker could load its model: detection goes on, OCR is reported once
+                            if not ocr_failed:
+                                print(f"[{self.name}] OCR unavailable, continuing without it: {e}")
+                                ocr_failed = True
+                    if submitted:
                         self._last_roi_hash = roi_hash
                         # Start cooldown regardless of OCR outcome to avoid hammering
-                        self.save_outputs(self.name, channel_run, roi, dets, ocr_results, model, ocr)
                         self._cooldown_remaining = self.ocr_cooldown_frames
                     else:
-                        ocr_time = 0.0
-                        # Even if we skip OCR due to focus/duplicate, keep cooldown to prevent spamming
+                        # Even if we skip OCR due to focus/duplicate/busy pool, keep cooldown to prevent spamming
                         self._cooldown_remaining = max(self._cooldown_remaining, int(self.ocr_cooldown_frames / 2))
-                else:
-                    ocr_time = 0.0
 
                 # Save annotated outputs and select best frame for webhook
-                # self.save_outputs(self.name, channel_run, frame, dets, ocr_results, model, ocr)
+                # self.save_outputs(self.name, channel_run, frame, dets, ocr_results, model)
 
                 # Only send when OCR actually ran and produced some text, and text changed
                 sent = False
                 if ocr_triggered and ocr_results.get('text_count', 0) > 0:
-                    text_sig = f"{ocr_results.get('lot','')}|{ocr_results.get('expiry','')}|{ocr_results.get('text','')[:64]}"
-                    if self._last_text_signature != text_sig:
-                        # Choose best image to send: prefer saved OCR frame if exists
-                        img_b64 = self.webhook.to_base64(
-                            frame=self.webhook.resize_frame(frame),
-                            include_data_url=True
-                        )
-                        if ocr_results.get('ocr_image_path'):
-                            try:
-                                ocr_img = cv2.imread(ocr_results.get('ocr_image_path'))
-                                if ocr_img is not None:
-                                    img_b64 = self.webhook.to_base64(
-                                        frame=self.webhook.resize_frame(ocr_img),
-                                        include_data_url=True
-                                    )
-                            except Exception:
-                                pass
-
-                        webhook_frame = WebhookFrame(
-                            cameraId=self.name,
-                            lot=ocr_results.get('lot'),
-                            expiry=ocr_results.get('expiry'),
-                            all_text=ocr_results.get('text'),
-                            mime='detecton_data',
-                            imageBase64=img_b64
-                        )
-                        if self.webhook.send_webhook(self.webhook_callback, webhook_frame):
-                            sent = True
-                            self._last_text_signature = text_sig
-                            print(f"Success frame sent")
-                            # save event in the database
-                            oaix_db_event = OAIX_db_Event()
-                            oaix_db_event.app_ocr_event(
-                                camera_name=self.name,
-                                all_text=ocr_results.get('text'),
-                                lot=ocr_results.get('lot'),
-                                expiry=ocr_results.get('expiry'),
-                                image_path=ocr_results.get('ocr_image_path'),
-                                mime='OCR_EVENT'
-                            )
+                    sent = self.publish_ocr(ocr_frame, ocr_results)
 
                 stable_cnt = self._stable_target['count'] if self._stable_target else 0
                 # print(f"[{self.name}] YOLO={len(dets)} OCR={ocr_results.get('text_count', 0)} | YOLO={yolo_time:.1f}ms OCR={ocr_time:.1f}ms | stable={stable_cnt}/{self.min_stable_frames} | ocr={'Y' if ocr_triggered else 'N'} | sent={'Y' if sent else 'N'} | cd={self._cooldown_remaining}")
@@ -371,7 +443,13 @@ class Detection():
             pass
         finally:
             cap.release()
+            if ocr_job is not None:
+                ocr_job[0].cancel()
+            # the last channel on this model closes its service and frees the weights
+            release_service(service)
             self.running = False
+            if self.motion_gate is not None:
+                print(f"[{self.name}] Motion gate skipped {self.motion_gate.frames_skipped}/{self.motion_gate.frames_seen} frames")
             print(f"[{self.name}] Exiting worker")
 
     
@@ -383,7 +461,10 @@ class Detection():
 
 
 class DetectionManager():
-    def __init__(self):
+    def __init__(self, ocr_pool_size: int = 2, ocr_queue_size: int = 16, ocr_batch_size: int = 8):
+        self.ocr_pool_size = ocr_pool_size
+        self.ocr_queue_size = ocr_queue_size
+        self.ocr_batch_size = ocr_batch_size
         self._lock = threading.Lock()
         self.detections:Dict[str, Detection] = {}
         self.threads:Dict[str, threading.Thread] = {}
@@ -392,6 +473,9 @@ class DetectionManager():
         with self._lock:
             if detection_params.name not in self.detections:
                 d = Detection(detection_params=detection_params)
+                d.ocr_pool_size = self.ocr_pool_size
+                d.ocr_queue_size = self.ocr_queue_size
+                d.ocr_batch_size = self.ocr_batch_size
                 t = threading.Thread(
                     target=d.start_worker,
                     args=(),
@@ -1,19 +1,81 @@
+import atexit
 import base64
+import os
+import sys
+import threading
 from uu import Error
 import requests
-from typing import Dict
+from typing import Callable, Dict, Optional
 import cv2
 from dataclasses import dataclass
 
 # Note: These imports work when running from the multiprocessing directory
 try:
     from .db.db_logger import OAIX_db_Logger, LoggerLevel
+    from .db.db_events import OAIX_db_Event
+    from .db.error_codes import ErrorCode
     from .app_base import AppBase
 except ImportError:
     # Fallback for when running directly
     from db.db_logger import OAIX_db_Logger, LoggerLevel
+    from db.db_events import OAIX_db_Event
+    from db.error_codes import ErrorCode
     from app_base import AppBase
 
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from multi_processing.image_encoding import JpegSettings, webhook_image
+from multi_processing.webhook_delivery import DELIVERED, REJECTED, SPOOLED, WebhookDelivery, WebhookEvent
+
+# One delivery subsystem per process: pooled sessions, per-channel queues, retries and the disk spool
+WEBHOOK_SPOOL_DIR = os.path.join(ROOT, 'webhook_spool')
+WEBHOOK_SENDERS = 4  # concurrent POSTs; throughput ~ senders / endpoint response time
+# Batch mode (the callback endpoint must accept it): group events per callback URL into one POST
+WEBHOOK_BATCH_EVENTS = int(os.getenv("WEBHOOK_BATCH_EVENTS", "0"))          # >1 turns batching on
+WEBHOOK_BATCH_WINDOW_S = float(os.getenv("WEBHOOK_BATCH_WINDOW_S", "2.0"))  # max wait before a partial batch goes
+WEBHOOK_BATCH_FORMAT = os.getenv("WEBHOOK_BATCH_FORMAT", "json")           # JSON array or "ndjson"
+WEBHOOK_MULTIPART = os.getenv("WEBHOOK_MULTIPART", "0") == "1"            # JPEGs as binary parts, not base64
+WEBHOOK_SHUTDOWN_TIMEOUT_S = 10.0
+# Event image: resized by scale, longer side capped at max_side (0 = no cap), JPEG quality
+WEBHOOK_IMAGE = JpegSettings(
+    scale=float(os.getenv("WEBHOOK_IMAGE_SCALE", "0.5")),
+    max_side=int(os.getenv("WEBHOOK_IMAGE_MAX_SIDE", "0")),
+    quality=int(os.getenv("WEBHOOK_JPEG_QUALITY", "95")),
+)
+_delivery: Optional[WebhookDelivery] = None
+_delivery_lock = threading.Lock()
+
+
+def record_delivered(event: WebhookEvent) -> None:
+    """Write a delivered event's webhook_events row (event.record holds app_ocr_event's arguments)."""
+    if event.record:
+        OAIX_db_Event().app_ocr_event(**event.record)
+
+
+def get_delivery() -> WebhookDelivery:
+    global _delivery
+    with _delivery_lock:
+        if _delivery is None:
+            _delivery = WebhookDelivery(spool_dir=WEBHOOK_SPOOL_DIR, senders=WEBHOOK_SENDERS,
+                                        batch_events=WEBHOOK_BATCH_EVENTS, batch_window_s=WEBHOOK_BATCH_WINDOW_S,
+                                        batch_format=WEBHOOK_BATCH_FORMAT, multipart=WEBHOOK_MULTIPART,
+                                        on_delivered=record_delivered)
+            # send (or spool) whatever is still queued when the process exits
+            atexit.register(shutdown_delivery)
+        return _delivery
+
+
+def shutdown_delivery(timeout: float = WEBHOOK_SHUTDOWN_TIMEOUT_S) -> None:
+    """Send queued events, partial batches included, spooling whatever doesn't make it within timeout."""
+    global _delivery
+    with _delivery_lock:
+        delivery, _delivery = _delivery, None
+    if delivery is not None:
+        delivery.close(timeout)
+
 @dataclass
 class WebhookFrame():
     cameraId:str
@@ -32,15 +94,21 @@ class Webhook(AppBase):
         
         return frame_based64
 
+    def encode_event_image(self, image, jpeg: Optional[bytes] = None, jpeg_quality: Optional[int] = None) -> str:
+        """
+        Data URL for the event image at WEBHOOK_IMAGE settings, with at most one JPEG encode;
+        jpeg (encoded from image at full size with jpeg_quality) is reused when the settings match
+        """
+        return webhook_image(image, WEBHOOK_IMAGE, jpeg=jpeg, jpeg_quality=jpeg_quality)
+
     def resize_frame(self, frame):
         height, width, _ = frame.shape
         half_h = height // 2
         half_w = width // 2
         return cv2.resize(frame, (half_w, half_h), cv2.INTER_LINEAR)
     
-    def send_webhook(self, webhook_url: str, webhook_frame: WebhookFrame) -> bool:
-        
-        body = {
+    def to_body(self, webhook_frame: WebhookFrame) -> Dict:
+        return {
             "cameraId":webhook_frame.cameraId,
             "lot":webhook_frame.lot,
             "expiry":webhook_frame.expiry,
@@ -49,6 +117,30 @@ class Webhook(AppBase):
             "imageBase64":webhook_frame.imageBase64
         }
 
+    def post_async(self, webhook_url: str, webhook_frame: WebhookFrame,
+                   on_done: Optional[Callable[[str], None]] = None, record: Optional[Dict] = None) -> bool:
+        """
+        Queue the event for background delivery and return at once.
+        on_done(outcome) runs on a sender thread with DELIVERED, REJECTED or SPOOLED.
+        record: app_ocr_event arguments, written to webhook_events once the event is delivered, also when
+        that happens from the spool after a restart (on_done is lost then)
+        """
+        channel = webhook_frame.cameraId
+
+        def done(outcome: str):
+            if outcome == SPOOLED:
+                self.log_error(ErrorCode.WEBHOOK_SPOOLED, webhook_url, channel)
+            elif outcome == REJECTED:
+                self.log_error(ErrorCode.WEBHOOK_REJECTED, webhook_url, channel)
+            if on_done is not None:
+                on_done(outcome)
+
+        return get_delivery().submit(channel, webhook_url, self.to_body(webhook_frame), on_done=done, record=record)
+
+    def send_webhook(self, webhook_url: str, webhook_frame: WebhookFrame) -> bool:
+        
+        body = self.to_body(webhook_frame)
+
         headers = {
             "Content-Type":"application/json"
         }
@@ -56,7 +148,7 @@ class Webhook(AppBase):
         response = None
 
         try:
-            response = requests.post(webhook_url, json=body, headers=headers, timeout=10)
+            response = get_delivery().session(webhook_url).post(webhook_url, json=body, headers=headers, timeout=10)
             print(response.status_code)
             print(response.text) 
         except requests.exceptions.RequestException as e:
@@ -11,10 +11,15 @@ import pandas as pd
 import sqlite3
 import os
 from PIL import Image
-from datetime import datetime, timedelta
+from dataclasses import replace
+from datetime import datetime, time, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 
+from multi_processing.thumbnails import cache_from_env
+from ray_actors.db.event_search import (EventQuery, EventPage, list_cameras, time_range, last_event_id,
+                                        read_snapshot, search_events, summarize_events)
+
 # Page config
 st.set_page_config(
     page_title="OAIX Detection Viewer",
@@ -27,34 +32,68 @@ st.set_page_config(
 DB_PATH = "/mnt/c/code/AI_Vision/multiprocessing/oaix.db"
 OCR_BASE_PATH = "/mnt/c/code/AI_Vision/multiprocessing"
 
-@st.cache_data(ttl=30)  # Cache for 30 seconds
-def load_detection_data():
-    """Load detection data from the database."""
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        query = """
-        SELECT 
-            id,
-            camera_name,
-            lot,
-            expiry,
-            all_text,
-            created_at,
-            mime,
-            image_path
-        FROM webhook_events 
-        ORDER BY created_at DESC
-        """
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        # Convert created_at to datetime
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        
-        return df
-    except Exception as e:
-        st.error(f"Error loading data from database: {e}")
-        return pd.DataFrame()
+PAGE_SIZES = [50, 100, 250]
+
+def get_connection():
+    """One read-only connection per browser session (sqlite3 connections aren't shared across threads)."""
+    if "db_conn" not in st.session_state:
+        st.session_state.db_conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    return st.session_state.db_conn
+
+def _merge_head(head: EventPage, new_rows, page_size: int, total: int) -> EventPage:
+    """Newest page after new_rows arrived: merged newest first, cut back to page_size."""
+    rows = sorted(new_rows + head.rows, key=lambda r: (r['created_at'], r['id']), reverse=True)[:page_size]
+    cursor = (rows[-1]['created_at'], rows[-1]['id']) if total > len(rows) else None
+    return EventPage(rows=rows, cursor=cursor)
+
+def load_detection_data(conn, query: EventQuery):
+    """
+    Summary and newest page of the events matching query, kept in session state.
+
+    When the filters change, both are computed in SQL over the filtered range; with only camera and date
+    filters set, the summary comes from the per-day rollup table instead of the events. Every later rerun only
+    fetches the events with id > the last id seen, and merges them (and their summary) in. That way
+    refreshing costs the same however large webhook_events grows, and only one page of rows is held.
+    """
+    state = st.session_state
+    with read_snapshot(conn):
+        if state.get('query') != query:
+            state.summary = summarize_events(conn, query)
+            state.head = search_events(conn, query)
+            state.cursors = [None]   # cursors[i]: `after` cursor of page i
+            state.page = 0
+        else:
+            new = replace(query, since_id=state.last_seen_id)
+            added = summarize_events(conn, new)
+            if added.total:
+                state.summary.add(added)
+                new_rows = search_events(conn, replace(new, limit=query.limit)).rows
+                state.head = _merge_head(state.head, new_rows, query.limit, state.summary.total)
+        state.query = query
+        state.last_seen_id = last_event_id(conn)
+    return state.summary, state.head
+
+def load_page(conn, query: EventQuery) -> EventPage:
+    """
+    The page the user is on (0 = newest). Older pages are read through keyset cursors on
+    (created_at, id), so rows don't shift under the user when new events arrive.
+    """
+    state = st.session_state
+    if state.page == 0:
+        page = state.head
+        # the head moves as events arrive: re-anchor the cursor chain on it
+        state.cursors = [None]
+    else:
+        page = search_events(conn, query, after=state.cursors[state.page])
+    if page.cursor is not None and len(state.cursors) == state.page + 1:
+        state.cursors.append(page.cursor)
+    return page
+
+def to_dataframe(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=['id', 'camera_name', 'lot', 'expiry', 'all_text', 'created_at', 'mime', 'image_path'])
+    # Convert created_at to datetime
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    return df
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_app_logs():
@@ -83,8 +122,16 @@ def load_app_logs():
         st.error(f"Error loading logs from database: {e}")
         return pd.DataFrame()
 
-def display_image(image_path):
-    """Display an image from the given path."""
+@st.cache_resource
+def get_thumbnail_cache():
+    """One thumbnail cache for all sessions (OAIX_THUMB_DIR, OAIX_THUMB_CACHE_MB)."""
+    return cache_from_env()
+
+def display_image(image_path, full_key=None):
+    """
+    Display the thumbnail of an event image. The full-resolution file is only read when the
+    "Full resolution" checkbox (shown when full_key is given) is ticked.
+    """
     if not image_path:
         st.warning("No image path provided")
         return
@@ -99,12 +146,16 @@ def display_image(image_path):
         else:
             full_path = image_path
             
-        if os.path.exists(full_path):
+        thumbnail = get_thumbnail_cache().get(full_path)
+        if thumbnail is None:
+            st.error(f"Image not found: {full_path}")
+            st.info(f"Looking for: {full_path}")
+            return
+        if full_key is not None and st.checkbox("Full resolution", key=f"full_{full_key}"):
             image = Image.open(full_path)
             st.image(image, caption=f"Detection Image: {os.path.basename(full_path)}", width='stretch')
         else:
-            st.error(f"Image not found: {full_path}")
-            st.info(f"Looking for: {full_path}")
+            st.image(thumbnail, caption=os.path.basename(full_path), width='stretch')
     except Exception as e:
         st.error(f"Error loading image: {e}")
 
@@ -117,10 +168,14 @@ def main():
     # Sidebar
     st.sidebar.title("Filters & Options")
     
-    # Load data
-    df = load_detection_data()
+    conn = get_connection()
+    try:
+        oldest, newest = time_range(conn)
+    except sqlite3.Error as e:
+        st.error(f"Error loading data from database: {e}")
+        return
     
-    if df.empty:
+    if oldest is None:
         st.warning("No detection data found in the database.")
         if st.button("🔄 Refresh Data"):
             st.rerun()
@@ -130,12 +185,12 @@ def main():
     st.sidebar.subheader("🔍 Filters")
     
     # Camera filter
-    cameras = ["All"] + list(df['camera_name'].unique())
+    cameras = ["All"] + list_cameras(conn)
     selected_camera = st.sidebar.selectbox("Camera:", cameras)
     
     # Date range filter
-    min_date = df['created_at'].min().date()
-    max_date = df['created_at'].max().date()
+    min_date = datetime.strptime(oldest[:10], "%Y-%m-%d").date()
+    max_date = datetime.strptime(newest[:10], "%Y-%m-%d").date()
     
     # Calculate default range - use actual date range or 7 days, whichever is smaller
     default_start = max(min_date, max_date - timedelta(days=7))
@@ -154,62 +209,46 @@ def main():
     lot_filter = st.sidebar.text_input("Lot number contains:", "")
     expiry_filter = st.sidebar.text_input("Expiry contains:", "")
     
-    # Apply filters
-    filtered_df = df.copy()
-    
-    if selected_camera != "All":
-        filtered_df = filtered_df[filtered_df['camera_name'] == selected_camera]
-    
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[
-            (filtered_df['created_at'].dt.date >= start_date) & 
-            (filtered_df['created_at'].dt.date <= end_date)
-        ]
-    
-    if text_filter:
-        filtered_df = filtered_df[
-            filtered_df['all_text'].str.contains(text_filter, case=False, na=False)
-        ]
-    
-    if lot_filter:
-        filtered_df = filtered_df[
-            filtered_df['lot'].str.contains(lot_filter, case=False, na=False)
-        ]
-    
-    if expiry_filter:
-        filtered_df = filtered_df[
-            filtered_df['expiry'].str.contains(expiry_filter, case=False, na=False)
-        ]
+    page_size = st.sidebar.selectbox("Rows per page:", PAGE_SIZES, index=1)
+    
+    # Filters run in SQL (event_search); only the current page of rows is loaded
+    start = datetime.combine(date_range[0], time.min) if len(date_range) >= 1 else None
+    end = datetime.combine(date_range[1] + timedelta(days=1), time.min) if len(date_range) == 2 else None
+    query = EventQuery(
+        text=text_filter,
+        lot=lot_filter,
+        expiry=expiry_filter,
+        camera=None if selected_camera == "All" else selected_camera,
+        start=start,
+        end=end,
+        limit=page_size
+    )
+    summary, _ = load_detection_data(conn, query)
     
     # Display summary
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Detections", len(filtered_df))
+        st.metric("Total Detections", summary.total)
     
     with col2:
-        unique_cameras = filtered_df['camera_name'].nunique()
-        st.metric("Cameras", unique_cameras)
+        st.metric("Cameras", len(summary.by_camera))
     
     with col3:
-        detections_with_lot = len(filtered_df[filtered_df['lot'].notna() & (filtered_df['lot'] != "")])
-        st.metric("With Lot Info", detections_with_lot)
+        st.metric("With Lot Info", summary.with_lot)
     
     with col4:
-        detections_with_expiry = len(filtered_df[filtered_df['expiry'].notna() & (filtered_df['expiry'] != "")])
-        st.metric("With Expiry Info", detections_with_expiry)
+        st.metric("With Expiry Info", summary.with_expiry)
     
     # Charts
-    if len(filtered_df) > 0:
+    if summary.total > 0:
         st.subheader("📊 Detection Analytics")
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Detections over time
-            daily_counts = filtered_df.groupby(filtered_df['created_at'].dt.date).size().reset_index()
-            daily_counts.columns = ['Date', 'Count']
+            daily_counts = pd.DataFrame(sorted(summary.by_day.items()), columns=['Date', 'Count'])
             
             fig_timeline = px.line(
                 daily_counts, 
@@ -222,8 +261,10 @@ def main():
         
         with col2:
             # Detections by camera
-            camera_counts = filtered_df['camera_name'].value_counts().reset_index()
-            camera_counts.columns = ['Camera', 'Count']
+            camera_counts = pd.DataFrame(
+                sorted(summary.by_camera.items(), key=lambda kv: kv[1], reverse=True),
+                columns=['Camera', 'Count']
+            )
             
             fig_cameras = px.pie(
                 camera_counts,
@@ -233,6 +274,11 @@ def main():
             )
             st.plotly_chart(fig_cameras, width='stretch')
     
+    # Current page of events
+    page = load_page(conn, query)
+    filtered_df = to_dataframe(page.rows)
+    pages = max(1, -(-summary.total // page_size))
+    
     # Display mode selection
     st.subheader("📋 Detection Data")
     
@@ -242,6 +288,22 @@ def main():
         horizontal=True
     )
     
+    # Page navigation (keyset pages, newest first)
+    nav1, nav2, nav3 = st.columns([1, 2, 1])
+    
+    with nav1:
+        if st.button("◀ Newer", disabled=st.session_state.page == 0):
+            st.session_state.page -= 1
+            st.rerun()
+    
+    with nav2:
+        st.caption(f"Page {st.session_state.page + 1} of {pages} · {summary.total} detections")
+    
+    with nav3:
+        if st.button("Older ▶", disabled=page.cursor is None):
+            st.session_state.page += 1
+            st.rerun()
+    
     if display_mode == "Table View":
         # Table view with selectable rows
         selected_indices = st.dataframe(
@@ -261,7 +323,7 @@ def main():
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                display_image(selected_row['image_path'])
+                display_image(selected_row['image_path'], full_key=f"table_{selected_row['id']}")
             
             with col2:
                 st.write("**Detection Information:**")
@@ -280,7 +342,7 @@ def main():
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
-                    display_image(row['image_path'])
+                    display_image(row['image_path'], full_key=f"card_{row['id']}")
                 
                 with col2:
                     st.write("**Detection Information:**")
@@ -294,7 +356,7 @@ def main():
                     st.text(row['all_text'] or "No text detected")
     
     elif display_mode == "Image Gallery":
-        # Image gallery view
+        # Image gallery view (thumbnails only; the table and card views load full images on demand)
         cols_per_row = 3
         for i in range(0, len(filtered_df), cols_per_row):
             cols = st.columns(cols_per_row)
@@ -316,6 +378,7 @@ def main():
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col2:
+        # every rerun already picks up new events (id > last seen); this also refreshes the logs
         if st.button("🔄 Refresh Data", width='stretch'):
             st.cache_data.clear()
             st.rerun()
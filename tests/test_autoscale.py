@@ -0,0 +1,127 @@
+import queue
+
+from multi_processing.autoscale import SCALE_DOWN, SCALE_UP, scale_decision
+from multi_processing.config import WorkerConfig
+from multi_processing.placement import PlacementScheduler
+from multi_processing.supervision import WorkerStats, WorkerSupervisor
+
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def _config(**cfg):
+    base = dict(autoscale=True, min_workers=1, max_workers=3, max_streams_per_worker=4,
+                scale_cooldown_s=0, startup_grace_s=0)
+    base.update(cfg)
+    return WorkerConfig(**base)
+
+
+def _start(dispatch, n, first=0):
+    for i in range(first, first + n):
+        dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": f"rtsp://{i}"})
+
+
+def _supervisor(num_workers=1, gpus=(0, 1), **cfg):
+    config = _config(**cfg)
+    cmd_qs = [queue.Queue() for _ in range(num_workers)]
+    workers = [FakeProcess() for _ in range(num_workers)]
+    result_q = queue.Queue()
+    stats = WorkerStats(config.max_workers)
+    scheduler = PlacementScheduler([gpus[i % len(gpus)] for i in range(num_workers)],
+                                   send=lambda idx, cmd: cmd_qs[idx].put(cmd))
+    sup = WorkerSupervisor(workers, cmd_qs, result_q, stats, scheduler, spawn=lambda idx: FakeProcess(),
+                           make_cmd_q=queue.Queue, config=config, gpus=gpus)
+    return sup, scheduler, cmd_qs, result_q
+
+
+def _drain(q):
+    out = []
+    while not q.empty():
+        out.append(q.get_nowait())
+    return out
+
+
+def test_decision_thresholds():
+    config = _config()
+    s = PlacementScheduler([0], send=lambda idx, cmd: None)
+    _start(s.dispatch, 4)
+    assert scale_decision(s, config) is None
+    _start(s.dispatch, 1, first=4)
+    assert scale_decision(s, config) == (SCALE_UP, None)
+    # slow inference alone also triggers growth
+    s = PlacementScheduler([0], send=lambda idx, cmd: None)
+    _start(s.dispatch, 2)
+    s.update_infer_ms(0, 90.0)
+    assert scale_decision(s, _config(scale_up_infer_ms=60.0)) == (SCALE_UP, None)
+
+
+def test_decision_shrinks_with_hysteresis_and_waits_for_transitions():
+    config = _config()
+    s = PlacementScheduler([0, 0, 0], send=lambda idx, cmd: None)
+    _start(s.dispatch, 5)
+    assert scale_decision(s, config) is None   # 5 / 2 = 2.5 > 0.5 * 4
+    for i in range(3):
+        s.dispatch({"type": "STOP", "stream_id": f"cam{i}"})
+    action, victim = scale_decision(s, config)
+    assert action == SCALE_DOWN and len(s.workers[victim].streams) == 0
+    s.add_worker(gpu_id=0)
+    assert scale_decision(s, config) is None   # a worker is still warming up
+
+
+def test_scale_up_waits_for_warm_up_before_migrating():
+    sup, scheduler, cmd_qs, result_q = _supervisor(num_workers=1)
+    _start(scheduler.dispatch, 6)
+    _drain(cmd_qs[0])
+
+    assert sup.autoscale() == (SCALE_UP, None)
+    assert len(sup.workers) == 2 and scheduler.workers[1].state == "warming"
+    assert scheduler.workers[1].gpu_id == 1  # GPU with the fewest live workers
+    sup.autoscale()
+    assert cmd_qs[1].empty() and len(scheduler.workers[0].streams) == 6
+
+    sup.stats.ready[1] = 1.0   # worker finished model load + warm-up
+    sup.autoscale()
+    assert scheduler.workers[1].state == "active"
+    assert len(scheduler.workers[0].streams) == len(scheduler.workers[1].streams) == 3
+    started = [c["stream_id"] for c in _drain(cmd_qs[1])]
+    stopped = [c["stream_id"] for c in _drain(cmd_qs[0])]
+    assert sorted(started) == sorted(stopped) == sorted(scheduler.workers[1].streams)
+    event = result_q.get_nowait()
+    assert event["event"] == "worker_scaled" and event["action"] == "added"
+    assert event["worker"] == 1 and sorted(event["streams"]) == sorted(started)
+
+
+def test_scale_down_drains_then_retires():
+    sup, scheduler, cmd_qs, result_q = _supervisor(num_workers=2)
+    _start(scheduler.dispatch, 2)
+    for q in cmd_qs:
+        _drain(q)
+
+    action, victim = sup.autoscale()
+    assert action == SCALE_DOWN
+    other = 1 - victim
+    assert scheduler.workers[victim].state == "draining"
+    assert len(scheduler.workers[other].streams) == 2
+    assert [c["type"] for c in _drain(cmd_qs[victim])] == ["STOP", "SHUTDOWN"]
+
+    sup.workers[victim].alive = False   # worker exited after SHUTDOWN
+    sup.autoscale()
+    assert scheduler.workers[victim].state == "retired"
+    assert result_q.get_nowait()["action"] == "retired"
+    assert sup.autoscale() is None      # min_workers reached
+
+    # the retired slot is reused by the next scale up
+    _start(scheduler.dispatch, 7, first=10)
+    assert sup.autoscale() == (SCALE_UP, None)
+    assert scheduler.workers[victim].state == "warming" and len(sup.workers) == 2
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from multi_processing.batch_writer import BatchWriter
+
+
+class Sink:
+    """write() target recording each batch; optionally slow or gated."""
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, rows):
+        self.gate.wait()
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("disk I/O error")
+        self.batches.append(list(rows))
+
+
+def _wait(cond, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_full_batch_goes_at_once_and_partial_batch_after_flush_ms():
+    sink = Sink()
+    w = BatchWriter(sink, max_rows=4, flush_ms=150)
+    for i in range(6):
+        assert w.put(i)
+    assert _wait(lambda: len(sink.batches) == 1)
+    assert sink.batches == [[0, 1, 2, 3]]               # did not wait for the window
+    t0 = time.monotonic()
+    assert _wait(lambda: len(sink.batches) == 2)
+    assert sink.batches[1] == [4, 5]
+    assert time.monotonic() - t0 < 1.0
+    w.close()
+    assert w.written == 6 and w.batches == 2
+
+
+def test_flush_writes_queued_rows_synchronously():
+    sink = Sink()
+    w = BatchWriter(sink, max_rows=100, flush_ms=60_000)
+    for i in range(3):
+        w.put(i)
+    assert w.flush(timeout=5)
+    assert sink.batches == [[0, 1, 2]] and w.pending() == 0
+    w.close()
+
+
+def test_full_queue_applies_backpressure_then_drops():
+    sink = Sink()
+    sink.gate.clear()                                   # writer stuck in write()
+    w = BatchWriter(sink, max_rows=2, flush_ms=0, queue_size=2)
+    w.put("a")
+    assert _wait(lambda: w.pending() == 1 and not w._rows)   # "a" taken by the stuck writer
+    assert w.put("b") and w.put("c")
+    t0 = time.monotonic()
+    assert not w.put("d", timeout=0.1)                  # waited, then dropped
+    assert time.monotonic() - t0 >= 0.1
+    assert not w.put("e")                               # no timeout: dropped at once
+    assert w.dropped == 2
+
+    threading.Timer(0.1, sink.gate.set).start()         # writer catches up while put() waits
+    assert w.put("f", timeout=5)
+    assert w.close(timeout=5)
+    assert [r for b in sink.batches for r in b] == ["a", "b", "c", "f"]
+    with pytest.raises(RuntimeError):
+        w.put("g")
+
+
+def test_failed_write_is_counted_and_writer_keeps_going():
+    sink = Sink(fail=True)
+    w = BatchWriter(sink, max_rows=2, flush_ms=10)
+    w.put(1)
+    w.put(2)
+    assert w.flush(timeout=5)
+    assert w.failed == 2 and w.written == 0
+    sink.fail = False
+    w.put(3)
+    assert w.close(timeout=5)
+    assert sink.batches == [[3]] and w.stats()["written"] == 1
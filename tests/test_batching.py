@@ -0,0 +1,50 @@
+from multi_processing.batching import FrameBatcher, infer_batch
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, frames, **kwargs):
+        self.calls.append(list(frames))
+        return [f"result-{f}" for f in frames]
+
+
+def test_batcher_keeps_newest_frame_per_stream():
+    b = FrameBatcher(batch_size=4, max_wait_ms=1000)
+    b.add("cam1", "f1", ts=0.0)
+    b.add("cam1", "f2", ts=0.5)
+    assert len(b) == 1
+    assert b.drain() == [("cam1", "f2")]
+
+
+def test_batcher_ready_on_full_expected_or_timeout():
+    b = FrameBatcher(batch_size=2, max_wait_ms=10)
+    b.add("cam1", "f1", ts=0.0)
+    assert not b.ready(expected=3, now=0.001)
+    assert b.ready(expected=1, now=0.001)
+    assert b.ready(expected=3, now=0.020)
+    b.add("cam2", "f2", ts=0.0)
+    assert b.ready(expected=3, now=0.0)
+
+
+def test_infer_batch_routes_results_to_streams():
+    model = FakeModel()
+    items = [("cam1", "a"), ("cam2", "b"), ("cam3", "c")]
+    out = infer_batch(model, items, imgsz=640)
+    assert len(model.calls) == 1
+    assert out == [("cam1", "result-a"), ("cam2", "result-b"), ("cam3", "result-c")]
+
+
+def test_refreshed_streams_dont_starve_the_others():
+    # more streams than batch slots, every stream refreshed each round: a refresh must keep the
+    # stream's place in line, otherwise cam3 (added last every round) never makes a batch
+    b = FrameBatcher(batch_size=2, max_wait_ms=1000)
+    drained = {"cam1": 0, "cam2": 0, "cam3": 0}
+    for n in range(6):
+        for sid in drained:
+            b.add(sid, f"{sid}-{n}", ts=float(n))
+        for sid, frame in b.drain():
+            assert frame == f"{sid}-{n}"  # always the newest frame
+            drained[sid] += 1
+    assert min(drained.values()) >= 3, drained
@@ -0,0 +1,49 @@
+import time
+
+import cv2
+import numpy as np
+
+from multi_processing.capture import StreamReader
+
+
+def _write_clip(path, frames=20, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 10 % 255, dtype=np.uint8))
+    writer.release()
+
+
+def test_reader_publishes_newest_frame_then_fails_at_eof(tmp_path):
+    clip = tmp_path / "clip.avi"
+    _write_clip(clip)
+    reader = StreamReader("cam1", str(clip), reconnect_attempts=0, reconnect_delay_s=0.0)
+    reader.start()
+    deadline = time.time() + 5
+    while not reader.failed and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert reader.failed
+    assert reader.error == "read_failed"
+    seq, ts, frame = reader.latest()
+    assert seq == reader.frames_decoded == 20
+    assert frame.shape == (48, 64, 3)
+    assert reader.latest(after_seq=seq) is None
+
+
+def test_reader_reports_open_failure():
+    reader = StreamReader("cam1", "/nonexistent/clip.avi", reconnect_attempts=0, reconnect_delay_s=0.0)
+    reader.start()
+    reader._thread.join(timeout=5)
+    assert reader.failed
+    assert reader.error == "open_failed"
+
+
+def test_reader_skips_frames_over_fps_budget(tmp_path):
+    clip = tmp_path / "clip.avi"
+    _write_clip(clip)
+    reader = StreamReader("cam1", str(clip), reconnect_attempts=0, reconnect_delay_s=0.0)
+    reader.set_max_fps(1.0)
+    reader.start()
+    reader._thread.join(timeout=5)
+    assert reader.frames_decoded + reader.frames_skipped == 20
+    assert reader.frames_skipped > 0
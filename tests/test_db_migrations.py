@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, create_mock_engine
+
+from ray_actors.db.db_migrations import SCHEMA_VERSION, migrate
+
+# oaix.db as created before the schema was versioned: tables only, no indexes
+OLD_SCHEMA = """
+CREATE TABLE webhook_events (id INTEGER NOT NULL PRIMARY KEY, camera_name VARCHAR NOT NULL, lot VARCHAR,
+    expiry VARCHAR, all_text VARCHAR, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL,
+    mime VARCHAR NOT NULL, image_path VARCHAR);
+CREATE TABLE app_logs (id INTEGER NOT NULL PRIMARY KEY, log_code INTEGER NOT NULL, level VARCHAR NOT NULL,
+    message VARCHAR, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL);
+INSERT INTO webhook_events (camera_name, lot, all_text, mime) VALUES ('cam1', 'A1', 'LOT A1', 'OCR_EVENT');
+"""
+
+
+def _old_db(tmp_path):
+    path = tmp_path / "oaix.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.close()
+    return path
+
+
+def test_existing_database_is_migrated_once(tmp_path):
+    path = _old_db(tmp_path)
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrate(engine) == SCHEMA_VERSION
+    assert migrate(engine) == SCHEMA_VERSION            # second start: nothing to do
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"ix_webhook_events_camera_created", "ix_webhook_events_created", "ix_webhook_events_lot",
+            "ix_app_logs_created", "ix_app_logs_log_code"} <= indexes
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM webhook_events WHERE camera_name = 'cam1' "
+                        "ORDER BY created_at DESC LIMIT 10").fetchall()
+    assert "ix_webhook_events_camera_created" in str(plan)
+    assert conn.execute("SELECT lot FROM webhook_events").fetchall() == [("A1",)]   # data kept
+
+
+def test_newer_database_is_refused(tmp_path):
+    path = _old_db(tmp_path)
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    conn.close()
+    with pytest.raises(RuntimeError):
+        migrate(create_engine(f"sqlite:///{path}"))
+
+
+def test_other_databases_are_left_alone():
+    executed = []
+    engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: executed.append(sql))
+    assert migrate(engine) == 0
+    assert executed == []
+
+
+def test_full_text_index_skipped_by_v2_is_created_on_a_later_start(tmp_path):
+    path = _old_db(tmp_path)
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine)
+    # what v2 leaves behind on a SQLite without FTS5: no index, but the version moved on
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE webhook_events_fts; DROP TRIGGER webhook_events_fts_ai; "
+                       "DROP TRIGGER webhook_events_fts_ad; DROP TRIGGER webhook_events_fts_au;")
+    conn.close()
+    assert migrate(engine) == SCHEMA_VERSION
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT rowid FROM webhook_events_fts WHERE webhook_events_fts MATCH '\"lot a1\"'").fetchall() == [(1,)]
+    conn.close()
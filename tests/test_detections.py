@@ -0,0 +1,43 @@
+import numpy as np
+
+from multi_processing.detections import as_lists, as_tuples, decode_boxes, decode_results
+
+
+class FakeBoxes:
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32)
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.boxes = FakeBoxes(data)
+
+
+def test_decode_results_concatenates_images():
+    results = [FakeResult([[10.4, 20.6, 30.0, 40.0, 0.9, 2]]),
+               None,
+               FakeResult([[1, 2, 3, 4, 0.5, 0], [5, 6, 7, 8, 0.25, 7]])]
+    dets = decode_results(results)
+    assert len(dets) == 3
+    assert dets['cls'].tolist() == [2, 0, 7]
+    assert np.allclose(dets['conf'], [0.9, 0.5, 0.25])
+    assert dets['xyxy'].shape == (3, 4)
+
+
+def test_tracked_boxes_use_last_two_columns():
+    # with tracking enabled boxes.data is x1 y1 x2 y2 track_id conf cls
+    dets = decode_boxes(FakeBoxes([[1, 2, 3, 4, 42, 0.75, 5]]))
+    assert dets['cls'][0] == 5 and np.isclose(dets['conf'][0], 0.75)
+
+
+def test_legacy_forms():
+    dets = decode_results([FakeResult([[10.4, 20.6, 30.5, 40.0, 0.876, 2]])])
+    (xyxy, cls, conf), = as_tuples(dets, round_xyxy=True)
+    assert xyxy == [10, 21, 30, 40] and cls == 2 and np.isclose(conf, 0.876)
+    boxes, confs, clids = as_lists(dets, conf_decimals=2)
+    assert boxes == [[10, 20, 30, 40]] and confs == [0.88] and clids == [2]
+
+
+def test_empty_results():
+    assert len(decode_results([FakeResult(np.zeros((0, 6)))])) == 0
+    assert as_tuples(decode_results([])) == []
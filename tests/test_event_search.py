@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from ray_actors.db.db_migrations import migrate
+from ray_actors.db.event_search import (EventQuery, count_events, fts_available, last_event_id, list_cameras,
+                                        read_snapshot, rollups_available, search_events, summarize_events,
+                                        time_range)
+from tests.test_db_migrations import OLD_SCHEMA
+
+EVENTS = [  # camera, lot, expiry, all_text, created_at
+    ("cam1", "A1234", "2027-01", "PARACETAMOL 500MG LOT A1234 EXP 2027-01", "2026-10-01 08:00:00"),
+    ("cam2", "B7777", "2027-03", "Ibuprofen 200mg LOT B7777 EXP 2027-03", "2026-10-01 09:00:00"),
+    ("cam1", None, "2028-12", "IBUPROFEN TABLETS EXP 2028-12", "2026-10-02 10:00:00"),
+    ("cam1", "A1299", None, "AMOXICILLIN LOT A1299", "2026-10-03 11:00:00"),
+    ("cam2", "C5%_1", "2027-01", "SPECIAL 5%_1", "2026-10-03 11:00:00"),
+]
+
+
+@pytest.fixture(params=["fts", "like"])
+def conn(request, tmp_path):
+    path = tmp_path / "oaix.db"
+    c = sqlite3.connect(path)
+    c.executescript(OLD_SCHEMA + "DELETE FROM webhook_events;")
+    c.executemany("INSERT INTO webhook_events (camera_name, lot, expiry, all_text, created_at, mime) "
+                  "VALUES (?, ?, ?, ?, ?, 'OCR_EVENT')", EVENTS)
+    c.commit()
+    if request.param == "fts":
+        migrate(create_engine(f"sqlite:///{path}"))   # indexes the existing rows
+        assert fts_available(c)
+    yield c
+    c.close()
+
+
+def _ids(conn, **kw):
+    return [r["id"] for r in search_events(conn, EventQuery(**kw)).rows]
+
+
+def test_substring_filters_ignore_case_like_the_viewer(conn):
+    assert _ids(conn, text="ibuprofen") == [3, 2]                 # newest first
+    assert _ids(conn, lot="A12") == [4, 1]
+    assert _ids(conn, lot="12") == [4, 1]                         # 2 chars: LIKE even with FTS
+    assert _ids(conn, text="ibuprofen", expiry="2027") == [2]
+    assert _ids(conn, text="LOT", camera="cam1") == [4, 1]
+    assert _ids(conn, lot="5%_") == [5]                           # LIKE wildcards are literal
+    assert _ids(conn, text='"quoted"') == []
+    assert count_events(conn, EventQuery(text="EXP")) == 3
+
+
+def test_time_bounds_and_keyset_pages(conn):
+    query = EventQuery(start="2026-10-01 08:30:00", end="2026-10-03 11:00:00")
+    assert _ids(conn, start=query.start, end=query.end) == [3, 2]
+    # two rows share created_at: (created_at, id) keeps the order total and pages disjoint
+    seen, after = [], None
+    while True:
+        page = search_events(conn, EventQuery(limit=2), after=after)
+        seen += [r["id"] for r in page.rows]
+        if page.cursor is None:
+            break
+        after = page.cursor
+    assert seen == [5, 4, 3, 2, 1]
+    assert search_events(conn, EventQuery(text="LOT", start="2027-01-01 00:00:00")).rows == []
+
+
+def test_triggers_keep_the_index_in_sync(conn):
+    if not fts_available(conn):
+        pytest.skip("LIKE fallback has no index to keep in sync")
+    conn.execute("INSERT INTO webhook_events (camera_name, lot, all_text, created_at, mime) "
+                 "VALUES ('cam3', 'Z9999', 'NEW LOT Z9999', '2026-10-04 00:00:00', 'OCR_EVENT')")
+    conn.execute("UPDATE webhook_events SET lot = 'Q0001' WHERE id = 1")
+    conn.execute("DELETE FROM webhook_events WHERE id = 4")
+    conn.commit()
+    assert _ids(conn, lot="Z9999") == [6]
+    assert _ids(conn, lot="A12") == []
+    assert _ids(conn, lot="Q0001") == [1]
+    assert _ids(conn, text="AMOXICILLIN") == []
+
+
+def test_summary_refreshes_incrementally_from_last_seen_id(conn):
+    query = EventQuery(text="LOT", start="2026-10-01 00:00:00")
+    summary = summarize_events(conn, query)
+    assert (summary.total, summary.with_lot, summary.with_expiry) == (3, 3, 2)
+    assert summary.by_camera == {"cam1": 2, "cam2": 1}
+    assert summary.by_day == {"2026-10-01": 2, "2026-10-03": 1}
+    assert list_cameras(conn) == ["cam1", "cam2"]
+    assert time_range(conn) == ("2026-10-01 08:00:00", "2026-10-03 11:00:00")
+
+    with read_snapshot(conn):
+        seen = last_event_id(conn)
+    conn.executemany("INSERT INTO webhook_events (camera_name, lot, all_text, created_at, mime) "
+                     "VALUES (?, ?, ?, '2026-10-04 00:00:00', 'OCR_EVENT')",
+                     [("cam3", "D1", "LOT D1"), ("cam3", None, "NO MATCH HERE")])
+    conn.commit()
+    new = EventQuery(text="LOT", start="2026-10-01 00:00:00", since_id=seen)
+    assert [r["id"] for r in search_events(conn, new).rows] == [6]
+    summary.add(summarize_events(conn, new))
+    assert summary == summarize_events(conn, query)      # same as recounting everything
+    assert list_cameras(conn) == ["cam1", "cam2", "cam3"]
+
+
+def test_rollups_match_a_recount_through_inserts_updates_and_deletes(conn):
+    if not rollups_available(conn):
+        pytest.skip("rollups come with the migrated schema")
+    queries = [EventQuery(), EventQuery(camera="cam1"), EventQuery(start="2026-10-02", end="2026-10-04"),
+               EventQuery(start="2026-10-01 09:00:00", end="2026-10-03 11:00:00", camera="cam2")]
+
+    def check():
+        for q in queries:
+            assert summarize_events(conn, q) == summarize_events(conn, q, use_rollups=False), q
+
+    check()
+    conn.execute("INSERT INTO webhook_events (camera_name, lot, all_text, created_at, mime) "
+                 "VALUES ('cam3', 'Z9999', 'NEW LOT Z9999', '2026-10-02 23:59:59', 'OCR_EVENT')")
+    conn.execute("UPDATE webhook_events SET camera_name = 'cam2', lot = NULL WHERE id = 1")
+    conn.execute("UPDATE webhook_events SET created_at = '2026-10-03 12:00:00' WHERE id = 3")
+    conn.execute("DELETE FROM webhook_events WHERE id = 4")
+    conn.commit()
+    check()
+    assert summarize_events(conn, queries[2]).by_day == {"2026-10-02": 1, "2026-10-03": 2}
@@ -0,0 +1,23 @@
+import math
+
+from multi_processing.fps_budget import allocate_fps
+
+
+def test_unknown_capacity_keeps_targets():
+    assert allocate_fps(None, {"a": 10, "b": 0}) == {"a": 10, "b": math.inf}
+
+
+def test_fair_split_under_overload():
+    alloc = allocate_fps(30.0, {"a": 0, "b": 0, "c": 0})
+    assert alloc == {"a": 10.0, "b": 10.0, "c": 10.0}
+
+
+def test_low_targets_satisfied_and_leftover_shared():
+    alloc = allocate_fps(30.0, {"slow": 2, "a": 0, "b": 25})
+    assert alloc["slow"] == 2
+    assert alloc["a"] == alloc["b"] == 14.0
+    assert sum(alloc.values()) == 30.0
+
+
+def test_capacity_above_demand_gives_targets():
+    assert allocate_fps(100.0, {"a": 5, "b": 15}) == {"a": 5, "b": 15}
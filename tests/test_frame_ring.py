@@ -0,0 +1,76 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from multi_processing.frame_ring import RING_FAILED, RING_RUNNING, RING_STOPPED, FrameRing, RingReader
+
+
+@pytest.fixture
+def ring():
+    r = FrameRing.create(f"oaix_test_ring_{os.getpid()}", max_height=48, max_width=64, num_slots=3)
+    yield r
+    r.close()
+
+
+def test_write_then_latest_roundtrip(ring):
+    assert ring.latest() is None
+    frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+    seq = ring.write(frame, ts=123.0)
+    got_seq, ts, got = ring.latest()
+    assert (got_seq, ts) == (seq, 123.0)
+    assert np.array_equal(got, frame)
+    assert ring.latest(after_seq=seq) is None
+
+
+def test_smaller_frames_and_attach(ring):
+    other = FrameRing.attach(ring.name)
+    frame = np.full((10, 20, 3), 7, dtype=np.uint8)
+    ring.write(frame)
+    _, _, got = other.latest()
+    assert got.shape == (10, 20, 3)
+    assert int(got.max()) == 7
+    other.close()
+
+
+def test_zero_copy_view_invalidated_after_lap(ring):
+    ring.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    seq, _, view = ring.latest(copy=False)
+    assert ring.is_current(seq)
+    for _ in range(ring.num_slots):
+        ring.write(np.ones((48, 64, 3), dtype=np.uint8))
+    assert not ring.is_current(seq)
+    del view
+
+
+def test_oversized_frame_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((100, 100, 3), dtype=np.uint8))
+
+
+def test_reader_reports_stopped_failed_and_dead_producers(ring):
+    reader = RingReader("cam1", ring.name, stale_after_s=5.0)
+    ring.set_state(RING_RUNNING)
+    ring.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    assert not reader.failed
+
+    ring.set_state(RING_STOPPED)
+    assert reader.failed and reader.error == "stopped"
+    ring.set_state(RING_FAILED)
+    assert reader.failed and reader.error == "read_failed"
+
+    # a producer killed mid-stream never updates the state: its heartbeat goes stale
+    ring.set_state(RING_RUNNING)
+    assert not reader.failed
+    ring._header['heartbeat'][0] = time.time() - 10
+    assert reader.failed and reader.error == "producer_dead"
+    reader.stop()
+
+
+def test_reader_gives_a_producer_that_never_started_until_stale_after_s(ring):
+    reader = RingReader("cam1", ring.name, stale_after_s=5.0)
+    assert ring.heartbeat == 0.0 and not reader.failed
+    reader._attached_at -= 10
+    assert reader.failed and reader.error == "producer_dead"
+    reader.stop()
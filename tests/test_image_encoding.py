@@ -0,0 +1,54 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from multi_processing import image_encoding
+from multi_processing.image_encoding import JpegSettings, encode_jpeg, fit, webhook_image
+
+
+def _image(w=640, h=480):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+def _decode(data_url):
+    assert data_url.startswith("data:image/jpeg;base64,")
+    raw = base64.b64decode(data_url.split(",", 1)[1])
+    return cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    real = cv2.imencode
+    monkeypatch.setattr(image_encoding.cv2, "imencode", lambda *a: calls.append(a[2]) or real(*a))
+    return calls
+
+
+def test_fit_scales_then_caps_the_longer_side():
+    img = _image(640, 480)
+    assert fit(img, JpegSettings(scale=0.5)).shape[:2] == (240, 320)
+    assert fit(img, JpegSettings(scale=1.0, max_side=200)).shape[:2] == (150, 200)
+    assert fit(img, JpegSettings(scale=1.0)) is img
+
+
+def test_saved_bytes_are_reused_when_settings_match(encodes):
+    img = _image()
+    jpeg = encode_jpeg(img, 90)
+    assert len(encodes) == 1
+    out = webhook_image(img, JpegSettings(scale=1.0, quality=90), jpeg=jpeg, jpeg_quality=90)
+    assert len(encodes) == 1   # no second encode
+    assert base64.b64decode(out.split(",", 1)[1]) == jpeg
+
+
+def test_one_encode_at_the_configured_size_and_quality(encodes):
+    img = _image()
+    jpeg = encode_jpeg(img, 95)
+    settings = JpegSettings(scale=0.5, quality=70)
+    out = webhook_image(img, settings, jpeg=jpeg, jpeg_quality=95)
+    assert len(encodes) == 2 and encodes[1] == [cv2.IMWRITE_JPEG_QUALITY, 70]
+    assert _decode(out).shape[:2] == (240, 320)
+    with pytest.raises(ValueError):
+        webhook_image(None, settings)
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from multi_processing import inference_service, model_registry
+from multi_processing.inference_service import InferenceService, get_service, release_service
+from multi_processing.model_registry import LoadedModel
+
+
+class FakeModel:
+    """Returns one marker per input frame and records every forward pass."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, frames, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        self.active -= 1
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        self.calls.append((len(frames), kwargs))
+        if kwargs.get("conf") == -1:
+            raise RuntimeError("bad conf")
+        return [int(f[0, 0, 0]) for f in frames]
+
+
+def _service(model, **kw):
+    return InferenceService(LoadedModel(model, "fake.pt", None, 0.0, 0.0), **kw)
+
+
+def _frame(i):
+    return np.full((4, 4, 3), i, dtype=np.uint8)
+
+
+def test_concurrent_callers_are_batched_and_routed():
+    model = FakeModel(delay=0.02)
+    svc = _service(model, max_batch=8, max_wait_ms=5.0)
+    svc.clients = 6
+    results = {}
+
+    def channel(i):
+        results[i] = [svc.predict(_frame(i), timeout=5, imgsz=640) for _ in range(5)]
+
+    threads = [threading.Thread(target=channel, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    svc.close()
+    assert results == {i: [i] * 5 for i in range(6)}
+    assert model.max_active == 1              # never called concurrently
+    assert svc.frames == 30 and svc.avg_batch > 1.5
+    assert all(n <= 8 for n, _ in model.calls)
+
+
+def test_different_kwargs_never_share_a_pass_and_errors_reach_callers():
+    model = FakeModel()
+    svc = _service(model)
+    a = svc.submit(_frame(1), conf=0.25)
+    b = svc.submit(_frame(2), conf=-1)
+    assert a.result(timeout=5) == 1
+    with pytest.raises(RuntimeError, match="bad conf"):
+        b.result(timeout=5)
+    assert sorted((n, kw["conf"]) for n, kw in model.calls) == [(1, -1), (1, 0.25)]
+    svc.close()
+    with pytest.raises(RuntimeError):
+        svc.predict(_frame(3), timeout=1)
+
+
+def test_get_service_shares_one_model_per_weights(monkeypatch):
+    loads = []
+    registry = model_registry.ModelRegistry(loader=lambda path, device: loads.append(path) or FakeModel())
+    monkeypatch.setattr(model_registry, "registry", registry)
+    monkeypatch.setattr(inference_service, "_services", {})
+    a = get_service("a.pt", imgsz=32)
+    b = get_service("a.pt", imgsz=32)
+    c = get_service("b.pt", imgsz=32)
+    assert a is b and a is not c
+    assert a.clients == 2 and loads == ["a.pt", "b.pt"]
+    for svc in (a, c):
+        svc.close()
+
+
+def test_last_release_closes_the_service_and_frees_the_model(monkeypatch):
+    loads = []
+    registry = model_registry.ModelRegistry(loader=lambda path, device: loads.append(path) or FakeModel())
+    monkeypatch.setattr(model_registry, "registry", registry)
+    monkeypatch.setattr(inference_service, "_services", {})
+    a = get_service("a.pt", imgsz=32)
+    b = get_service("a.pt", imgsz=32)
+    release_service(b)
+    assert a.clients == 1 and a.predict(_frame(1), timeout=5) == 1
+    release_service(a)
+    assert inference_service._services == {} and registry.loaded() == {}
+    with pytest.raises(RuntimeError):
+        a.predict(_frame(1), timeout=1)
+    # the next channel gets a fresh service and loads the weights again
+    c = get_service("a.pt", imgsz=32)
+    assert c is not a and loads == ["a.pt", "a.pt"]
+    release_service(c)
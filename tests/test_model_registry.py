@@ -0,0 +1,59 @@
+import threading
+import time
+
+from multi_processing.model_registry import ModelRegistry
+
+
+class FakeModel:
+    def __init__(self, path):
+        self.path = path
+        self.calls = []
+
+    def __call__(self, frame, imgsz=640, verbose=False, **kwargs):
+        self.calls.append((frame.shape, imgsz, kwargs.get("device")))
+        return []
+
+
+def _registry(delay=0.0):
+    loads = []
+
+    def loader(path, device):
+        loads.append((path, device))
+        time.sleep(delay)
+        return FakeModel(path)
+
+    return ModelRegistry(loader=loader), loads
+
+
+def test_loaded_once_and_warmed_up_at_imgsz():
+    reg, loads = _registry()
+    a = reg.get("yolo11m.pt", imgsz=320, warmup_frames=2)
+    b = reg.get("yolo11m.pt", imgsz=320, warmup_frames=2)
+    assert a is b and a.users == 2
+    assert loads == [("yolo11m.pt", None)]
+    assert a.model.calls == [((320, 320, 3), 320, None)] * 2
+    assert a.load_ms >= 0 and a.warmup_ms >= 0
+
+
+def test_separate_entries_per_weights_and_device():
+    reg, loads = _registry()
+    reg.get("a.pt")
+    reg.get("b.pt")
+    reg.get("a.pt", device="cpu")
+    assert sorted(loads, key=str) == sorted([("a.pt", None), ("b.pt", None), ("a.pt", "cpu")], key=str)
+    assert reg.get("a.pt", device="cpu").model.calls[0][2] == "cpu"
+
+
+def test_concurrent_starts_share_one_load():
+    reg, loads = _registry(delay=0.2)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(reg.get("yolo11m.pt"))) for _ in range(8)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+    assert all(g is got[0] for g in got) and got[0].users == 8
+    # everyone waited for the single load instead of loading serially
+    assert time.perf_counter() - t0 < 1.0
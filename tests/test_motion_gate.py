@@ -0,0 +1,64 @@
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from multi_processing.motion import MotionGate
+
+VIDEOS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'rtsp_streamer', 'videos'))
+# conservative CPU cost of one yolo11m forward pass at imgsz=640
+YOLO_CPU_MS = 150.0
+
+
+def test_static_scene_skipped_until_change():
+    gate = MotionGate(max_skip_frames=1000)
+    still = np.full((360, 640, 3), 80, dtype=np.uint8)
+    assert gate.should_infer(still)  # first frame always runs
+    assert not any(gate.should_infer(still.copy()) for _ in range(10))
+    moved = still.copy()
+    moved[100:250, 200:400] = 220
+    assert gate.should_infer(moved)
+    assert gate.frames_seen == 12 and gate.frames_skipped == 10
+
+
+def test_forced_refresh_after_max_skip_frames():
+    gate = MotionGate(max_skip_frames=3)
+    still = np.zeros((120, 160, 3), dtype=np.uint8)
+    decisions = [gate.should_infer(still) for _ in range(6)]
+    assert decisions == [True, False, False, False, True, False]
+
+
+def _run_clip(name):
+    cap = cv2.VideoCapture(os.path.join(VIDEOS, name))
+    if not cap.isOpened():
+        pytest.skip(f"cannot decode {name}")
+    gate = MotionGate()
+    gate_s = 0.0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        t0 = time.perf_counter()
+        gate.should_infer(frame)
+        gate_s += time.perf_counter() - t0
+    cap.release()
+    return gate, gate_s * 1000.0 / max(gate.frames_seen, 1)
+
+
+@pytest.mark.parametrize("clip", ["park.mp4", "crowd.mp4"])
+def test_bundled_clip_cpu_savings(clip):
+    gate, gate_ms = _run_clip(clip)
+    baseline_ms = gate.frames_seen * YOLO_CPU_MS
+    gated_ms = (gate.frames_seen - gate.frames_skipped) * YOLO_CPU_MS + gate.frames_seen * gate_ms
+    savings = 1.0 - gated_ms / baseline_ms
+    print(f"{clip}: skipped {gate.frames_skipped}/{gate.frames_seen} frames, "
+          f"gate {gate_ms:.2f} ms/frame, estimated CPU savings {savings:.0%}")
+    assert gate.frames_seen > 100
+    # the pre-filter must stay negligible next to a forward pass
+    assert gate_ms < YOLO_CPU_MS / 10
+    if clip == "park.mp4":
+        # mostly static scene: a large share of YOLO calls disappear
+        assert gate.skip_ratio > 0.25
+        assert savings > 0.2
@@ -0,0 +1,141 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from multi_processing.ocr_pool import OCRPool
+
+
+class FakeProcessor:
+    """Records (channel, image) per call; blocks on `gate` so tests control when jobs finish."""
+    def __init__(self, log, gate=None):
+        self.log = log
+        self.gate = gate
+        self.channel_name = None
+
+    def process_frame(self, image, rotate_90_clock=True, save_frame=True):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if image == "boom":
+            raise ValueError("unreadable ROI")
+        self.log.append((self.channel_name, image))
+        return {"text": f"{self.channel_name}:{image}", "rotated": rotate_90_clock}
+
+
+def test_futures_resolve_per_channel_and_errors_propagate():
+    log = []
+    built = []
+    pool = OCRPool(lambda i: built.append(i) or FakeProcessor(log), size=2)
+    a = pool.submit("cam1", "roi-a", rotate_90_clock=False)
+    b = pool.submit("cam2", "boom")
+    assert a.result(timeout=5) == {"text": "cam1:roi-a", "rotated": False}
+    with pytest.raises(ValueError, match="unreadable"):
+        b.result(timeout=5)
+    pool.close()
+    assert sorted(built) == [0, 1]  # one processor (reader) per pool worker
+    assert pool.submitted == 2 and pool.completed == 2
+
+
+def test_channels_are_served_round_robin():
+    log = []
+    gate = threading.Event()
+    pool = OCRPool(lambda i: FakeProcessor(log, gate), size=1, max_pending_per_channel=8)
+    first = pool.submit("busy", "b0")   # taken by the worker, which then waits on the gate
+    while pool.pending():
+        time.sleep(0.001)
+    futs = [pool.submit("busy", f"b{i}") for i in range(1, 5)]
+    futs += [pool.submit("quiet", "q1"), pool.submit("other", "o1")]
+    gate.set()
+    for f in [first] + futs:
+        f.result(timeout=5)
+    pool.close()
+    # the quiet channels don't wait behind busy's whole backlog
+    assert [img for _, img in log][:4] == ["b0", "b1", "q1", "o1"]
+
+
+def test_per_channel_bound_cancels_oldest_and_global_bound_raises():
+    log = []
+    gate = threading.Event()
+    pool = OCRPool(lambda i: FakeProcessor(log, gate), size=1, max_queue=3, max_pending_per_channel=2)
+    running = pool.submit("cam1", "r0")
+    while pool.pending():
+        time.sleep(0.001)
+    old = pool.submit("cam1", "r1")
+    mid = pool.submit("cam1", "r2")
+    new = pool.submit("cam1", "r3")     # cam1 already has 2 waiting: r1 is superseded
+    assert old.cancelled() and pool.cancelled == 1
+    assert pool.pending("cam1") == 2
+    pool.submit("cam2", "s1")
+    with pytest.raises(queue.Full):
+        pool.submit("cam3", "t1")
+    assert pool.rejected == 1
+    gate.set()
+    assert [f.result(timeout=5)["text"] for f in (running, mid, new)] == ["cam1:r0", "cam1:r2", "cam1:r3"]
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.submit("cam1", "late")
+
+
+class BatchProcessor(FakeProcessor):
+    def __init__(self, log, gate=None):
+        super().__init__(log, gate)
+        self.batches = []
+
+    def process_batch(self, images, rotate_90_clock=True, save_frame=True, channel_names=None):
+        self.batches.append(list(zip(channel_names, images)))
+        return [{"text": f"{c}:{img}", "rotated": rotate_90_clock} for c, img in zip(channel_names, images)]
+
+
+def test_queued_jobs_from_several_channels_share_one_batched_call():
+    log = []
+    gate = threading.Event()
+    procs = []
+    pool = OCRPool(lambda i: procs.append(BatchProcessor(log, gate)) or procs[-1], size=1, max_batch=3)
+    first = pool.submit("cam0", "x")    # processed alone while the others queue up
+    while pool.pending():
+        time.sleep(0.001)
+    futs = [pool.submit(f"cam{i}", f"r{i}") for i in range(1, 5)]
+    odd = pool.submit("cam5", "r5", rotate_90_clock=False)
+    gate.set()
+    assert first.result(timeout=5)["text"] == "cam0:x"
+    assert [f.result(timeout=5)["text"] for f in futs] == [f"cam{i}:r{i}" for i in range(1, 5)]
+    assert odd.result(timeout=5) == {"text": "cam5:r5", "rotated": False}
+    pool.close()
+    # batches of up to 3, and the job with other kwargs never joins a batch
+    assert procs[0].batches == [[("cam1", "r1"), ("cam2", "r2"), ("cam3", "r3")]]
+    assert [img for _, img in log] == ["x", "r4", "r5"]
+    assert pool.calls == 4 and pool.completed == 6
+
+
+def test_factory_failure_fails_queued_and_later_jobs():
+    gate = threading.Event()
+
+    def factory(i):
+        gate.wait(5)   # jobs queue up while the processor is "loading"
+        raise RuntimeError("CUDA out of memory")
+
+    pool = OCRPool(factory, size=2)
+    queued = [pool.submit("cam1", "r1"), pool.submit("cam2", "r2")]
+    gate.set()
+    for fut in queued:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            fut.result(timeout=5)
+    assert isinstance(pool.error, RuntimeError)
+    with pytest.raises(RuntimeError, match="OCR pool failed"):
+        pool.submit("cam1", "late")
+    pool.close()
+
+
+def test_one_failed_worker_leaves_the_pool_running():
+    log = []
+
+    def factory(i):
+        if i == 0:
+            raise RuntimeError("CUDA out of memory")
+        return FakeProcessor(log)
+
+    pool = OCRPool(factory, size=2)
+    assert pool.submit("cam1", "r1").result(timeout=5)["text"] == "cam1:r1"
+    assert pool.error is None
+    pool.close()
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from multi_processing.placement import WORKER_DRAINING, WORKER_RETIRED, PlacementScheduler
+
+
+def _scheduler(gpus=(0, 0), **kwargs):
+    sent = []
+    s = PlacementScheduler(gpus, send=lambda idx, cmd: sent.append((idx, cmd)), **kwargs)
+    return s, sent
+
+
+def test_heavy_streams_spread_and_stop_follows_owner():
+    s, sent = _scheduler()
+    a = s.dispatch({"type": "START", "stream_id": "4k-a", "rtsp": "rtsp://a", "weight": 4})
+    b = s.dispatch({"type": "START", "stream_id": "4k-b", "rtsp": "rtsp://b", "weight": 4})
+    assert a != b
+    c = s.dispatch({"type": "START", "stream_id": "cam-c", "rtsp": "rtsp://c"})
+    stop = s.dispatch({"type": "STOP", "stream_id": "cam-c"})
+    assert stop == c
+    assert "cam-c" not in s.owner
+    assert [idx for idx, _ in sent] == [a, b, c, c]
+
+
+def test_commands_for_unknown_streams_are_dropped_and_reported():
+    reported = []
+    s, sent = _scheduler(report=reported.append)
+    for w in s.workers:
+        w.state = WORKER_DRAINING   # no ACTIVE worker either
+    assert s.dispatch({"type": "STOP", "stream_id": "never-started"}) is None
+    assert sent == []
+    assert reported == [{"stream_id": "never-started", "event": "error", "msg": "unknown_stream: STOP"}]
+
+
+def test_shutdown_retires_every_worker_before_sending():
+    s, sent = _scheduler(gpus=(0, 0, 1))
+    s.dispatch({"type": "START", "stream_id": "cam1", "rtsp": "rtsp://a"})
+    s.workers[2].state = WORKER_RETIRED
+    states = []
+    s.send = lambda idx, cmd: states.append((idx, cmd["type"], s.workers[idx].state))
+    assert s.dispatch({"type": "SHUTDOWN"}) is None
+    assert states == [(0, "SHUTDOWN", WORKER_RETIRED), (1, "SHUTDOWN", WORKER_RETIRED)]
+    assert s.owner == {} and s.live() == []
+
+
+def test_commands_without_a_stream_go_to_every_live_worker():
+    s, sent = _scheduler(gpus=(0, 0, 1))
+    s.workers[1].state = WORKER_RETIRED
+    s.dispatch({"type": "RELOAD"})
+    assert sent == [(0, {"type": "RELOAD"}), (2, {"type": "RELOAD"})]
+
+
+def test_stop_during_a_move_is_not_overtaken_by_the_moves_start():
+    s, sent = _scheduler()
+    for i in range(2):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": "rtsp://x"})
+    sent.clear()
+    stopper = []
+
+    def send(idx, cmd):
+        # a user STOP for the moving stream arrives between the move's STOP and START
+        if not stopper and cmd["type"] == "STOP":
+            stopper.append(threading.Thread(target=s.dispatch, args=({"type": "STOP", "stream_id": cmd["stream_id"]},)))
+            stopper[0].start()
+            time.sleep(0.05)
+        sent.append((idx, cmd["type"], cmd["stream_id"]))
+
+    s.send = send
+    (sid, src, dst), = s.drain(0)
+    stopper[0].join(timeout=5)
+    assert sent == [(src, "STOP", sid), (dst, "START", sid), (dst, "STOP", sid)]
+    assert sid not in s.owner
+
+
+def test_placement_uses_measured_inference_time():
+    s, _ = _scheduler()
+    s.update_infer_ms(0, 80.0)
+    s.update_infer_ms(1, 20.0)
+    for i in range(4):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": "rtsp://x"})
+    assert len(s.workers[1].streams) > len(s.workers[0].streams)
+
+
+def test_rebalance_moves_one_stream_when_skewed():
+    s, sent = _scheduler(rebalance_ratio=1.5)
+    for i in range(4):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": f"rtsp://{i}"})
+    # worker 0 suddenly gets much slower per frame
+    s.update_infer_ms(0, 100.0)
+    s.update_infer_ms(1, 10.0)
+    sent.clear()
+    moves = s.rebalance()
+    assert len(moves) == 1
+    sid, src, dst = moves[0]
+    assert (src, dst) == (0, 1)
+    assert sent[0] == (0, {"type": "STOP", "stream_id": sid})
+    assert sent[1][0] == 1 and sent[1][1]["stream_id"] == sid and sent[1][1]["type"] == "START"
+    assert s.owner[sid] == 1
+
+
+def test_no_rebalance_when_balanced():
+    s, sent = _scheduler()
+    for i in range(4):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": "rtsp://x"})
+    assert s.rebalance() == []
+
+
+def test_warming_worker_gets_no_streams_until_activated():
+    s, sent = _scheduler(gpus=(0,))
+    new = s.add_worker(gpu_id=1)
+    for i in range(4):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": "rtsp://x"})
+    assert not s.workers[new].streams
+    s.activate(new)
+    sent.clear()
+    while s.rebalance():
+        pass
+    assert len(s.workers[0].streams) == len(s.workers[new].streams) == 2
+
+
+def test_drain_moves_every_stream_and_retired_slot_is_reused():
+    s, sent = _scheduler(gpus=(0, 0, 0))
+    for i in range(6):
+        s.dispatch({"type": "START", "stream_id": f"cam{i}", "rtsp": f"rtsp://{i}"})
+    owned = set(s.workers[2].streams)
+    sent.clear()
+    moves = s.drain(2)
+    assert {sid for sid, _, _ in moves} == owned
+    assert all(s.owner[sid] in (0, 1) for sid in owned)
+    assert sent[0][0] == 2 and sent[0][1]["type"] == "STOP"
+    # new streams avoid the draining worker
+    assert s.dispatch({"type": "START", "stream_id": "cam9", "rtsp": "rtsp://9"}) != 2
+    s.retire(2)
+    assert s.add_worker(gpu_id=0) == 2 and s.workers[2].state == "warming"
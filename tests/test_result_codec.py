@@ -0,0 +1,40 @@
+import pickle
+
+import numpy as np
+
+from multi_processing.detections import DETECTION_DTYPE, as_tuples
+from multi_processing.result_codec import DetectionsView, pack_detections, unpack_message
+
+
+def _dets(n):
+    dets = np.empty(n, dtype=DETECTION_DTYPE)
+    dets['xyxy'] = np.random.rand(n, 4) * 1900
+    dets['cls'] = np.random.randint(0, 80, n)
+    dets['conf'] = np.random.rand(n)
+    return dets
+
+
+def test_pack_roundtrip_with_frame_metadata():
+    dets = _dets(5)
+    view = DetectionsView(pack_detections(dets, frame_idx=42, ts=1700000000.25))
+    assert (view.frame_idx, view.ts, len(view)) == (42, 1700000000.25, 5)
+    assert np.array_equal(view.xyxy, np.rint(dets['xyxy']).astype(np.int16))
+    assert view.cls.tolist() == dets['cls'].tolist()
+    assert np.allclose(view.conf, dets['conf'], atol=1e-3)
+
+
+def test_unpack_message_gives_legacy_dict():
+    dets = _dets(3)
+    msg = {"stream_id": "cam1", "event": "detections", "packed": pack_detections(dets, 7, 1.5)}
+    legacy = unpack_message(msg)
+    assert legacy["stream_id"] == "cam1" and legacy["frame_idx"] == 7
+    assert [cls for _, cls, _ in legacy["data"]] == dets['cls'].tolist()
+    other = {"stream_id": "cam1", "event": "error", "msg": "read_failed"}
+    assert unpack_message(other) is other
+
+
+def test_packed_is_smaller_than_dict_form():
+    dets = _dets(150)
+    as_dict = pickle.dumps({"stream_id": "cam1", "event": "detections", "data": as_tuples(dets)})
+    packed = pickle.dumps({"stream_id": "cam1", "event": "detections", "packed": pack_detections(dets)})
+    assert len(packed) * 4 < len(as_dict)
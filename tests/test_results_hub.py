@@ -0,0 +1,103 @@
+import queue
+import time
+
+import numpy as np
+import pytest
+
+from multi_processing.detections import DETECTION_DTYPE
+from multi_processing.result_codec import pack_detections, unpack_message
+from multi_processing.results_hub import ResultsHub
+
+
+def _det(sid, n=0):
+    return {"stream_id": sid, "event": "detections", "data": [([0.0, 0.0, 1.0, 1.0], n, 0.5)]}
+
+
+def test_filters_by_stream_and_event():
+    hub = ResultsHub()
+    cam1 = hub.subscribe(stream_ids=["cam1"])
+    stats = hub.subscribe(events=["stats"])
+    everything = hub.subscribe()
+    hub.publish(_det("cam1"))
+    hub.publish(_det("cam2"))
+    hub.publish({"stream_id": "cam2", "event": "stats", "fps": 10.0})
+    # worker_restart events are matched through their "streams" list
+    hub.publish({"event": "worker_restart", "worker": 0, "streams": ["cam1", "cam3"]})
+    assert len(cam1) == 2 and len(stats) == 1 and len(everything) == 4
+
+
+def test_slow_subscriber_drops_oldest_without_blocking():
+    hub = ResultsHub(buffer_size=4)
+    slow = hub.subscribe()
+    fast = hub.subscribe(buffer_size=100)
+    t0 = time.perf_counter()
+    for i in range(50):
+        hub.publish(_det("cam1", i))
+    assert time.perf_counter() - t0 < 0.5
+    assert slow.dropped == 46 and fast.dropped == 0
+    # the newest events survive
+    assert [slow.get(0)["data"][0][1] for _ in range(4)] == [46, 47, 48, 49]
+    assert slow.get(0) is None
+
+
+def test_encode_runs_once_per_event():
+    calls = []
+    hub = ResultsHub(encode=lambda m: calls.append(m) or ("enc", m["stream_id"]))
+    subs = [hub.subscribe() for _ in range(5)]
+    other = hub.subscribe(stream_ids=["nobody"])
+    hub.publish(_det("cam1"))
+    assert len(calls) == 1
+    assert all(s.get(0) == ("enc", "cam1") for s in subs)
+    assert other.get(0) is None
+    for s in subs + [other]:
+        hub.unsubscribe(s)
+    hub.publish(_det("cam1"))  # no subscriber left that wants it: nothing is encoded
+    assert len(calls) == 1
+
+
+def test_drain_thread_and_unsubscribe():
+    q = queue.Queue()
+    hub = ResultsHub(q, poll_s=0.05).start()
+    sub = hub.subscribe()
+    q.put(_det("cam1"))
+    assert sub.get(timeout=2.0)["stream_id"] == "cam1"
+    hub.unsubscribe(sub)
+    assert sub.closed and not hub.subscribers
+    q.put(_det("cam1"))
+    hub.stop()
+    assert hub.published >= 1
+
+
+def test_grpc_subscribe_roundtrip():
+    grpc = pytest.importorskip("grpc")
+    from multi_processing.generated import server_commands_pb2 as pb2
+    from multi_processing.generated import server_commands_pb2_grpc as pb2_grpc
+    from multi_processing.grpc_results_serv import SUBSCRIBER_CHANNEL_OPTIONS, from_proto, serve_results, to_proto
+
+    q = queue.Queue()
+    hub = ResultsHub(q, encode=to_proto, poll_s=0.05).start()
+    server, port = serve_results(hub, port=0)
+    dets = np.zeros(2, dtype=DETECTION_DTYPE)
+    dets['xyxy'] = [[10, 20, 30, 40], [1, 2, 3, 4]]
+    dets['cls'] = [0, 5]
+    dets['conf'] = [0.5, 0.75]
+    try:
+        with grpc.insecure_channel(f"localhost:{port}", options=SUBSCRIBER_CHANNEL_OPTIONS) as channel:
+            stub = pb2_grpc.ServerCommandsStub(channel)
+            stream = stub.SubscribeDetections(pb2.SubscribeDetectionsRequest(stream_ids=["cam1"]))
+            deadline = time.time() + 5
+            while not hub.subscribers and time.time() < deadline:
+                time.sleep(0.01)
+            q.put({"stream_id": "cam2", "event": "detections", "data": []})
+            q.put(_det("cam1", 7))
+            q.put({"stream_id": "cam1", "event": "detections", "packed": pack_detections(dets, 42, 1.5)})
+            q.put({"stream_id": "cam1", "event": "stats", "fps": 12.5})
+            got = [from_proto(next(stream)) for _ in range(3)]
+            stream.cancel()
+    finally:
+        server.stop(grace=None)
+        hub.stop()
+    assert got[0] == _det("cam1", 7)
+    packed = unpack_message(got[1])
+    assert packed["frame_idx"] == 42 and packed["data"][0] == ([10.0, 20.0, 30.0, 40.0], 0, 0.5)
+    assert got[2] == {"stream_id": "cam1", "event": "stats", "fps": 12.5}
@@ -0,0 +1,94 @@
+import queue
+import time
+
+from multi_processing.config import WorkerConfig
+from multi_processing.placement import PlacementScheduler
+from multi_processing.supervision import WorkerStats, WorkerSupervisor
+
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def _supervisor(**cfg):
+    config = WorkerConfig(startup_grace_s=0, heartbeat_timeout_s=5, stall_timeout_s=10, **cfg)
+    cmd_qs = [queue.Queue(), queue.Queue()]
+    workers = [FakeProcess(), FakeProcess()]
+    result_q = queue.Queue()
+    stats = WorkerStats(2)
+    scheduler = PlacementScheduler([0, 1], send=lambda idx, cmd: cmd_qs[idx].put(cmd))
+    sup = WorkerSupervisor(workers, cmd_qs, result_q, stats, scheduler,
+                           spawn=lambda idx: FakeProcess(), make_cmd_q=queue.Queue, config=config)
+    return sup, scheduler, cmd_qs, result_q
+
+
+def test_dead_worker_is_respawned_and_streams_replayed():
+    sup, scheduler, cmd_qs, result_q = _supervisor()
+    start = {"type": "START", "stream_id": "cam1", "rtsp": "rtsp://x"}
+    idx = scheduler.dispatch(start)
+    old_q = cmd_qs[idx]
+    sup.workers[idx].alive = False
+
+    assert sup.check(idx) == "dead"
+    sup.restart(idx, "dead")
+
+    assert sup.workers[idx].is_alive()
+    assert cmd_qs[idx] is not old_q
+    assert cmd_qs[idx].get_nowait() == start
+    event = result_q.get_nowait()
+    assert event["event"] == "worker_restart"
+    assert event["worker"] == idx and event["gpu_id"] == idx
+    assert event["streams"] == ["cam1"] and event["reason"] == "dead"
+
+
+def test_heartbeat_and_frame_stalls_detected():
+    sup, _, _, _ = _supervisor()
+    now = time.time()
+    sup.stats.heartbeat[0] = now - 20
+    assert sup.check(0, now=now) == "heartbeat_timeout"
+
+    sup.stats.heartbeat[1] = now
+    sup.stats.streams[1] = 2
+    sup.stats.last_frame[1] = now - 30
+    assert sup.check(1, now=now) == "stalled"
+
+    # no active streams -> idle, not stalled
+    sup.stats.streams[1] = 0
+    assert sup.check(1, now=now) is None
+
+
+def test_full_result_channel_drops_the_event_not_the_restart():
+    sup, scheduler, cmd_qs, _ = _supervisor(result_put_timeout_s=0.01)
+    sup.result_q = queue.Queue(maxsize=1)
+    sup.result_q.put("consumer stalled")
+    idx = scheduler.dispatch({"type": "START", "stream_id": "cam1", "rtsp": "rtsp://x"})
+    sup.workers[idx].alive = False
+    t0 = time.time()
+    sup.restart(idx, "dead")
+    assert time.time() - t0 < 1.0
+    assert sup.workers[idx].is_alive() and cmd_qs[idx].get_nowait()["stream_id"] == "cam1"
+    assert sup.events_dropped == 1
+
+
+def test_workers_shut_down_on_request_are_not_respawned():
+    sup, scheduler, cmd_qs, result_q = _supervisor(health_interval_s=0.01, rebalance_interval_s=0)
+    scheduler.dispatch({"type": "START", "stream_id": "cam1", "rtsp": "rtsp://x"})
+    sup.start()
+    scheduler.dispatch({"type": "SHUTDOWN"})
+    for idx, proc in enumerate(sup.workers):
+        assert cmd_qs[idx].queue[-1] == {"type": "SHUTDOWN"}
+        proc.alive = False   # the worker exits on SHUTDOWN
+    time.sleep(0.1)
+    sup.stop()
+    assert sup.restarts == [0, 0] and result_q.empty()
+    assert not sup._thread.is_alive()
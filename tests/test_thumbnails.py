@@ -0,0 +1,113 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from multi_processing import thumbnails
+from multi_processing.thumbnails import ThumbnailCache, ThumbnailSettings, decode_for_thumbnail, jpeg_size
+
+
+def _jpeg(tmp_path, name, w=1280, h=720, seed=0):
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), dtype=np.uint8), (0, 0), 2)
+    data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path), data, image
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ThumbnailCache(str(tmp_path / "thumbs"), settings=ThumbnailSettings(max_side=160))
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def source_reads(monkeypatch):
+    """Paths the cache opened outside its own directory (i.e. full images read from the source)."""
+    reads = []
+    real = open
+
+    def tracking_open(path, *args, **kwargs):
+        if "thumbs" not in str(path):
+            reads.append(str(path))
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(thumbnails, "open", tracking_open, raising=False)
+    return reads
+
+
+def test_decode_skips_as_much_of_the_jpeg_as_the_size_allows(tmp_path):
+    _, data, _ = _jpeg(tmp_path, "a.jpg", 1280, 720)
+    assert jpeg_size(data) == (1280, 720)
+    assert decode_for_thumbnail(data, 160).shape[:2] == (90, 160)      # 1/8
+    assert decode_for_thumbnail(data, 320).shape[:2] == (180, 320)     # 1/4
+    assert decode_for_thumbnail(data, 1000).shape[:2] == (720, 1280)   # full size
+    assert decode_for_thumbnail(b"not an image", 160) is None
+    png = cv2.imencode(".png", np.zeros((40, 60, 3), np.uint8))[1].tobytes()
+    assert jpeg_size(png) is None and decode_for_thumbnail(png, 160).shape[:2] == (40, 60)
+
+
+def test_thumbnail_is_made_once_then_served_without_reading_the_source(cache, tmp_path, source_reads):
+    path, _, _ = _jpeg(tmp_path, "a.jpg")
+    first = cache.get(path)
+    thumb = cv2.imdecode(np.frombuffer(first, np.uint8), cv2.IMREAD_COLOR)
+    assert thumb.shape[:2] == (90, 160) and first[:2] == b"\xff\xd8"
+    assert cache.get(path) == first
+    assert source_reads == [path]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cache.get(str(tmp_path / "missing.jpg")) is None
+    (tmp_path / "bad.jpg").write_bytes(b"not an image")
+    with pytest.raises(ValueError):
+        cache.get(str(tmp_path / "bad.jpg"))
+
+
+def test_content_addressed_and_refreshed_when_the_source_changes(cache, tmp_path):
+    path, data, _ = _jpeg(tmp_path, "a.jpg")
+    (tmp_path / "copy.jpg").write_bytes(data)
+    first = cache.get(path)
+    assert cache.get(str(tmp_path / "copy.jpg")) == first
+    assert cache.stats()["entries"] == 1                   # one file for identical content
+    _, other, _ = _jpeg(tmp_path, "b.jpg", seed=1)
+    with open(path, "wb") as f:
+        f.write(other)
+    os.utime(path, ns=(1, 1))                              # size and mtime no longer match the index
+    assert cache.get(path) != first
+    assert cache.stats()["entries"] == 2
+
+
+def test_webp_thumbnails_are_cached_separately(cache, tmp_path):
+    path, _, _ = _jpeg(tmp_path, "a.jpg")
+    jpeg = cache.get(path)
+    webp = ThumbnailCache(cache.directory, settings=ThumbnailSettings(max_side=160, format="webp"))
+    thumb = webp.get(path)
+    assert thumb[8:12] == b"WEBP" and webp.stats()["entries"] == 2
+    assert cache.get(path) == jpeg
+    webp.close()
+
+
+def test_put_at_save_time_uses_the_writers_image(cache, tmp_path, source_reads):
+    path, data, image = _jpeg(tmp_path, "a.jpg")
+    cache.put(path, data, image)
+    assert cache.get(path) is not None
+    assert source_reads == []
+    assert cache.stats()["misses"] == 0
+
+
+def test_least_recently_used_thumbnails_are_evicted_over_budget(tmp_path, monkeypatch):
+    c = ThumbnailCache(str(tmp_path / "thumbs"), settings=ThumbnailSettings(max_side=160))
+    paths = [_jpeg(tmp_path, f"{i}.jpg", seed=i)[0] for i in range(4)]
+    clock = iter(range(1000, 2000, 100))
+    monkeypatch.setattr(thumbnails.time, "time", lambda: next(clock))
+    sizes = [len(c.get(p)) for p in paths[:3]]
+    c.get(paths[0])                                       # touched: paths[1] is now the oldest
+    c.max_bytes = sum(sizes) + 10
+    c.get(paths[3])
+    assert c.stats()["evicted"] >= 1
+    assert c.stats()["bytes"] <= c.max_bytes
+    assert c.get(paths[0]) is not None and c.stats()["misses"] == 4   # still cached
+    c.get(paths[1])
+    assert c.stats()["misses"] == 5                       # evicted, made again
+    c.close()
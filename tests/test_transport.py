@@ -0,0 +1,94 @@
+from multiprocessing import Process
+from queue import Empty, Full
+
+import pytest
+
+from multi_processing.transport import ShmResultRing, make_queue
+
+
+def _produce(q, n):
+    for i in range(n):
+        q.put({"stream_id": f"cam{i % 3}", "event": "detections", "data": [([1.0, 2.0, 3.0, 4.0], 0, 0.9)], "i": i})
+
+
+@pytest.mark.parametrize("transport", ["queue", "pipe", "shm"])
+def test_transport_delivers_from_worker_process(transport):
+    q = make_queue(transport, maxsize=16, results=True)
+    p = Process(target=_produce, args=(q, 50))
+    p.start()
+    got = [q.get(timeout=5)["i"] for _ in range(50)]
+    p.join(timeout=5)
+    assert got == list(range(50))
+    with pytest.raises(Empty):
+        q.get(timeout=0.01)
+    if transport == "shm":
+        q.close()
+
+
+def test_shm_ring_backpressure_and_ring_limit():
+    q = ShmResultRing(maxsize=2, slot_bytes=256)
+    q.put("a")
+    q.put("b")
+    with pytest.raises(Full):
+        q.put("c", timeout=0.01)
+    assert q.get() == "a"
+    with pytest.raises(ValueError):
+        q.put("x" * 1024)   # more than the whole ring
+    q.close()
+
+
+def test_shm_ring_spreads_events_larger_than_a_slot():
+    q = ShmResultRing(maxsize=8, slot_bytes=256)
+    crowd = {"stream_id": "cam0", "event": "detections",
+             "data": [([float(i), 2.0, 3.0, 4.0], 0, 0.9) for i in range(310)]}   # > max_det boxes
+    q.put("small")
+    q.put({"stream_id": "cam0", "data": [([1.0] * 4, 0, 0.5)] * 12})   # 2 slots, wrapping later
+    assert q.get() == "small"
+    q.get()
+    for i in range(3):   # the ring wraps around while messages span slots
+        q.put(i)
+    assert [q.get() for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError):
+        q.put(crowd)     # 8 slots of 256 bytes can't hold it
+    q.close()
+    big = ShmResultRing(maxsize=8, slot_bytes=4096)   # the crowd event takes 5 slots
+    big.put(crowd)
+    with pytest.raises(Full):
+        big.put(crowd, block=False)   # needs more free slots than remain
+    big.put("after")
+    assert big.get() == crowd and big.get() == "after"
+    big.close()
+
+
+def test_pipe_queue_is_bounded():
+    q = make_queue("pipe", maxsize=2)
+    q.put(1)
+    q.put(2)
+    with pytest.raises(Full):
+        q.put(3, timeout=0.01)
+    with pytest.raises(Full):
+        q.put(3, block=False)
+    assert q.get(timeout=1) == 1
+    q.put(3, block=False)
+    assert [q.get(timeout=1), q.get(timeout=1)] == [2, 3]
+
+
+@pytest.mark.parametrize("transport", ["pipe", "shm"])
+def test_put_times_out_on_a_writer_lock_that_is_never_released(transport):
+    # what a writer terminated mid-put leaves behind
+    q = make_queue(transport, maxsize=4, results=True)
+    q._wlock.acquire()
+    with pytest.raises(Full):
+        q.put("event", timeout=0.05)
+    with pytest.raises(Full):
+        q.put("event", block=False)
+    q._wlock.release()
+    q.put("event", timeout=1)
+    assert q.get(timeout=1) == "event"
+    if transport == "shm":
+        q.close()
+
+
+def test_unknown_transport_rejected():
+    with pytest.raises(ValueError):
+        make_queue("zmq")
@@ -0,0 +1,228 @@
+import base64
+import email.parser
+import email.policy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from multi_processing.webhook_delivery import (BATCH_NDJSON, DELIVERED, REJECTED, SPOOLED,
+                                               WebhookDelivery)
+
+
+class StubEndpoint:
+    """Local webhook receiver: optional delay per request and a scripted list of status codes."""
+    def __init__(self, delay=0.0, statuses=()):
+        self.delay = delay
+        self.statuses = list(statuses)
+        self.bodies = []
+        self.raw = []        # (content type, body bytes) per request
+        self.ports = set()   # client ports seen, i.e. TCP connections opened
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers["Content-Length"]))
+                content_type = self.headers.get("Content-Type", "")
+                time.sleep(stub.delay)
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                stub.raw.append((content_type, raw))
+                if status == 200 and content_type.startswith("application/json"):
+                    body = json.loads(raw)
+                    stub.bodies.extend(body if isinstance(body, list) else [body])
+                stub.ports.add(self.client_address[1])
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhooks/camera"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _wait(cond, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_slow_endpoint_does_not_block_submit_and_connections_are_pooled(tmp_path):
+    stub = StubEndpoint(delay=0.2)
+    d = WebhookDelivery(spool_dir=str(tmp_path), senders=2)
+    outcomes = []
+    t0 = time.perf_counter()
+    for i in range(10):
+        assert d.submit(f"cam{i % 3}", stub.url, {"n": i}, on_done=outcomes.append)
+    submit_s = time.perf_counter() - t0
+    assert submit_s < 0.1                # vs 10 x 200 ms inline
+    assert _wait(lambda: len(outcomes) == 10)
+    d.close()
+    stub.close()
+    assert outcomes == [DELIVERED] * 10
+    assert sorted(b["n"] for b in stub.bodies) == list(range(10))
+    assert len(stub.ports) <= 2          # keep-alive: one connection per sender, not per event
+
+
+def test_retries_with_backoff_then_delivers(tmp_path):
+    stub = StubEndpoint(statuses=[503, 500])
+    d = WebhookDelivery(spool_dir=str(tmp_path), backoff_s=0.05)
+    done = []
+    t0 = time.monotonic()
+    d.submit("cam1", stub.url, {"lot": "A1"}, on_done=done.append)
+    assert _wait(lambda: done)
+    elapsed = time.monotonic() - t0
+    d.close()
+    stub.close()
+    assert done == [DELIVERED] and d.retried == 2
+    assert elapsed >= 0.05 + 0.1         # 0.05 s, then 0.1 s
+    assert stub.bodies == [{"lot": "A1"}]
+
+
+def test_client_errors_are_final(tmp_path):
+    stub = StubEndpoint(statuses=[400])
+    d = WebhookDelivery(spool_dir=str(tmp_path))
+    done = []
+    d.submit("cam1", stub.url, {"lot": "A1"}, on_done=done.append)
+    assert _wait(lambda: done)
+    d.close()
+    stub.close()
+    assert done == [REJECTED] and d.retried == 0 and not d.spool_files()
+
+
+def test_dead_endpoint_spools_and_spool_is_replayed_after_restart(tmp_path):
+    dead = StubEndpoint()
+    dead_url = dead.url
+    dead.close()                         # nothing listens there any more
+    recorded = []
+    d = WebhookDelivery(spool_dir=str(tmp_path), max_attempts=2, backoff_s=0.01, timeout_s=1.0,
+                        on_delivered=recorded.append)
+    done = []
+    for i in range(3):
+        d.submit("cam1", dead_url, {"n": i}, on_done=done.append, record={"lot": f"A{i}"})
+    assert _wait(lambda: len(done) == 3)
+    d.close()
+    assert done == [SPOOLED] * 3 and len(d.spool_files()) == 3
+    assert recorded == []
+
+    # "restart" with the endpoint reachable again: spooled events are delivered and removed
+    stub = StubEndpoint()
+    for path in d.spool_files():
+        with open(path) as f:
+            data = json.load(f)
+        data["url"] = stub.url
+        with open(path, "w") as f:
+            json.dump(data, f)
+    d2 = WebhookDelivery(spool_dir=str(tmp_path), on_delivered=recorded.append)
+    assert _wait(lambda: d2.sent == 3)
+    d2.close()
+    stub.close()
+    assert sorted(b["n"] for b in stub.bodies) == [0, 1, 2]
+    # on_done didn't survive the restart, but the record did
+    assert sorted(e.record["lot"] for e in recorded) == ["A0", "A1", "A2"]
+    assert not d2.spool_files()
+
+
+def test_full_channel_queue_spills_to_spool_and_close_flushes(tmp_path):
+    stub = StubEndpoint(delay=0.3)
+    d = WebhookDelivery(spool_dir=str(tmp_path), queue_size=2, senders=1)
+    d.submit("cam1", stub.url, {"n": 0})
+    assert _wait(lambda: d.pending("cam1") == 0)   # n=0 is being sent
+    assert d.submit("cam1", stub.url, {"n": 1})
+    assert d.submit("cam1", stub.url, {"n": 2})
+    assert not d.submit("cam1", stub.url, {"n": 3})  # queue full: straight to disk
+    assert d.submit("cam2", stub.url, {"n": 4})      # other channels are unaffected
+    assert d.overflowed == 1 and len(d.spool_files()) == 1
+    d.close(timeout=5)
+    stub.close()
+    assert sorted(b["n"] for b in stub.bodies) == [0, 1, 2, 4]
+    with pytest.raises(RuntimeError):
+        d.submit("cam1", stub.url, {"n": 5})
+
+
+def test_batch_goes_out_when_full_and_partial_batch_on_flush(tmp_path):
+    stub = StubEndpoint()
+    d = WebhookDelivery(spool_dir=str(tmp_path), batch_events=3, batch_window_s=60.0)
+    for i in range(4):
+        d.submit(f"cam{i}", stub.url, {"n": i})
+    assert _wait(lambda: len(stub.raw) == 1)
+    time.sleep(0.1)
+    assert len(stub.raw) == 1 and d.pending() == 1    # n=3 waits for its window
+    assert d.flush(timeout=5)
+    d.close()
+    stub.close()
+    assert [json.loads(raw) for _, raw in stub.raw] == [[{"n": 0}, {"n": 1}, {"n": 2}], [{"n": 3}]]
+    assert d.sent == 4 and d.requests == 2
+
+
+def test_ndjson_batch_after_window(tmp_path):
+    stub = StubEndpoint()
+    d = WebhookDelivery(spool_dir=str(tmp_path), batch_events=50, batch_window_s=0.1, batch_format=BATCH_NDJSON)
+    d.submit("cam1", stub.url, {"n": 1})
+    d.submit("cam2", stub.url, {"n": 2})
+    assert _wait(lambda: d.sent == 2)
+    d.close()
+    stub.close()
+    ((content_type, raw),) = stub.raw
+    assert content_type == "application/x-ndjson"
+    assert [json.loads(line) for line in raw.decode().splitlines()] == [{"n": 1}, {"n": 2}]
+
+
+def test_multipart_batch_sends_raw_jpeg_parts(tmp_path):
+    stub = StubEndpoint()
+    jpegs = [bytes([0xFF, 0xD8, i]) * 3000 for i in range(2)]
+    bodies = [{"cameraId": f"cam{i}", "lot": "A1", "imageBase64": "data:image/jpeg;base64," +
+               base64.b64encode(j).decode()} for i, j in enumerate(jpegs)]
+    d = WebhookDelivery(spool_dir=str(tmp_path), batch_events=2, multipart=True)
+    for b in bodies:
+        d.submit(b["cameraId"], stub.url, b)
+    assert _wait(lambda: d.sent == 2)
+    d.close()
+    stub.close()
+    ((content_type, raw),) = stub.raw
+    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + raw)
+    parts = {p.get_param("name", header="content-disposition"): p for p in msg.iter_parts()}
+    events = json.loads(parts["events"].get_payload(decode=True))
+    assert events == [{"cameraId": "cam0", "lot": "A1", "imagePart": "image-0"},
+                      {"cameraId": "cam1", "lot": "A1", "imagePart": "image-1"}]
+    assert [parts[f"image-{i}"].get_payload(decode=True) for i in range(2)] == jpegs
+    assert parts["image-0"].get_content_type() == "image/jpeg"
+    assert len(raw) < 0.8 * len(json.dumps(bodies))
+
+
+def test_close_flushes_partial_batches(tmp_path):
+    stub = StubEndpoint()
+    d = WebhookDelivery(spool_dir=str(tmp_path), batch_events=10, batch_window_s=60.0)
+    done = []
+    for i in range(3):
+        d.submit("cam1", stub.url, {"n": i}, on_done=done.append)
+    d.close(timeout=5)
+    stub.close()
+    assert done == [DELIVERED] * 3 and len(stub.raw) == 1
+    assert not d.spool_files()
+
+
+def test_batch_failing_after_close_gave_up_waiting_is_spooled(tmp_path):
+    # still in flight when close() stops waiting, then fails: it must not be queued for a retry nobody sends
+    stub = StubEndpoint(delay=1.5, statuses=[500])
+    d = WebhookDelivery(spool_dir=str(tmp_path), timeout_s=3.0)
+    done = []
+    d.submit("cam1", stub.url, {"lot": "A1"}, on_done=done.append)
+    assert _wait(lambda: d.stats()["pending"] and not d._waiting)
+    d.close(timeout=0.5)
+    stub.close()
+    assert done == [SPOOLED]
+    assert len(d.spool_files()) == 1 and d.stats()["pending"] == 0